@@ -6,13 +6,21 @@ Core agent interaction functions for running autonomous coding sessions.
 """
 
 import asyncio
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 from claude_agent_sdk import ClaudeSDKClient
 
+from checkpoints import checkpoint_session
 from client import create_client
+from security import get_blocked_commands_section
+from security_audit import flush_audit_logs
+from registry import update_project
 from progress import (
+    build_session_digest,
+    get_completed_sections,
+    merge_section_features,
     print_session_header,
     print_progress_summary,
     has_features,
@@ -22,8 +30,12 @@ from progress import (
 from prompts import (
     get_initializer_prompt,
     get_coding_prompt,
+    get_initializer_checkpoint_section,
+    get_initializer_setup_section,
+    get_section_initializer_prompt,
     get_phase_initializer_prompt,
     get_phase_spec,
+    get_spec_sections,
     copy_spec_to_project,
     has_project_prompts,
 )
@@ -33,6 +45,35 @@ from prompts import (
 AUTO_CONTINUE_DELAY_SECONDS = 3
 
 
+def get_initializer_state(project_dir: Path, phase: int) -> tuple[bool, list[str], dict[str, int]]:
+    """
+    Decide whether a phase still needs the initializer.
+
+    The initializer checkpoints each spec section it has created features
+    for. A phase with checkpoints is initialized once every section is done;
+    one with features but no checkpoints was initialized in a single pass.
+
+    Args:
+        project_dir: Directory for the project
+        phase: Phase number
+
+    Returns:
+        (needs_initializer, spec section names, completed sections with
+        their feature counts)
+    """
+    try:
+        sections = [name for name, _ in get_spec_sections(get_phase_spec(project_dir, phase))]
+    except FileNotFoundError:
+        sections = []
+    completed = get_completed_sections(project_dir, phase)
+
+    if completed:
+        needs_initializer = any(name not in completed for name in sections)
+    else:
+        needs_initializer = not has_features(project_dir, phase)
+    return needs_initializer, sections, completed
+
+
 async def run_agent_session(
     client: ClaudeSDKClient,
     message: str,
@@ -107,11 +148,59 @@ async def run_agent_session(
         return "error", str(e)
 
 
+async def run_parallel_initializer(
+    project_dir: Path,
+    model: str,
+    phase: int,
+    pending: list[str],
+    session_id: str,
+    concurrency: int,
+) -> dict:
+    """
+    Create a phase's features with one initializer sub-session per pending spec section.
+
+    Up to concurrency sub-sessions run at once, each inserting its section's
+    features with feature_create_bulk(section=...). Afterwards the features
+    are merged: duplicates across sections are removed and priorities are
+    assigned in spec order (see progress.merge_section_features). Sections
+    whose sub-session failed stay pending.
+
+    Args:
+        project_dir: Directory for the project
+        model: Claude model to use
+        phase: Phase number
+        pending: Names of the spec sections that still need features
+        session_id: Session id of the initializer; sub-sessions append their section
+        concurrency: Maximum number of concurrent sub-sessions
+
+    Returns:
+        The merge result: features (in the phase) and duplicates (removed)
+    """
+    section_texts = dict(get_spec_sections(get_phase_spec(project_dir, phase)))
+    sections = list(section_texts)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_section(name: str) -> str:
+        async with semaphore:
+            print(f"\n[Section initializer started: {name}]", flush=True)
+            client = create_client(project_dir, model, phase, session_id=f"{session_id}-{name}")
+            prompt = get_section_initializer_prompt(phase, name, section_texts[name], sections)
+            async with client:
+                status, _ = await run_agent_session(client, prompt, project_dir)
+            print(f"\n[Section initializer finished: {name} ({status})]", flush=True)
+            return status
+
+    print(f"Running {len(pending)} section initializers, {min(concurrency, len(pending))} at a time...")
+    await asyncio.gather(*(run_section(name) for name in pending))
+    return merge_section_features(project_dir, phase, sections)
+
+
 async def run_autonomous_agent(
     project_dir: Path,
     model: str,
     max_iterations: Optional[int] = None,
     phase: int = 1,
+    parallel_initializer: int = 0,
 ) -> None:
     """
     Run the autonomous agent loop.
@@ -121,6 +210,8 @@ async def run_autonomous_agent(
         model: Claude model to use
         max_iterations: Maximum number of iterations (None for unlimited)
         phase: Phase number to run (default: 1)
+        parallel_initializer: Run up to this many initializer sub-sessions
+            concurrently, one per spec section (0 or 1: a single initializer)
     """
     print("\n" + "=" * 70)
     print("  AUTONOMOUS CODING AGENT DEMO")
@@ -160,13 +251,20 @@ async def run_autonomous_agent(
             print(f"Phase {prev_phase} status: {passing}/{total} tests passing")
             print(f"Starting Phase {phase} anyway...")
 
-    # Check if this is a fresh start or continuation for this phase
-    # Uses has_features() which checks if the database actually has features,
-    # not just if the file exists (empty db should still trigger initializer)
-    is_first_run = not has_features(project_dir, phase)
+    # Check if this is a fresh start, an interrupted initializer or a continuation
+    # for this phase. Feature counts come from the database (an empty db still
+    # triggers the initializer), and spec section checkpoints tell whether an
+    # earlier initializer finished
+    is_first_run, sections, completed = get_initializer_state(project_dir, phase)
 
     if is_first_run:
-        print(f"Fresh start for Phase {phase} - will use initializer agent")
+        if completed:
+            print(
+                f"Resuming Phase {phase} initializer: {len(completed)} of {len(sections)} "
+                "spec sections already have features"
+            )
+        else:
+            print(f"Fresh start for Phase {phase} - will use initializer agent")
         print()
         print("=" * 70)
         print("  NOTE: First session takes 10-20+ minutes!")
@@ -192,27 +290,70 @@ async def run_autonomous_agent(
             print("To continue, run the script again without --max-iterations")
             break
 
+        # An initializer interrupted in an earlier session resumes from its checkpoints
+        if iteration > 1:
+            is_first_run, sections, completed = get_initializer_state(project_dir, phase)
+
         # Print session header
         print_session_header(iteration, is_first_run)
 
-        # Create client (fresh context)
-        client = create_client(project_dir, model, phase)
+        # Create client (fresh context); the session id tags feature history events
+        session_id = f"{datetime.now():%Y%m%d-%H%M%S}-{iteration}"
+        client = create_client(project_dir, model, phase, session_id=session_id)
+
+        # Snapshot features.db and git HEAD so this session can be rolled back
+        checkpoint = checkpoint_session(project_dir, session_id=session_id, phase=phase)
+        if checkpoint is not None:
+            print(
+                f"Checkpoint {checkpoint['session']} saved (undo this session with: python checkpoints.py "
+                f"rollback --project-dir {project_dir} --to-session {checkpoint['session']})\n"
+            )
+
+        # Parallel mode: fan the pending spec sections out to concurrent sub-sessions,
+        # then let this session do the rest of the setup (or the sections that failed)
+        features_created = None
+        pending = [name for name in sections if name not in completed]
+        if is_first_run and parallel_initializer > 1 and len(pending) > 1:
+            merged = await run_parallel_initializer(
+                project_dir, model, phase, pending, session_id, parallel_initializer
+            )
+            print(
+                f"\nParallel initializer created {merged['features']} features "
+                f"({merged['duplicates']} duplicates removed, "
+                f"{merged['cycles']} cyclic dependencies dropped)"
+            )
+            is_first_run, sections, completed = get_initializer_state(project_dir, phase)
+            if not is_first_run:
+                features_created = merged["features"]
 
         # Choose prompt based on session type and phase
         # Pass project_dir to enable project-specific prompts
-        if is_first_run:
+        if is_first_run or features_created is not None:
             if phase == 1:
                 prompt = get_initializer_prompt(project_dir)
             else:
                 prompt = get_phase_initializer_prompt(project_dir, phase)
-            is_first_run = False  # Only use initializer once
+            if features_created is not None:
+                prompt += get_initializer_setup_section(features_created)
+            else:
+                prompt += get_initializer_checkpoint_section(sections, completed)
         else:
-            prompt = get_coding_prompt(project_dir)
+            # Give the agent the current state and the commands that will be
+            # blocked up front, so it spends fewer turns orienting itself
+            prompt = (
+                get_coding_prompt(project_dir)
+                + build_session_digest(project_dir, phase)
+                + get_blocked_commands_section(project_dir)
+            )
 
         # Run session with async context manager
         async with client:
             status, response = await run_agent_session(client, prompt, project_dir)
 
+        # Make sure this session's security decisions are on disk
+        flush_audit_logs()
+        update_project(project_dir, phase=phase, session=True)
+
         # Handle status
         if status == "continue":
             print(f"\nAgent will auto-continue in {AUTO_CONTINUE_DELAY_SECONDS}s...")
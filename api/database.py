@@ -5,12 +5,13 @@ Database Models and Connection
 SQLite database schema for feature storage using SQLAlchemy.
 """
 
+import sys
 from pathlib import Path
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, Integer, String, Text, create_engine
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text, create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import deferred, sessionmaker, Session
 from sqlalchemy.types import JSON
 
 Base = declarative_base()
@@ -25,13 +26,36 @@ class Feature(Base):
     priority = Column(Integer, nullable=False, default=999, index=True)
     category = Column(String(100), nullable=False)
     name = Column(String(255), nullable=False)
-    description = Column(Text, nullable=False)
-    steps = Column(JSON, nullable=False)  # Stored as JSON array
     passes = Column(Boolean, default=False, index=True)
     phase = Column(Integer, default=1, nullable=False, index=True)
+    # Number of dependencies that are not passing yet (0 = ready to work on)
+    blocked_by = Column(Integer, default=0, nullable=False)
+    # Last regression check (UTC ISO 8601, NULL = never verified) and number of checks
+    last_verified_at = Column(String(32), nullable=True)
+    verification_count = Column(Integer, default=0, nullable=False)
+    # Spec section the initializer created the feature for (NULL = not recorded)
+    section = Column(String(100), nullable=True)
+    # Heavy columns come last, so reading the hot columns above never touches
+    # their (often overflowed) payload, and are only loaded when asked for
+    description = deferred(Column(Text, nullable=False))
+    steps = deferred(Column(JSON, nullable=False))  # Stored as JSON array
+
+    __table_args__ = (
+        # Ready set: pending features with no unsatisfied dependencies, in queue order
+        Index("ix_features_ready", "phase", "passes", "blocked_by", "priority", "id"),
+        # Regression queue: passing features, least recently verified first (NULLs sort first)
+        Index("ix_features_regression", "phase", "passes", "last_verified_at", "id"),
+        # Progress counts: GROUP BY phase, category answered from the index alone
+        Index("ix_features_stats", "phase", "category", "passes"),
+    )
 
     def to_dict(self) -> dict:
-        """Convert feature to dictionary for JSON serialization."""
+        """
+        Convert feature to dictionary for JSON serialization.
+
+        Loads description and steps if the query deferred them; queries that
+        convert many features should undefer them up front.
+        """
         return {
             "id": self.id,
             "priority": self.priority,
@@ -41,9 +65,105 @@ class Feature(Base):
             "steps": self.steps,
             "passes": self.passes,
             "phase": self.phase,
+            "blocked_by": self.blocked_by,
+            "last_verified_at": self.last_verified_at,
+            "verification_count": self.verification_count,
         }
 
 
+class FeatureDependency(Base):
+    """Edge in the feature dependency graph: feature_id depends on depends_on_id."""
+
+    __tablename__ = "feature_dependencies"
+
+    feature_id = Column(Integer, ForeignKey("features.id"), primary_key=True)
+    depends_on_id = Column(Integer, ForeignKey("features.id"), primary_key=True, index=True)
+
+
+# Feature lifecycle events recorded in feature_events
+FEATURE_EVENTS = ("served", "passed", "failed", "skipped")
+
+
+class FeatureEvent(Base):
+    """A feature lifecycle transition (see FEATURE_EVENTS) with its time and agent session."""
+
+    __tablename__ = "feature_events"
+
+    id = Column(Integer, primary_key=True)
+    feature_id = Column(Integer, ForeignKey("features.id"), nullable=False)
+    event = Column(String(20), nullable=False)
+    session_id = Column(String(100), nullable=True)
+    created_at = Column(String(32), nullable=False)  # UTC ISO 8601, e.g. 2025-01-15T14:30:00.000Z
+
+    __table_args__ = (
+        Index("ix_feature_events_feature", "feature_id", "created_at"),
+        Index("ix_feature_events_event", "event", "created_at"),
+    )
+
+
+class ImportProgress(Base):
+    """Resume cursor for a chunked feature import (see api.migration)."""
+
+    __tablename__ = "import_progress"
+
+    source = Column(String(255), primary_key=True)  # Input file name
+    signature = Column(String(100), nullable=False)  # Input file size and mtime
+    items_done = Column(Integer, nullable=False, default=0)  # Input records consumed
+    completed = Column(Boolean, nullable=False, default=False)
+    # Added to input ids and priorities, so an import appends after existing features
+    id_offset = Column(Integer, nullable=False, default=0)
+    priority_offset = Column(Integer, nullable=False, default=0)
+
+
+class SpecSection(Base):
+    """A spec section whose features the initializer has created (its resume checkpoint)."""
+
+    __tablename__ = "spec_sections"
+
+    phase = Column(Integer, primary_key=True)
+    name = Column(String(100), primary_key=True)  # Top-level spec element, see prompts.get_spec_sections
+    features_created = Column(Integer, nullable=False, default=0)
+    completed_at = Column(String(32), nullable=False)  # UTC ISO 8601
+
+
+# Version of the schema defined in this module, stored in PRAGMA user_version.
+# Bump it together with a new entry in api.migration.SCHEMA_MIGRATIONS.
+SCHEMA_VERSION = 9
+
+
+# Full-text search index over name, description and steps, kept in sync with
+# the features table by triggers. Only changes to the indexed columns touch it.
+SEARCH_INDEX_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS features_fts USING fts5(
+        name, description, steps,
+        content='features', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS features_fts_ai AFTER INSERT ON features BEGIN
+        INSERT INTO features_fts(rowid, name, description, steps)
+        VALUES (new.id, new.name, new.description, new.steps);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS features_fts_ad AFTER DELETE ON features BEGIN
+        INSERT INTO features_fts(features_fts, rowid, name, description, steps)
+        VALUES ('delete', old.id, old.name, old.description, old.steps);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS features_fts_au AFTER UPDATE OF name, description, steps ON features BEGIN
+        INSERT INTO features_fts(features_fts, rowid, name, description, steps)
+        VALUES ('delete', old.id, old.name, old.description, old.steps);
+        INSERT INTO features_fts(rowid, name, description, steps)
+        VALUES (new.id, new.name, new.description, new.steps);
+    END
+    """,
+]
+
+
 def get_database_path(project_dir: Path) -> Path:
     """Return the path to the SQLite database for a project."""
     return project_dir / "features.db"
@@ -62,6 +182,10 @@ def create_database(project_dir: Path) -> tuple:
     """
     Create database and return engine + session maker.
 
+    New databases get the full schema; older ones are brought up to
+    SCHEMA_VERSION by the pending schema migrations. A database that is
+    already current costs a single PRAGMA user_version read.
+
     Args:
         project_dir: Directory containing the project
 
@@ -70,8 +194,24 @@ def create_database(project_dir: Path) -> tuple:
     """
     db_url = get_database_url(project_dir)
     engine = create_engine(db_url, connect_args={"check_same_thread": False})
-    Base.metadata.create_all(bind=engine)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with engine.connect() as conn:
+        version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+    if version < SCHEMA_VERSION:
+        # Imported here because api.migration imports this module
+        from api.migration import run_schema_migrations
+
+        Base.metadata.create_all(bind=engine)
+        run_schema_migrations(project_dir, SessionLocal, version)
+    elif version > SCHEMA_VERSION:
+        print(
+            f"Warning: features.db schema version {version} is newer than "
+            f"this system supports ({SCHEMA_VERSION})",
+            file=sys.stderr,
+        )
+
     return engine, SessionLocal
 
 
@@ -0,0 +1,204 @@
+"""
+Feature History Reports
+=======================
+
+Query helpers over the feature_events table (served, passed, failed and
+skipped transitions, each with a timestamp and agent session id):
+
+- throughput: features passed per hour of agent time
+- time_to_pass_by_category: median time from first being served to passing
+- regression_rate: share of passed features that later failed
+
+Agent time is approximated per session as the span between its first and
+last recorded event, since the features server only sees tool calls.
+
+Reports can be printed from the command line:
+    python -m api.history --project-dir generations/my_app
+    python -m api.history --project-dir generations/my_app --phase 2 --json
+"""
+
+import json
+import sqlite3
+import statistics
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def load_events(project_dir: Path, phase: Optional[int] = None) -> list[dict]:
+    """
+    Load feature events in time order.
+
+    Args:
+        project_dir: Directory containing the project
+        phase: Optional phase to restrict events to
+
+    Returns:
+        Dicts with feature_id, category, event, session_id and time (datetime);
+        empty if the database or the events table does not exist
+    """
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return []
+
+    sql = (
+        "SELECT e.feature_id, f.category, e.event, e.session_id, e.created_at "
+        "FROM feature_events e JOIN features f ON f.id = e.feature_id"
+    )
+    params: tuple = ()
+    if phase is not None:
+        sql += " WHERE f.phase = ?"
+        params = (phase,)
+    sql += " ORDER BY e.created_at, e.id"
+
+    conn = sqlite3.connect(db_file)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError:
+        return []  # No history recorded by this database's schema version
+    finally:
+        conn.close()
+
+    return [
+        {
+            "feature_id": feature_id,
+            "category": category,
+            "event": event,
+            "session_id": session_id,
+            "time": _parse_time(created_at),
+        }
+        for feature_id, category, event, session_id, created_at in rows
+    ]
+
+
+def throughput(events: list[dict]) -> dict:
+    """
+    Features passed per hour of agent time.
+
+    Returns:
+        Dict with passed, sessions, agent_hours and features_per_hour
+        (None if no agent time was recorded)
+    """
+    spans: dict[str, list[datetime]] = {}
+    for event in events:
+        if event["session_id"] is not None:
+            span = spans.setdefault(event["session_id"], [event["time"], event["time"]])
+            span[1] = event["time"]
+
+    agent_hours = sum((end - start).total_seconds() for start, end in spans.values()) / 3600
+    passed = sum(1 for event in events if event["event"] == "passed")
+    return {
+        "passed": passed,
+        "sessions": len(spans),
+        "agent_hours": round(agent_hours, 2),
+        "features_per_hour": round(passed / agent_hours, 2) if agent_hours > 0 else None,
+    }
+
+
+def time_to_pass_by_category(events: list[dict]) -> dict[str, dict]:
+    """
+    Median time from a feature first being served to it first passing, per category.
+
+    Features that passed without being served (e.g. marked directly) are left out.
+
+    Returns:
+        Dict mapping category to {"features": int, "median_minutes": float}
+    """
+    first_served: dict[int, datetime] = {}
+    durations: dict[str, list[float]] = {}
+    passed: set[int] = set()
+
+    for event in events:
+        feature_id = event["feature_id"]
+        if event["event"] == "served":
+            first_served.setdefault(feature_id, event["time"])
+        elif event["event"] == "passed" and feature_id not in passed:
+            passed.add(feature_id)
+            if feature_id in first_served:
+                seconds = (event["time"] - first_served[feature_id]).total_seconds()
+                durations.setdefault(event["category"], []).append(seconds)
+
+    return {
+        category: {"features": len(values), "median_minutes": round(statistics.median(values) / 60, 1)}
+        for category, values in sorted(durations.items())
+    }
+
+
+def regression_rate(events: list[dict]) -> dict:
+    """
+    Share of features that failed after having passed.
+
+    Returns:
+        Dict with passed (features that ever passed), regressed and rate
+    """
+    passed: set[int] = set()
+    regressed: set[int] = set()
+    for event in events:
+        if event["event"] == "passed":
+            passed.add(event["feature_id"])
+        elif event["event"] == "failed" and event["feature_id"] in passed:
+            regressed.add(event["feature_id"])
+
+    return {
+        "passed": len(passed),
+        "regressed": len(regressed),
+        "rate": round(len(regressed) / len(passed), 3) if passed else 0.0,
+    }
+
+
+def build_report(project_dir: Path, phase: Optional[int] = None) -> dict:
+    """Build the full history report for a project."""
+    events = load_events(project_dir, phase)
+    return {
+        "events": len(events),
+        "throughput": throughput(events),
+        "time_to_pass_by_category": time_to_pass_by_category(events),
+        "regressions": regression_rate(events),
+    }
+
+
+def print_report(report: dict) -> None:
+    """Print a history report in human-readable form."""
+    t = report["throughput"]
+    r = report["regressions"]
+    rate = f"{t['features_per_hour']}/hour" if t["features_per_hour"] is not None else "n/a"
+
+    print(f"Events: {report['events']}")
+    print(f"Throughput: {t['passed']} passed in {t['agent_hours']}h over {t['sessions']} sessions ({rate})")
+    print(f"Regressions: {r['regressed']} of {r['passed']} passed features ({r['rate'] * 100:.1f}%)")
+
+    if report["time_to_pass_by_category"]:
+        print("\nMedian time to pass by category:")
+        width = max(len(category) for category in report["time_to_pass_by_category"])
+        for category, stats in report["time_to_pass_by_category"].items():
+            print(f"  {category:<{width}}  {stats['median_minutes']:>7.1f} min  ({stats['features']} features)")
+
+
+def main() -> int:
+    """Command line entry point for history reports."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Feature throughput and regression report")
+    parser.add_argument("--project-dir", type=Path, required=True, help="Project directory")
+    parser.add_argument("--phase", type=int, default=None, help="Only report on this phase")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if not (args.project_dir / "features.db").exists():
+        parser.error(f"No features.db found in {args.project_dir}")
+
+    report = build_report(args.project_dir, args.phase)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
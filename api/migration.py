@@ -3,17 +3,283 @@ JSON to SQLite Migration
 ========================
 
 Automatically migrates existing feature_list.json files to SQLite database.
+
+Large feature lists can also be supplied as feature_list.ndjson, .jsonl or
+.csv. Inputs are parsed incrementally and imported in committed chunks with a
+resume cursor, so an interrupted import picks up where it stopped.
+
+Progress and migration messages go to stderr: this module also runs inside
+the features MCP server, whose stdout carries the protocol.
+
+Imports and exports can also be run from the command line:
+    python -m api.migration import --project-dir generations/my_app --input features.ndjson.gz
+    python -m api.migration export --project-dir generations/my_app --format ndjson --gzip
 """
 
+import csv
+import gzip
 import json
 import shutil
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker, undefer, Session
+
+from api.database import Feature, ImportProgress
+
+
+# Legacy feature list files picked up on startup, in order of preference
+FEATURE_IMPORT_FILES = (
+    "feature_list.json",
+    "feature_list.ndjson",
+    "feature_list.jsonl",
+    "feature_list.csv",
+)
+
+# Features inserted per committed chunk during import
+IMPORT_CHUNK_SIZE = 1000
+
+# Feature columns set by an import
+IMPORT_COLUMNS = ("id", "priority", "category", "name", "description", "steps", "passes", "phase")
+
+# Bytes read at a time when streaming a JSON array
+_READ_SIZE = 64 * 1024
+
+
+def _open_text(path: Path):
+    """Open a (possibly gzip-compressed) input file for reading text."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _input_format(path: Path) -> str:
+    suffixes = [s for s in path.suffixes if s != ".gz"]
+    suffix = suffixes[-1] if suffixes else ""
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if suffix == ".csv":
+        return "csv"
+    return "json"
+
+
+def _iter_json_array(f):
+    """Yield the elements of a top-level JSON array without loading it whole."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        # Skip whitespace and separators
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("unexpected end of input: JSON array is not closed")
+            buffer = f.read(_READ_SIZE)
+            pos = 0
+            eof = not buffer
+            continue
+
+        if not started:
+            if buffer[pos] != "[":
+                raise ValueError("input must contain a JSON array")
+            started = True
+            pos += 1
+            continue
+
+        if buffer[pos] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Element continues past the buffer: read more and retry
+            chunk = f.read(_READ_SIZE)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        yield value
+        pos = end
+
+
+def _csv_record(row: dict) -> dict:
+    """Convert a CSV row to a feature record (steps as a JSON array or '|'-separated)."""
+    record = {key: value for key, value in row.items() if value not in (None, "")}
+    for key in ("id", "priority", "phase"):
+        if key in record:
+            record[key] = int(record[key])
+    if "passes" in record:
+        record["passes"] = record["passes"].strip().lower() in ("1", "true", "yes")
+    steps = record.get("steps", "")
+    if steps.startswith("["):
+        record["steps"] = json.loads(steps)
+    else:
+        record["steps"] = [step.strip() for step in steps.split("|") if step.strip()]
+    return record
+
+
+def iter_feature_records(path: Path):
+    """
+    Stream feature records from a JSON array, NDJSON or CSV file.
+
+    The format is chosen by extension (.json, .ndjson/.jsonl, .csv), with
+    optional gzip compression (.gz). Input is parsed incrementally, so memory
+    use does not depend on the file size.
+
+    Yields:
+        One dict per feature
+
+    Raises:
+        ValueError: If the input is malformed
+    """
+    fmt = _input_format(path)
+    with _open_text(path) as f:
+        if fmt == "ndjson":
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"line {line_number}: {e}") from e
+        elif fmt == "csv":
+            for row in csv.DictReader(f):
+                yield _csv_record(row)
+        else:
+            yield from _iter_json_array(f)
+
+
+def _feature_row(feature_dict: dict, i: int, id_offset: int = 0, priority_offset: int = 0) -> dict:
+    """Map an input record to Feature column values, shifted by the import's offsets."""
+    if not isinstance(feature_dict, dict):
+        raise ValueError(f"record {i + 1} is not an object")
+    # Handle both old format (no id/priority/name) and new format
+    feature_id = feature_dict.get("id", i + 1)
+    if not isinstance(feature_id, int) or feature_id < 1:
+        raise ValueError(f"record {i + 1} has an invalid id: {feature_id!r}")
+    return {
+        "id": id_offset + feature_id,
+        "priority": priority_offset + feature_dict.get("priority", i + 1),
+        "category": feature_dict.get("category", "uncategorized"),
+        "name": feature_dict.get("name", f"Feature {i + 1}"),
+        "description": feature_dict.get("description", ""),
+        "steps": feature_dict.get("steps", []),
+        "passes": feature_dict.get("passes", False),
+        "phase": feature_dict.get("phase", 1),
+    }
+
+
+def import_features(
+    source_file: Path,
+    session_maker: sessionmaker,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> Optional[int]:
+    """
+    Import features from a file in committed chunks, resuming after failures.
+
+    Each chunk is committed together with a resume cursor in the
+    import_progress table, so an interrupted import continues after the last
+    committed chunk instead of starting over. The cursor is reset if the
+    input file changes (size or mtime).
 
-from api.database import Feature
+    Importing into a database that already has features appends: input ids
+    and priorities are shifted past the existing MAX(id) and MAX(priority),
+    so existing rows are never overwritten. The offsets are stored with the
+    cursor, so a resumed or restarted import only rewrites its own rows.
+
+    Args:
+        source_file: JSON array, NDJSON or CSV file (optionally .gz)
+        session_maker: SQLAlchemy session maker
+        chunk_size: Features per committed chunk
+
+    Returns:
+        Number of features imported by this call, or None on error
+    """
+    st = source_file.stat()
+    signature = f"{st.st_size}:{st.st_mtime_ns}"
+
+    session: Session = session_maker()
+    try:
+        progress = session.get(ImportProgress, source_file.name)
+        if progress is None or progress.signature != signature:
+            if progress is not None and progress.items_done and not progress.completed:
+                # Restart over our own partial import, keeping its id range
+                print(f"{source_file.name} changed since the last import attempt, starting over", file=sys.stderr)
+                id_offset, priority_offset = progress.id_offset, progress.priority_offset
+            else:
+                id_offset = session.query(func.max(Feature.id)).scalar() or 0
+                priority_offset = session.query(func.max(Feature.priority)).scalar() or 0
+            progress = session.merge(
+                ImportProgress(
+                    source=source_file.name,
+                    signature=signature,
+                    items_done=0,
+                    completed=False,
+                    id_offset=id_offset,
+                    priority_offset=priority_offset,
+                )
+            )
+            session.commit()
+        elif progress.completed:
+            return 0
+        elif progress.items_done:
+            print(f"Resuming import of {source_file.name} after {progress.items_done} features", file=sys.stderr)
+
+        if progress.id_offset:
+            print(
+                f"Appending {source_file.name} after existing features (ids from {progress.id_offset + 1})",
+                file=sys.stderr,
+            )
+
+        start = progress.items_done
+        imported = 0
+        chunk = []
+
+        # Upsert so restarting a changed file over a partial import does not
+        # collide; rows at or below id_offset existed before this import
+        stmt = sqlite_insert(Feature)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Feature.id],
+            set_={name: stmt.excluded[name] for name in IMPORT_COLUMNS if name != "id"},
+            where=Feature.id > progress.id_offset,
+        )
+
+        def commit_chunk(items_done: int) -> None:
+            if chunk:
+                session.execute(stmt, chunk)
+            progress.items_done = items_done
+            session.commit()
+            chunk.clear()
+
+        i = -1
+        for i, feature_dict in enumerate(iter_feature_records(source_file)):
+            if i < start:
+                continue  # Already imported by a previous attempt
+            chunk.append(_feature_row(feature_dict, i, progress.id_offset, progress.priority_offset))
+            imported += 1
+            if len(chunk) >= chunk_size:
+                commit_chunk(i + 1)
+
+        progress.completed = True
+        commit_chunk(max(i + 1, start))
+        return imported
+
+    except Exception as e:
+        session.rollback()
+        print(f"Error during import of {source_file.name}: {e}", file=sys.stderr)
+        return None
+    finally:
+        session.close()
 
 
 def migrate_json_to_sqlite(
@@ -21,13 +287,14 @@ def migrate_json_to_sqlite(
     session_maker: sessionmaker,
 ) -> bool:
     """
-    Detect existing feature_list.json, import to SQLite, rename to backup.
+    Detect an existing feature list file, import to SQLite, rename to backup.
 
     This function:
-    1. Checks if feature_list.json exists
-    2. Checks if database already has data (skips if so)
-    3. Imports all features from JSON
-    4. Renames JSON file to feature_list.json.backup.<timestamp>
+    1. Checks if feature_list.json (or .ndjson, .jsonl, .csv) exists
+    2. Checks if database already has data (skips if so, unless resuming
+       an interrupted import)
+    3. Imports all features in committed chunks (see import_features)
+    4. Renames the file to <name>.backup.<timestamp>
 
     Args:
         project_dir: Directory containing the project
@@ -36,118 +303,129 @@ def migrate_json_to_sqlite(
     Returns:
         True if migration was performed, False if skipped
     """
-    json_file = project_dir / "feature_list.json"
+    source_file = next(
+        (project_dir / name for name in FEATURE_IMPORT_FILES if (project_dir / name).exists()),
+        None,
+    )
 
-    if not json_file.exists():
-        return False  # No JSON file to migrate
+    if source_file is None:
+        return False  # No legacy file to migrate
 
-    # Check if database already has data
+    # Check if database already has data (from something other than this import)
     session: Session = session_maker()
     try:
+        progress = session.get(ImportProgress, source_file.name)
+        resuming = progress is not None and not progress.completed
         existing_count = session.query(Feature).count()
-        if existing_count > 0:
+        if existing_count > 0 and not resuming:
             print(
-                f"Database already has {existing_count} features, skipping migration"
+                f"Database already has {existing_count} features, skipping migration",
+                file=sys.stderr,
             )
             return False
     finally:
         session.close()
 
-    # Load JSON data
-    try:
-        with open(json_file, "r", encoding="utf-8") as f:
-            features_data = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"Error parsing feature_list.json: {e}")
-        return False
-    except IOError as e:
-        print(f"Error reading feature_list.json: {e}")
-        return False
-
-    if not isinstance(features_data, list):
-        print("Error: feature_list.json must contain a JSON array")
+    imported = import_features(source_file, session_maker)
+    if imported is None:
+        print("Import will resume from the last committed chunk on next start", file=sys.stderr)
         return False
 
-    # Import features into database
-    session = session_maker()
-    try:
-        imported_count = 0
-        for i, feature_dict in enumerate(features_data):
-            # Handle both old format (no id/priority/name) and new format
-            feature = Feature(
-                id=feature_dict.get("id", i + 1),
-                priority=feature_dict.get("priority", i + 1),
-                category=feature_dict.get("category", "uncategorized"),
-                name=feature_dict.get("name", f"Feature {i + 1}"),
-                description=feature_dict.get("description", ""),
-                steps=feature_dict.get("steps", []),
-                passes=feature_dict.get("passes", False),
-            )
-            session.add(feature)
-            imported_count += 1
-
-        session.commit()
-
-        # Verify import
-        final_count = session.query(Feature).count()
-        print(f"Migrated {final_count} features from JSON to SQLite")
-
-    except Exception as e:
-        session.rollback()
-        print(f"Error during migration: {e}")
-        return False
-    finally:
-        session.close()
+    print(f"Migrated {imported} features from {source_file.name} to SQLite", file=sys.stderr)
 
-    # Rename JSON file to backup
+    # Rename source file to backup
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = project_dir / f"feature_list.json.backup.{timestamp}"
+    backup_file = project_dir / f"{source_file.name}.backup.{timestamp}"
 
     try:
-        shutil.move(json_file, backup_file)
-        print(f"Original JSON backed up to: {backup_file.name}")
+        shutil.move(source_file, backup_file)
+        print(f"Original file backed up to: {backup_file.name}", file=sys.stderr)
     except IOError as e:
-        print(f"Warning: Could not backup JSON file: {e}")
+        print(f"Warning: Could not backup {source_file.name}: {e}", file=sys.stderr)
         # Continue anyway - the data is in the database
 
     return True
 
 
+# Export formats supported by export_to_json
+EXPORT_FORMATS = ("json", "ndjson")
+
+
 def export_to_json(
     project_dir: Path,
     session_maker: sessionmaker,
     output_file: Optional[Path] = None,
+    format: str = "json",
+    compress: bool = False,
+    phase: Optional[int] = None,
+    passes: Optional[bool] = None,
+    batch_size: int = 500,
 ) -> Path:
     """
     Export features from database back to JSON format.
 
-    Useful for debugging or if you need to revert to the old format.
+    Useful for debugging, backups or analysis, or if you need to revert to
+    the old format. Rows are streamed from the database in batches and
+    written as they arrive, so memory use does not grow with the number
+    of features.
 
     Args:
         project_dir: Directory containing the project
         session_maker: SQLAlchemy session maker
-        output_file: Output file path (default: feature_list_export.json)
+        output_file: Output file path (default: feature_list_export.json,
+            .ndjson for NDJSON, plus .gz when compressed)
+        format: "json" for a pretty-printed array (same layout as
+            feature_list.json) or "ndjson" for one compact object per line
+        compress: Write gzip-compressed output
+        phase: Only export features from this phase
+        passes: Only export passing (True) or pending (False) features
+        batch_size: Number of rows fetched from the database at a time
 
     Returns:
         Path to the exported file
     """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {format!r}, expected one of {EXPORT_FORMATS}")
+
     if output_file is None:
-        output_file = project_dir / "feature_list_export.json"
+        suffix = ".json" if format == "json" else ".ndjson"
+        output_file = project_dir / f"feature_list_export{suffix}{'.gz' if compress else ''}"
+
+    # Every exported feature needs description and steps, so load them with the row
+    statement = (
+        select(Feature)
+        .options(undefer(Feature.description), undefer(Feature.steps))
+        .order_by(Feature.priority.asc(), Feature.id.asc())
+    )
+    if phase is not None:
+        statement = statement.where(Feature.phase == phase)
+    if passes is not None:
+        statement = statement.where(Feature.passes == passes)
 
     session: Session = session_maker()
     try:
-        features = (
-            session.query(Feature)
-            .order_by(Feature.priority.asc(), Feature.id.asc())
-            .all()
-        )
-
-        features_data = [f.to_dict() for f in features]
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(features_data, f, indent=2)
-
-        print(f"Exported {len(features_data)} features to {output_file}")
+        rows = session.execute(statement.execution_options(yield_per=batch_size)).scalars()
+
+        if compress:
+            f = gzip.open(output_file, "wt", encoding="utf-8")
+        else:
+            f = open(output_file, "w", encoding="utf-8")
+
+        count = 0
+        with f:
+            if format == "ndjson":
+                for feature in rows:
+                    f.write(json.dumps(feature.to_dict(), separators=(",", ":")) + "\n")
+                    count += 1
+            else:
+                # Same layout as json.dump(list, f, indent=2), one element at a time
+                for feature in rows:
+                    element = json.dumps(feature.to_dict(), indent=2).replace("\n", "\n  ")
+                    f.write(("[\n  " if count == 0 else ",\n  ") + element)
+                    count += 1
+                f.write("\n]" if count else "[]")
+
+        print(f"Exported {count} features to {output_file}", file=sys.stderr)
         return output_file
 
     finally:
@@ -170,6 +448,9 @@ def migrate_add_phase_column(
 
     Returns:
         True if migration was performed, False if column already exists
+
+    Raises:
+        sqlite3.Error: If the migration fails
     """
     import sqlite3
 
@@ -191,11 +472,464 @@ def migrate_add_phase_column(
         # Add phase column with default value of 1
         cursor.execute("ALTER TABLE features ADD COLUMN phase INTEGER DEFAULT 1 NOT NULL")
         conn.commit()
-        print("Migrated database: added 'phase' column with default value 1")
+        print("Migrated database: added 'phase' column with default value 1", file=sys.stderr)
         return True
 
-    except Exception as e:
-        print(f"Error during phase column migration: {e}")
+    finally:
+        conn.close()
+
+
+def migrate_add_dependencies(
+    project_dir: Path,
+    session_maker: sessionmaker,
+) -> bool:
+    """
+    Add dependency tracking to an existing features table.
+
+    Adds the blocked_by counter column (all existing features start ready)
+    and the ready-set index. The feature_dependencies table itself is created
+    by create_all().
+
+    Args:
+        project_dir: Directory containing the project
+        session_maker: SQLAlchemy session maker
+
+    Returns:
+        True if migration was performed, False if already up to date
+
+    Raises:
+        sqlite3.Error: If the migration fails
+    """
+    import sqlite3
+
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return False  # No database to migrate
+
+    conn = sqlite3.connect(db_file)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(features)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        if "blocked_by" in columns:
+            return False  # Column already exists
+
+        cursor.execute("ALTER TABLE features ADD COLUMN blocked_by INTEGER DEFAULT 0 NOT NULL")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_features_ready "
+            "ON features (phase, passes, blocked_by, priority, id)"
+        )
+        conn.commit()
+        print("Migrated database: added dependency tracking ('blocked_by' column)", file=sys.stderr)
+        return True
+
+    finally:
+        conn.close()
+
+
+def migrate_add_search_index(
+    project_dir: Path,
+    session_maker: sessionmaker,
+) -> bool:
+    """
+    Create the FTS5 full-text search index over features if it doesn't exist.
+
+    Creates the features_fts table and its sync triggers, then indexes any
+    existing features. Does nothing if SQLite was built without FTS5
+    (feature_search then falls back to LIKE matching).
+
+    Args:
+        project_dir: Directory containing the project
+        session_maker: SQLAlchemy session maker
+
+    Returns:
+        True if the index was created, False if it already exists or is unavailable
+    """
+    import sqlite3
+
+    from api.database import SEARCH_INDEX_SCHEMA
+
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return False  # No database to migrate
+
+    conn = sqlite3.connect(db_file)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'features_fts'")
+        if cursor.fetchone():
+            return False  # Index already exists
+
+        for statement in SEARCH_INDEX_SCHEMA:
+            cursor.execute(statement)
+        # Index features that existed before the triggers did
+        cursor.execute("INSERT INTO features_fts(features_fts) VALUES ('rebuild')")
+        conn.commit()
+        print("Migrated database: added full-text search index", file=sys.stderr)
+        return True
+
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        if "no such module" not in str(e):
+            raise
+        print(f"Full-text search unavailable ({e}); feature_search will use LIKE matching", file=sys.stderr)
         return False
     finally:
         conn.close()
+
+
+def migrate_add_verification(
+    project_dir: Path,
+    session_maker: sessionmaker,
+) -> bool:
+    """
+    Add regression verification tracking to an existing features table.
+
+    Adds the last_verified_at and verification_count columns (all existing
+    features start unverified) and the regression queue index.
+
+    Args:
+        project_dir: Directory containing the project
+        session_maker: SQLAlchemy session maker
+
+    Returns:
+        True if migration was performed, False if already up to date
+
+    Raises:
+        sqlite3.Error: If the migration fails
+    """
+    import sqlite3
+
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return False  # No database to migrate
+
+    conn = sqlite3.connect(db_file)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("PRAGMA table_info(features)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        if "last_verified_at" in columns:
+            return False  # Columns already exist
+
+        cursor.execute("ALTER TABLE features ADD COLUMN last_verified_at VARCHAR(32)")
+        cursor.execute("ALTER TABLE features ADD COLUMN verification_count INTEGER DEFAULT 0 NOT NULL")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_features_regression "
+            "ON features (phase, passes, last_verified_at, id)"
+        )
+        conn.commit()
+        print("Migrated database: added regression verification tracking", file=sys.stderr)
+        return True
+
+    finally:
+        conn.close()
+
+
+def migrate_hot_columns_first(
+    project_dir: Path,
+    session_maker: sessionmaker,
+) -> bool:
+    """
+    Rebuild the features table with description and steps as its last columns.
+
+    SQLite reads a row's columns in order, so with the heavy columns in the
+    middle (where older schemas had them, with later columns appended after)
+    every read of passes or phase walks past them, including their overflow
+    pages. The table is copied in one transaction, keeping feature IDs, so
+    dependency edges, events and the search index stay valid. Also adds the
+    ix_features_stats index for progress counts.
+
+    Args:
+        project_dir: Directory containing the project
+        session_maker: SQLAlchemy session maker
+
+    Returns:
+        True if the table was rebuilt, False if it already has this layout
+
+    Raises:
+        sqlite3.Error: If the migration fails
+    """
+    import sqlite3
+
+    from sqlalchemy.dialects import sqlite as sqlite_dialect
+    from sqlalchemy.schema import CreateIndex, CreateTable
+
+    from api.database import SEARCH_INDEX_SCHEMA
+    from api.storage import HEAVY_COLUMNS
+
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return False  # No database to migrate
+
+    dialect = sqlite_dialect.dialect()
+    table = Feature.__table__
+    conn = sqlite3.connect(db_file)
+
+    try:
+        columns = [col[1] for col in conn.execute("PRAGMA table_info(features)")]
+        if set(columns[-len(HEAVY_COLUMNS):]) == set(HEAVY_COLUMNS):
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_features_stats ON features (phase, category, passes)")
+            conn.commit()
+            return False  # Already laid out hot columns first
+
+        has_search_index = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'features_fts'"
+        ).fetchone() is not None
+        # Columns added by later migrations are created empty and filled in by them
+        column_list = ", ".join(column.name for column in table.columns if column.name in columns)
+
+        conn.execute("BEGIN")
+        conn.execute(str(CreateTable(table).compile(dialect=dialect)).replace(
+            "CREATE TABLE features ", "CREATE TABLE features_rebuild ", 1
+        ))
+        conn.execute(f"INSERT INTO features_rebuild ({column_list}) SELECT {column_list} FROM features")
+        # Dropping the table also drops its indexes and search index triggers
+        conn.execute("DROP TABLE features")
+        conn.execute("ALTER TABLE features_rebuild RENAME TO features")
+        for index in table.indexes:
+            conn.execute(str(CreateIndex(index).compile(dialect=dialect)))
+        if has_search_index:
+            # The FTS table itself is keyed by feature ID and stays in sync
+            for statement in SEARCH_INDEX_SCHEMA[1:]:
+                conn.execute(statement)
+        conn.commit()
+        print("Migrated database: moved description and steps to the end of feature rows", file=sys.stderr)
+        return True
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def migrate_add_feature_section(
+    project_dir: Path,
+    session_maker: sessionmaker,
+) -> bool:
+    """
+    Add the section column, recording which spec section a feature was created for.
+
+    The column is added ahead of description and steps (see
+    migrate_hot_columns_first); existing features get NULL.
+
+    Args:
+        project_dir: Directory containing the project
+        session_maker: SQLAlchemy session maker
+
+    Returns:
+        True if migration was performed, False if already up to date
+
+    Raises:
+        sqlite3.Error: If the migration fails
+    """
+    import sqlite3
+
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return False  # No database to migrate
+
+    conn = sqlite3.connect(db_file)
+    try:
+        columns = [col[1] for col in conn.execute("PRAGMA table_info(features)")]
+        if "section" in columns:
+            return False  # Column already exists
+
+        conn.execute("ALTER TABLE features ADD COLUMN section VARCHAR(100)")
+        conn.commit()
+    finally:
+        conn.close()
+
+    # ALTER TABLE appends the column after the heavy ones
+    migrate_hot_columns_first(project_dir, session_maker)
+    print("Migrated database: added feature 'section' column", file=sys.stderr)
+    return True
+
+
+def migrate_add_import_offsets(
+    project_dir: Path,
+    session_maker: sessionmaker,
+) -> bool:
+    """
+    Add the id_offset and priority_offset columns to import_progress.
+
+    Existing cursors get 0, which is how their imports were numbered.
+
+    Args:
+        project_dir: Directory containing the project
+        session_maker: SQLAlchemy session maker
+
+    Returns:
+        True if migration was performed, False if already up to date
+
+    Raises:
+        sqlite3.Error: If the migration fails
+    """
+    import sqlite3
+
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return False  # No database to migrate
+
+    conn = sqlite3.connect(db_file)
+    try:
+        columns = [col[1] for col in conn.execute("PRAGMA table_info(import_progress)")]
+        missing = [name for name in ("id_offset", "priority_offset") if name not in columns]
+        if not missing:
+            return False  # Columns already exist
+
+        for name in missing:
+            conn.execute(f"ALTER TABLE import_progress ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0")
+        conn.commit()
+    finally:
+        conn.close()
+
+    print("Migrated database: added import_progress id and priority offsets", file=sys.stderr)
+    return True
+
+
+# Ordered schema migrations: (version, description, function). A database at
+# PRAGMA user_version N has had every migration up to N applied. Each function
+# must be safe to run on a database that already has the change, since new
+# databases are created with the full schema before the migrations run.
+# Versions that only add tables have no function: create_all() creates them.
+SCHEMA_MIGRATIONS = [
+    (1, "add phase column", migrate_add_phase_column),
+    (2, "add dependency tracking", migrate_add_dependencies),
+    (3, "add full-text search index", migrate_add_search_index),
+    (4, "add feature event history", None),
+    (5, "add regression verification tracking", migrate_add_verification),
+    (6, "store hot feature columns first", migrate_hot_columns_first),
+    (7, "add initializer spec section checkpoints", None),
+    (8, "add feature section column", migrate_add_feature_section),
+    (9, "add import offsets", migrate_add_import_offsets),
+]
+
+
+def get_schema_version(project_dir: Path) -> int:
+    """Read a project's schema version (PRAGMA user_version), 0 if unversioned."""
+    import sqlite3
+
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return 0
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def run_schema_migrations(
+    project_dir: Path,
+    session_maker: sessionmaker,
+    version: int,
+) -> int:
+    """
+    Apply the schema migrations newer than a database's version, in order.
+
+    The database's user_version is advanced after each migration, so a failed
+    migration is retried on the next start and later ones are not attempted.
+
+    Args:
+        project_dir: Directory containing the project
+        session_maker: SQLAlchemy session maker
+        version: The database's current schema version
+
+    Returns:
+        Number of migrations applied
+    """
+    import sqlite3
+
+    db_file = project_dir / "features.db"
+    applied = 0
+
+    for target, description, migrate in SCHEMA_MIGRATIONS:
+        if target <= version:
+            continue
+        try:
+            if migrate is not None:
+                migrate(project_dir, session_maker)
+        except Exception as e:
+            print(f"Error during schema migration {target} ({description}): {e}", file=sys.stderr)
+            break
+
+        conn = sqlite3.connect(db_file)
+        try:
+            conn.execute(f"PRAGMA user_version = {int(target)}")
+            conn.commit()
+        finally:
+            conn.close()
+        applied += 1
+
+    return applied
+
+
+def main() -> None:
+    """Command line entry point for imports and exports."""
+    import argparse
+
+    from api.database import create_database, get_database_path
+
+    parser = argparse.ArgumentParser(description="Feature database import/export")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export features to JSON or NDJSON")
+    export_parser.add_argument("--project-dir", type=Path, required=True, help="Project directory")
+    export_parser.add_argument("--output", type=Path, default=None, help="Output file")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="json", help="Output format")
+    export_parser.add_argument("--gzip", action="store_true", help="Compress output with gzip")
+    export_parser.add_argument("--phase", type=int, default=None, help="Only export this phase")
+    export_parser.add_argument(
+        "--passes",
+        choices=["true", "false"],
+        default=None,
+        help="Only export passing (true) or pending (false) features",
+    )
+
+    import_parser = subparsers.add_parser(
+        "import", help="Import features from a JSON, NDJSON or CSV file (resumable)"
+    )
+    import_parser.add_argument("--project-dir", type=Path, required=True, help="Project directory")
+    import_parser.add_argument("--input", type=Path, required=True, help="Input file (optionally .gz)")
+    import_parser.add_argument(
+        "--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Features per committed chunk"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "import" and not args.input.exists():
+        parser.error(f"Input file not found: {args.input}")
+
+    if args.command == "export" and not get_database_path(args.project_dir).exists():
+        parser.error(f"No features.db found in {args.project_dir}")
+
+    engine, session_maker = create_database(args.project_dir)
+    try:
+        if args.command == "export":
+            export_to_json(
+                args.project_dir,
+                session_maker,
+                output_file=args.output,
+                format=args.format,
+                compress=args.gzip,
+                phase=args.phase,
+                passes=None if args.passes is None else args.passes == "true",
+            )
+        elif args.command == "import":
+            imported = import_features(args.input, session_maker, chunk_size=args.chunk_size)
+            if imported is None:
+                sys.exit(1)
+            print(f"Imported {imported} features from {args.input.name}")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,801 @@
+"""
+Feature Storage Backends
+========================
+
+Storage operations behind the feature MCP tools, with two implementations:
+
+- "orm": SQLAlchemy ORM sessions (the reference implementation)
+- "sqlite": a single sqlite3 connection running fixed SQL statements, which
+  sqlite3's statement cache keeps prepared, and returning dicts directly
+
+Both backends read and write the same features.db schema and must return
+identical results; test_features.py checks this and
+benchmarks/bench_feature_store.py compares their per-tool latency.
+
+The backend is chosen with the FEATURES_BACKEND environment variable
+(default: "sqlite"). Stores are safe to call from several threads: the
+features server runs reads on a worker pool and writes on one writer
+thread, and databases are opened in WAL mode so readers never wait for
+the writer.
+"""
+
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+
+STORAGE_BACKENDS = ("sqlite", "orm")
+DEFAULT_BACKEND = "sqlite"
+
+# SQLite journal modes accepted by open_feature_store()
+JOURNAL_MODES = ("delete", "truncate", "persist", "wal")
+DEFAULT_JOURNAL_MODE = "wal"
+
+# Feature columns in to_dict() order
+FEATURE_COLUMNS = (
+    "id", "priority", "category", "name", "description", "steps", "passes", "phase", "blocked_by",
+    "last_verified_at", "verification_count",
+)
+
+# Large columns, only read for the tools that return them; the rest are "hot"
+HEAVY_COLUMNS = ("description", "steps")
+HOT_COLUMNS = tuple(column for column in FEATURE_COLUMNS if column not in HEAVY_COLUMNS)
+
+# Statements kept prepared by the sqlite backend's connection
+STATEMENT_CACHE_SIZE = 64
+
+# Fields of a search result, in result order
+SEARCH_FIELDS = ("id", "priority", "category", "name", "passes", "phase", "snippet")
+
+# Shared search SQL: ranked FTS5 query and the LIKE fallback for builds without FTS5
+SEARCH_COLUMNS = "f.id, f.priority, f.category, f.name, f.passes, f.phase"
+FTS_SEARCH_SQL = (
+    f"SELECT {SEARCH_COLUMNS}, snippet(features_fts, 1, '[', ']', '...', 12) AS snippet "
+    "FROM features_fts JOIN features f ON f.id = features_fts.rowid "
+    "WHERE features_fts MATCH :query{filters} "
+    "ORDER BY bm25(features_fts, 10.0, 3.0, 1.0) LIMIT :limit"
+)
+LIKE_SEARCH_SQL = (
+    f"SELECT {SEARCH_COLUMNS}, substr(f.description, 1, 80) AS snippet FROM features f "
+    "WHERE (f.name LIKE :pattern OR f.description LIKE :pattern){filters} "
+    "ORDER BY f.priority, f.id LIMIT :limit"
+)
+
+
+def event_time() -> str:
+    """Current UTC time in the feature_events timestamp format."""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def fts_query(query: str) -> str:
+    """Quote each term so arbitrary input is a valid FTS5 query (terms are ANDed)."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def select_columns(fields) -> tuple[str, ...]:
+    """Feature columns to load for a set of requested fields (all if None, id always)."""
+    if fields is None:
+        return FEATURE_COLUMNS
+    wanted = {"id", *fields}
+    return tuple(column for column in FEATURE_COLUMNS if column in wanted)
+
+
+def _search_filters(phase: Optional[int], passes: Optional[bool]) -> tuple[str, dict]:
+    filters = ""
+    params: dict = {}
+    if phase is not None:
+        filters += " AND f.phase = :phase"
+        params["phase"] = phase
+    if passes is not None:
+        filters += " AND f.passes = :passes"
+        params["passes"] = passes
+    return filters, params
+
+
+def _search_result(row) -> dict:
+    result = dict(zip(SEARCH_FIELDS, row))
+    result["passes"] = bool(result["passes"])
+    return result
+
+
+class FeatureStore(ABC):
+    """
+    Storage operations used by the feature tools.
+
+    Features are returned as dicts in Feature.to_dict() form. Reads that take
+    columns return only those keys (in FEATURE_COLUMNS order) and leave the
+    other columns unread. Validation and dependency bookkeeping decisions stay
+    in the tools; the store only runs the queries.
+    """
+
+    @abstractmethod
+    def grouped_counts(self) -> list[tuple[int, str, int, int]]:
+        """Get (phase, category, total, passing) rows."""
+
+    @abstractmethod
+    def next_ready(self, phase: int, limit: int, columns: tuple[str, ...] = FEATURE_COLUMNS) -> list[dict]:
+        """Get pending features with no unsatisfied dependencies, in queue order."""
+
+    @abstractmethod
+    def count_pending(self, phase: int) -> int:
+        """Count features of a phase that are not passing."""
+
+    @abstractmethod
+    def least_recently_verified(
+        self,
+        phase: int,
+        limit: int,
+        columns: tuple[str, ...] = FEATURE_COLUMNS,
+    ) -> list[dict]:
+        """Get passing features of a phase, never verified first, then oldest verification first."""
+
+    @abstractmethod
+    def get(self, feature_id: int, columns: tuple[str, ...] = FEATURE_COLUMNS) -> Optional[dict]:
+        """Get a feature by ID, or None if it does not exist."""
+
+    @abstractmethod
+    def mark_passing(self, feature_id: int, session_id: Optional[str] = None) -> Optional[dict]:
+        """
+        Mark a feature as passing and release its dependents.
+
+        Dependents' blocked_by counters are only decremented, and a "passed"
+        event recorded, on the transition to passing.
+
+        Returns:
+            The updated feature, or None if it does not exist
+        """
+
+    @abstractmethod
+    def mark_failing(self, feature_id: int, session_id: Optional[str] = None) -> Optional[dict]:
+        """
+        Mark a passing feature as failing again and re-block its dependents.
+
+        Dependents' blocked_by counters are only incremented, and a "failed"
+        event recorded, on the transition from passing.
+
+        Returns:
+            The updated feature, or None if it does not exist
+        """
+
+    @abstractmethod
+    def record_verification(
+        self,
+        feature_id: int,
+        passed: bool,
+        session_id: Optional[str] = None,
+    ) -> Optional[dict]:
+        """
+        Record a regression check of a feature.
+
+        Stamps last_verified_at and increments verification_count, then sets
+        passes to the result with the same transition handling as
+        mark_passing()/mark_failing().
+
+        Returns:
+            The updated feature, or None if it does not exist
+        """
+
+    @abstractmethod
+    def move_to_end(self, feature_id: int, session_id: Optional[str] = None) -> int:
+        """Give a feature the lowest priority of all features and record a "skipped" event."""
+
+    @abstractmethod
+    def record_served(self, feature_ids: list[int], session_id: Optional[str] = None) -> None:
+        """Record "served" events for features handed out as work."""
+
+    @abstractmethod
+    def passes_by_id(self, feature_ids: set[int]) -> dict[int, bool]:
+        """Get the passing state of existing features (missing IDs are left out)."""
+
+    @abstractmethod
+    def create_features(self, phase: int, features: list[dict], section: Optional[str] = None) -> int:
+        """
+        Insert a batch of features after the phase's current last priority.
+
+        Args:
+            phase: Phase of the new features
+            features: Dicts with category, name, description, steps, blocked_by
+                and optionally depends_on (batch indices) and depends_on_ids
+            section: Spec section the batch covers, recorded as completed in
+                the same transaction
+
+        Returns:
+            Number of features created
+        """
+
+    @abstractmethod
+    def completed_sections(self, phase: int) -> dict[str, int]:
+        """Get the spec sections of a phase that have their features, with the number created."""
+
+    @abstractmethod
+    def search(
+        self,
+        query: str,
+        phase: Optional[int],
+        passes: Optional[bool],
+        limit: int,
+    ) -> list[dict]:
+        """
+        Ranked full-text search, falling back to LIKE matching without FTS5.
+
+        The query is tried as FTS5 syntax first, then with every term quoted.
+        """
+
+    def close(self) -> None:
+        """Release the store's database resources."""
+
+
+class OrmFeatureStore(FeatureStore):
+    """Reference backend using SQLAlchemy ORM sessions."""
+
+    def __init__(self, engine, session_maker):
+        self.engine = engine
+        self.session_maker = session_maker
+
+    @staticmethod
+    def _load_only(columns: tuple[str, ...]):
+        """Loader option reading only these columns (description and steps are deferred)."""
+        from sqlalchemy.orm import load_only
+
+        from api.database import Feature
+
+        return load_only(*(getattr(Feature, column) for column in columns))
+
+    @staticmethod
+    def _feature(feature, columns: tuple[str, ...]) -> dict:
+        return {column: getattr(feature, column) for column in columns}
+
+    def grouped_counts(self) -> list[tuple[int, str, int, int]]:
+        from sqlalchemy import Integer, cast, func
+
+        from api.database import Feature
+
+        with self.session_maker() as session:
+            # SUM over the Boolean column itself would be typed (and converted) as Boolean
+            return [
+                tuple(row)
+                for row in session.query(
+                    Feature.phase,
+                    Feature.category,
+                    func.count(Feature.id),
+                    func.coalesce(func.sum(cast(Feature.passes, Integer)), 0),
+                ).group_by(Feature.phase, Feature.category)
+            ]
+
+    def next_ready(self, phase: int, limit: int, columns: tuple[str, ...] = FEATURE_COLUMNS) -> list[dict]:
+        from api.database import Feature
+
+        with self.session_maker() as session:
+            # Ready set lookup: a single range scan of ix_features_ready
+            features = (
+                session.query(Feature)
+                .options(self._load_only(columns))
+                .filter(
+                    Feature.phase == phase,
+                    Feature.passes == False,
+                    Feature.blocked_by == 0,
+                )
+                .order_by(Feature.priority.asc(), Feature.id.asc())
+                .limit(limit)
+                .all()
+            )
+            return [self._feature(f, columns) for f in features]
+
+    def count_pending(self, phase: int) -> int:
+        from api.database import Feature
+
+        with self.session_maker() as session:
+            return (
+                session.query(Feature)
+                .filter(Feature.passes == False, Feature.phase == phase)
+                .count()
+            )
+
+    def least_recently_verified(
+        self,
+        phase: int,
+        limit: int,
+        columns: tuple[str, ...] = FEATURE_COLUMNS,
+    ) -> list[dict]:
+        from api.database import Feature
+
+        with self.session_maker() as session:
+            # Regression queue: a single range scan of ix_features_regression
+            features = (
+                session.query(Feature)
+                .options(self._load_only(columns))
+                .filter(Feature.phase == phase, Feature.passes == True)
+                .order_by(Feature.last_verified_at.asc(), Feature.id.asc())
+                .limit(limit)
+                .all()
+            )
+            return [self._feature(f, columns) for f in features]
+
+    def get(self, feature_id: int, columns: tuple[str, ...] = FEATURE_COLUMNS) -> Optional[dict]:
+        from api.database import Feature
+
+        with self.session_maker() as session:
+            feature = session.get(Feature, feature_id, options=[self._load_only(columns)])
+            return self._feature(feature, columns) if feature is not None else None
+
+    def _set_passes(
+        self,
+        feature_id: int,
+        passes: bool,
+        session_id: Optional[str],
+        verified: bool = False,
+    ) -> Optional[dict]:
+        from api.database import Feature, FeatureDependency, FeatureEvent
+
+        with self.session_maker() as session:
+            feature = session.get(Feature, feature_id)
+            if feature is None:
+                return None
+
+            changed = feature.passes != passes
+            if verified:
+                feature.last_verified_at = event_time()
+                feature.verification_count += 1
+            if changed:
+                feature.passes = passes
+                # Passing releases one dependency of every dependent; failing blocks it again
+                dependents = session.query(FeatureDependency.feature_id).filter(
+                    FeatureDependency.depends_on_id == feature_id
+                )
+                session.query(Feature).filter(Feature.id.in_(dependents.scalar_subquery())).update(
+                    {Feature.blocked_by: Feature.blocked_by + (-1 if passes else 1)},
+                    synchronize_session=False,
+                )
+                session.add(FeatureEvent(
+                    feature_id=feature_id,
+                    event="passed" if passes else "failed",
+                    session_id=session_id,
+                    created_at=event_time(),
+                ))
+            if changed or verified:
+                session.commit()
+                session.refresh(feature)
+
+            return feature.to_dict()
+
+    def mark_passing(self, feature_id: int, session_id: Optional[str] = None) -> Optional[dict]:
+        return self._set_passes(feature_id, True, session_id)
+
+    def mark_failing(self, feature_id: int, session_id: Optional[str] = None) -> Optional[dict]:
+        return self._set_passes(feature_id, False, session_id)
+
+    def record_verification(
+        self,
+        feature_id: int,
+        passed: bool,
+        session_id: Optional[str] = None,
+    ) -> Optional[dict]:
+        return self._set_passes(feature_id, passed, session_id, verified=True)
+
+    def move_to_end(self, feature_id: int, session_id: Optional[str] = None) -> int:
+        from api.database import Feature, FeatureEvent
+
+        with self.session_maker() as session:
+            # Get max priority and set this feature to max + 1
+            max_priority_result = session.query(Feature.priority).order_by(Feature.priority.desc()).first()
+            new_priority = (max_priority_result[0] + 1) if max_priority_result else 1
+            session.query(Feature).filter(Feature.id == feature_id).update({Feature.priority: new_priority})
+            session.add(FeatureEvent(
+                feature_id=feature_id, event="skipped", session_id=session_id, created_at=event_time()
+            ))
+            session.commit()
+            return new_priority
+
+    def record_served(self, feature_ids: list[int], session_id: Optional[str] = None) -> None:
+        from api.database import FeatureEvent
+
+        if not feature_ids:
+            return
+        with self.session_maker() as session:
+            now = event_time()
+            session.add_all(
+                FeatureEvent(feature_id=feature_id, event="served", session_id=session_id, created_at=now)
+                for feature_id in feature_ids
+            )
+            session.commit()
+
+    def passes_by_id(self, feature_ids: set[int]) -> dict[int, bool]:
+        from api.database import Feature
+
+        if not feature_ids:
+            return {}
+        with self.session_maker() as session:
+            return dict(
+                session.query(Feature.id, Feature.passes).filter(Feature.id.in_(feature_ids)).all()
+            )
+
+    def create_features(self, phase: int, features: list[dict], section: Optional[str] = None) -> int:
+        from api.database import Feature, FeatureDependency, SpecSection
+
+        with self.session_maker() as session:
+            try:
+                # Get the starting priority for this phase
+                max_priority_result = (
+                    session.query(Feature.priority)
+                    .filter(Feature.phase == phase)
+                    .order_by(Feature.priority.desc())
+                    .first()
+                )
+                start_priority = (max_priority_result[0] + 1) if max_priority_result else 1
+
+                db_features = []
+                for i, feature_data in enumerate(features):
+                    db_feature = Feature(
+                        priority=start_priority + i,
+                        category=feature_data["category"],
+                        name=feature_data["name"],
+                        description=feature_data["description"],
+                        steps=feature_data["steps"],
+                        passes=False,
+                        phase=phase,
+                        blocked_by=feature_data["blocked_by"],
+                        section=section,
+                    )
+                    session.add(db_feature)
+                    db_features.append(db_feature)
+
+                # Assign IDs so dependency edges can reference the new features
+                session.flush()
+
+                for db_feature, feature_data in zip(db_features, features):
+                    deps = {db_features[d].id for d in feature_data.get("depends_on", [])}
+                    deps.update(feature_data.get("depends_on_ids", []))
+                    for dep_id in deps:
+                        session.add(FeatureDependency(feature_id=db_feature.id, depends_on_id=dep_id))
+
+                if section is not None:
+                    session.add(SpecSection(
+                        phase=phase, name=section, features_created=len(db_features), completed_at=event_time()
+                    ))
+
+                session.commit()
+                return len(db_features)
+            except Exception:
+                session.rollback()
+                raise
+
+    def completed_sections(self, phase: int) -> dict[str, int]:
+        from api.database import SpecSection
+
+        with self.session_maker() as session:
+            return dict(
+                session.query(SpecSection.name, SpecSection.features_created)
+                .filter(SpecSection.phase == phase)
+                .all()
+            )
+
+    def search(
+        self,
+        query: str,
+        phase: Optional[int],
+        passes: Optional[bool],
+        limit: int,
+    ) -> list[dict]:
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+
+        filters, params = _search_filters(phase, passes)
+        params["limit"] = limit
+
+        with self.session_maker() as session:
+            fts_sql = text(FTS_SEARCH_SQL.format(filters=filters))
+            for candidate in dict.fromkeys([query, fts_query(query)]):
+                try:
+                    rows = session.execute(fts_sql, {**params, "query": candidate}).all()
+                    return [_search_result(row) for row in rows]
+                except OperationalError as e:
+                    session.rollback()
+                    if "no such table" in str(e.orig):
+                        break  # No FTS5 index in this database
+
+            like_sql = text(LIKE_SEARCH_SQL.format(filters=filters))
+            rows = session.execute(like_sql, {**params, "pattern": f"%{query}%"}).all()
+            return [_search_result(row) for row in rows]
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+
+class SqliteFeatureStore(FeatureStore):
+    """
+    Lean backend on plain sqlite3 connections.
+
+    Every operation uses a fixed SQL string, so sqlite3's per-connection
+    statement cache reuses the prepared statement on each call. Writes go
+    through one connection, serialized with a lock; reads use a read-only
+    connection per calling thread, so they run concurrently with each other
+    and (in WAL mode) with a write in progress.
+    """
+
+    # Feature reads take the selected columns; each column set is its own cached statement
+    _SELECT = "SELECT {columns} FROM features"
+
+    _NEXT_READY = (
+        _SELECT + " WHERE phase = ? AND passes = 0 AND blocked_by = 0 "
+        "ORDER BY priority, id LIMIT ?"
+    )
+    _COUNT_PENDING = "SELECT COUNT(*) FROM features WHERE passes = 0 AND phase = ?"
+    _LEAST_RECENTLY_VERIFIED = (
+        _SELECT + " WHERE phase = ? AND passes = 1 ORDER BY last_verified_at, id LIMIT ?"
+    )
+    _GET = _SELECT + " WHERE id = ?"
+    _GET_FULL = _GET.format(columns=", ".join(FEATURE_COLUMNS))
+    _GROUPED_COUNTS = (
+        "SELECT phase, category, COUNT(id), COALESCE(SUM(passes), 0) "
+        "FROM features GROUP BY phase, category"
+    )
+    _SET_PASSES = "UPDATE features SET passes = ? WHERE id = ? AND passes = ?"
+    _SET_VERIFIED = (
+        "UPDATE features SET last_verified_at = ?, verification_count = verification_count + 1 "
+        "WHERE id = ?"
+    )
+    _ADJUST_DEPENDENTS = (
+        "UPDATE features SET blocked_by = blocked_by + ? WHERE id IN "
+        "(SELECT feature_id FROM feature_dependencies WHERE depends_on_id = ?)"
+    )
+    _INSERT_EVENT = (
+        "INSERT INTO feature_events (feature_id, event, session_id, created_at) VALUES (?, ?, ?, ?)"
+    )
+    _MAX_PRIORITY = "SELECT MAX(priority) FROM features"
+    _MAX_PHASE_PRIORITY = "SELECT MAX(priority) FROM features WHERE phase = ?"
+    _SET_PRIORITY = "UPDATE features SET priority = ? WHERE id = ?"
+    _INSERT = (
+        "INSERT INTO features "
+        "(priority, category, name, description, steps, passes, phase, blocked_by, verification_count, section) "
+        "VALUES (?, ?, ?, ?, ?, 0, ?, ?, 0, ?)"
+    )
+    _INSERT_DEPENDENCY = "INSERT INTO feature_dependencies (feature_id, depends_on_id) VALUES (?, ?)"
+    _INSERT_SECTION = (
+        "INSERT INTO spec_sections (phase, name, features_created, completed_at) VALUES (?, ?, ?, ?)"
+    )
+    _COMPLETED_SECTIONS = "SELECT name, features_created FROM spec_sections WHERE phase = ?"
+
+    def __init__(self, db_path: Path, timeout: float = 5.0):
+        """
+        Args:
+            db_path: Path of the features database
+            timeout: Seconds each connection waits for a lock (busy timeout)
+        """
+        self.db_path = Path(db_path)
+        self.timeout = timeout
+        self._conn = sqlite3.connect(
+            self.db_path,
+            timeout=timeout,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    def _reader(self) -> sqlite3.Connection:
+        """Get this thread's read-only connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.timeout,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+            )
+            conn.execute("PRAGMA query_only = ON")
+            with self._readers_lock:
+                self._readers.append(conn)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _feature(row: tuple, columns: tuple[str, ...] = FEATURE_COLUMNS) -> dict:
+        feature = dict(zip(columns, row))
+        if "steps" in feature:
+            feature["steps"] = json.loads(feature["steps"])
+        if "passes" in feature:
+            feature["passes"] = bool(feature["passes"])
+        return feature
+
+    def _read_features(self, sql: str, params: tuple, columns: tuple[str, ...]) -> list[dict]:
+        rows = self._reader().execute(sql.format(columns=", ".join(columns)), params).fetchall()
+        return [self._feature(row, columns) for row in rows]
+
+    def grouped_counts(self) -> list[tuple[int, str, int, int]]:
+        return self._reader().execute(self._GROUPED_COUNTS).fetchall()
+
+    def next_ready(self, phase: int, limit: int, columns: tuple[str, ...] = FEATURE_COLUMNS) -> list[dict]:
+        return self._read_features(self._NEXT_READY, (phase, limit), columns)
+
+    def count_pending(self, phase: int) -> int:
+        return self._reader().execute(self._COUNT_PENDING, (phase,)).fetchone()[0]
+
+    def least_recently_verified(
+        self,
+        phase: int,
+        limit: int,
+        columns: tuple[str, ...] = FEATURE_COLUMNS,
+    ) -> list[dict]:
+        return self._read_features(self._LEAST_RECENTLY_VERIFIED, (phase, limit), columns)
+
+    def get(self, feature_id: int, columns: tuple[str, ...] = FEATURE_COLUMNS) -> Optional[dict]:
+        features = self._read_features(self._GET, (feature_id,), columns)
+        return features[0] if features else None
+
+    def _set_passes(
+        self,
+        feature_id: int,
+        passes: bool,
+        session_id: Optional[str],
+        verified: bool = False,
+    ) -> Optional[dict]:
+        with self._lock, self._conn:
+            if verified:
+                self._conn.execute(self._SET_VERIFIED, (event_time(), feature_id))
+            # Adjust dependents only if this call is the one that changed the state:
+            # passing releases one dependency of every dependent, failing blocks it again
+            if self._conn.execute(self._SET_PASSES, (passes, feature_id, not passes)).rowcount:
+                self._conn.execute(self._ADJUST_DEPENDENTS, (-1 if passes else 1, feature_id))
+                self._conn.execute(self._INSERT_EVENT, (
+                    feature_id, "passed" if passes else "failed", session_id, event_time()
+                ))
+            row = self._conn.execute(self._GET_FULL, (feature_id,)).fetchone()
+        return self._feature(row) if row is not None else None
+
+    def mark_passing(self, feature_id: int, session_id: Optional[str] = None) -> Optional[dict]:
+        return self._set_passes(feature_id, True, session_id)
+
+    def mark_failing(self, feature_id: int, session_id: Optional[str] = None) -> Optional[dict]:
+        return self._set_passes(feature_id, False, session_id)
+
+    def record_verification(
+        self,
+        feature_id: int,
+        passed: bool,
+        session_id: Optional[str] = None,
+    ) -> Optional[dict]:
+        return self._set_passes(feature_id, passed, session_id, verified=True)
+
+    def move_to_end(self, feature_id: int, session_id: Optional[str] = None) -> int:
+        with self._lock, self._conn:
+            max_priority = self._conn.execute(self._MAX_PRIORITY).fetchone()[0]
+            new_priority = (max_priority + 1) if max_priority is not None else 1
+            self._conn.execute(self._SET_PRIORITY, (new_priority, feature_id))
+            self._conn.execute(self._INSERT_EVENT, (feature_id, "skipped", session_id, event_time()))
+        return new_priority
+
+    def record_served(self, feature_ids: list[int], session_id: Optional[str] = None) -> None:
+        if not feature_ids:
+            return
+        now = event_time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                self._INSERT_EVENT, [(feature_id, "served", session_id, now) for feature_id in feature_ids]
+            )
+
+    def passes_by_id(self, feature_ids: set[int]) -> dict[int, bool]:
+        if not feature_ids:
+            return {}
+        ids = sorted(feature_ids)
+        sql = f"SELECT id, passes FROM features WHERE id IN ({', '.join('?' * len(ids))})"
+        return {fid: bool(passes) for fid, passes in self._reader().execute(sql, ids)}
+
+    def create_features(self, phase: int, features: list[dict], section: Optional[str] = None) -> int:
+        with self._lock, self._conn:
+            max_priority = self._conn.execute(self._MAX_PHASE_PRIORITY, (phase,)).fetchone()[0]
+            start_priority = (max_priority + 1) if max_priority is not None else 1
+
+            ids = []
+            for i, feature_data in enumerate(features):
+                cursor = self._conn.execute(self._INSERT, (
+                    start_priority + i,
+                    feature_data["category"],
+                    feature_data["name"],
+                    feature_data["description"],
+                    json.dumps(feature_data["steps"]),
+                    phase,
+                    feature_data["blocked_by"],
+                    section,
+                ))
+                ids.append(cursor.lastrowid)
+
+            edges = []
+            for feature_id, feature_data in zip(ids, features):
+                deps = {ids[d] for d in feature_data.get("depends_on", [])}
+                deps.update(feature_data.get("depends_on_ids", []))
+                edges.extend((feature_id, dep_id) for dep_id in deps)
+            self._conn.executemany(self._INSERT_DEPENDENCY, edges)
+
+            if section is not None:
+                self._conn.execute(self._INSERT_SECTION, (phase, section, len(ids), event_time()))
+
+        return len(ids)
+
+    def completed_sections(self, phase: int) -> dict[str, int]:
+        return dict(self._reader().execute(self._COMPLETED_SECTIONS, (phase,)).fetchall())
+
+    def search(
+        self,
+        query: str,
+        phase: Optional[int],
+        passes: Optional[bool],
+        limit: int,
+    ) -> list[dict]:
+        filters, params = _search_filters(phase, passes)
+        params["limit"] = limit
+        conn = self._reader()
+
+        fts_sql = FTS_SEARCH_SQL.format(filters=filters)
+        for candidate in dict.fromkeys([query, fts_query(query)]):
+            try:
+                rows = conn.execute(fts_sql, {**params, "query": candidate}).fetchall()
+                return [_search_result(row) for row in rows]
+            except sqlite3.OperationalError as e:
+                if "no such table" in str(e):
+                    break  # No FTS5 index in this database
+
+        like_sql = LIKE_SEARCH_SQL.format(filters=filters)
+        rows = conn.execute(like_sql, {**params, "pattern": f"%{query}%"}).fetchall()
+        return [_search_result(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+
+
+def open_feature_store(
+    project_dir: Path,
+    backend: str = DEFAULT_BACKEND,
+    journal_mode: Optional[str] = DEFAULT_JOURNAL_MODE,
+) -> FeatureStore:
+    """
+    Open a project's feature database with the given storage backend.
+
+    Runs pending schema migrations and imports legacy feature list files
+    first (through SQLAlchemy, for both backends).
+
+    Args:
+        project_dir: Directory containing the project
+        backend: "sqlite" or "orm"
+        journal_mode: Journal mode to switch the database to (persistent),
+            or None to keep the database's current mode
+
+    Returns:
+        The opened FeatureStore
+
+    Raises:
+        ValueError: If the backend or journal mode is unknown
+    """
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend {backend!r} (expected one of {', '.join(STORAGE_BACKENDS)})")
+    if journal_mode is not None and journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Unknown journal mode {journal_mode!r} (expected one of {', '.join(JOURNAL_MODES)})")
+
+    from api.database import create_database, get_database_path
+    from api.migration import migrate_json_to_sqlite
+
+    # Initialize database (applies any pending schema migrations)
+    engine, session_maker = create_database(project_dir)
+
+    # Run migration if needed (converts legacy feature lists to SQLite)
+    migrate_json_to_sqlite(project_dir, session_maker)
+
+    if journal_mode is not None:
+        with engine.connect() as conn:
+            conn.exec_driver_sql(f"PRAGMA journal_mode = {journal_mode}")
+
+    if backend == "orm":
+        return OrmFeatureStore(engine, session_maker)
+
+    engine.dispose()
+    return SqliteFeatureStore(get_database_path(project_dir))
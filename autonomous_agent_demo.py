@@ -53,6 +53,9 @@ Examples:
   # Start Phase 2 (requires Phase 1 started + phase2_spec.txt)
   python autonomous_agent_demo.py --project-dir ./claude_clone --phase 2
 
+  # Generate features for up to 4 spec sections at once
+  python autonomous_agent_demo.py --project-dir ./claude_clone --parallel-initializer 4
+
 Authentication:
   Uses Claude CLI credentials from ~/.claude/.credentials.json
   Run 'claude login' to authenticate (handled by start.bat/start.sh)
@@ -87,6 +90,14 @@ Authentication:
         help="Phase number to run (default: 1). Phase N requires Phase N-1 to have been started.",
     )
 
+    parser.add_argument(
+        "--parallel-initializer",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Create features with up to N concurrent initializer sessions, one per spec section (default: a single initializer)",
+    )
+
     return parser.parse_args()
 
 
@@ -116,6 +127,7 @@ def main() -> None:
                 model=args.model,
                 max_iterations=args.max_iterations,
                 phase=args.phase,
+                parallel_initializer=args.parallel_initializer,
             )
         )
     except KeyboardInterrupt:
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Feature Store Backend Benchmark
+===============================
+
+Compares per-tool latency of the feature MCP tools on each storage backend
+(see api/storage.py), calling the tool functions directly against a
+temporary database.
+
+Run from the repository root:
+    python benchmarks/bench_feature_store.py --features 1000 --iterations 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.storage import STORAGE_BACKENDS, open_feature_store  # noqa: E402
+from mcp_server import feature_mcp  # noqa: E402
+
+
+# The tools are coroutines; run them all on one event loop
+run = asyncio.new_event_loop().run_until_complete
+
+
+def make_features(count: int) -> list[dict]:
+    """Build a synthetic feature list where every tenth feature has a dependency."""
+    return [
+        {
+            "category": f"category-{i % 12}",
+            "name": f"Feature {i}",
+            "description": f"Synthetic feature {i} covering area {i % 12} of the application",
+            "steps": [f"Step {s} of feature {i}" for s in range(5)],
+            "depends_on": [i - 1] if i % 10 == 9 else [],
+        }
+        for i in range(count)
+    ]
+
+
+def time_calls(fn, iterations: int) -> list[float]:
+    """Call fn(i) for i in range(iterations), returning latencies in ms."""
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def bench_backend(backend: str, feature_count: int, iterations: int) -> dict[str, list[float]]:
+    """Run every tool against a fresh database on one backend."""
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        feature_mcp.PROJECT_DIR = project_dir
+        feature_mcp.CURRENT_PHASE = 1
+        feature_mcp._store = open_feature_store(project_dir, backend)
+        try:
+            run(feature_mcp.feature_create_bulk(make_features(feature_count)))
+
+            # Stats are cached between writes; invalidate to measure the query
+            def stats(_):
+                feature_mcp._invalidate_stats()
+                run(feature_mcp.feature_get_stats(breakdown=True))
+
+            results = {
+                "feature_get_stats": time_calls(stats, iterations),
+                "feature_get_next": time_calls(lambda _: run(feature_mcp.feature_get_next()), iterations),
+                "feature_get_next_batch": time_calls(lambda _: run(feature_mcp.feature_get_next_batch(k=5)), iterations),
+                "feature_search": time_calls(lambda _: run(feature_mcp.feature_search("area 7")), iterations),
+                "feature_mark_passing": time_calls(
+                    lambda i: run(feature_mcp.feature_mark_passing(i % feature_count + 1)), iterations
+                ),
+                "feature_get_for_regression": time_calls(
+                    lambda _: run(feature_mcp.feature_get_for_regression(limit=3)), iterations
+                ),
+                "feature_skip": time_calls(
+                    lambda i: run(feature_mcp.feature_skip(feature_count - i % (feature_count // 2))), iterations
+                ),
+                "feature_create_bulk (10)": time_calls(
+                    lambda _: run(feature_mcp.feature_create_bulk(make_features(10))), max(1, iterations // 10)
+                ),
+            }
+        finally:
+            feature_mcp.wait_for_writes()
+            feature_mcp._store.close()
+            feature_mcp._store = None
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare feature tool latency across storage backends")
+    parser.add_argument("--features", type=int, default=1000, help="Features in the synthetic database")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per tool")
+    parser.add_argument("--backends", nargs="+", choices=STORAGE_BACKENDS, default=list(STORAGE_BACKENDS))
+    args = parser.parse_args()
+
+    results = {backend: bench_backend(backend, args.features, args.iterations) for backend in args.backends}
+
+    tools = list(next(iter(results.values())))
+    header = f"{'tool':<28}" + "".join(f"{b + ' p50':>12}{b + ' mean':>12}" for b in args.backends)
+    print(f"\n{args.features} features, {args.iterations} calls per tool (ms)\n")
+    print(header)
+    print("-" * len(header))
+    for tool in tools:
+        row = f"{tool:<28}"
+        for backend in args.backends:
+            latencies = results[backend][tool]
+            row += f"{statistics.median(latencies):>12.3f}{statistics.fmean(latencies):>12.3f}"
+        print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
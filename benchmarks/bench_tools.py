@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Feature Tool Latency Benchmark
+==============================
+
+Measures p50/p99 latency and peak memory of the feature MCP tools on
+synthetic features.db files of increasing size (1k, 10k and 100k features
+spread over several phases), calling the tools two ways:
+
+- direct: the tool coroutines in mcp_server/feature_mcp.py
+- mcp: an in-process MCP client session, including protocol and validation
+
+Results can be stored as a baseline and later runs checked against it; a
+tool whose p50 latency or peak memory grows past the threshold fails the
+check. Baselines are machine-specific: record one on the machine that runs
+the checks.
+
+Run from the repository root:
+    python benchmarks/bench_tools.py
+    python benchmarks/bench_tools.py --sizes 1000 10000 --save-baseline
+    python benchmarks/bench_tools.py --sizes 1000 10000 --check
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.database import create_database, get_database_path  # noqa: E402
+from api.storage import DEFAULT_BACKEND, open_feature_store  # noqa: E402
+from bench_feature_store import make_features  # noqa: E402
+from mcp_server import feature_mcp  # noqa: E402
+
+
+SIZES = (1_000, 10_000, 100_000)
+MODES = ("direct", "mcp")
+PHASES = 10
+
+# Share of the current (last) phase that is already passing
+PASSING_SHARE = 0.4
+
+# Calls per tool measured under tracemalloc (slow, so kept separate from timing)
+MEMORY_CALLS = 5
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines" / "bench_tools.json"
+DEFAULT_THRESHOLD = 2.0  # Fail when a metric exceeds twice its baseline
+# Differences below these are noise, whatever the ratio
+MIN_REGRESSION_MS = 0.05
+MIN_REGRESSION_KIB = 16
+
+
+def build_database(project_dir: Path, feature_count: int) -> None:
+    """
+    Write a synthetic features.db with feature_count features over PHASES phases.
+
+    Earlier phases are all passing, half of their features verified; the last
+    phase is PASSING_SHARE passing. Every tenth feature depends on the one
+    before it.
+    """
+    engine, _ = create_database(project_dir)
+    engine.dispose()
+
+    per_phase = feature_count // PHASES
+    passing_in_current = int(per_phase * PASSING_SHARE)
+    rows, edges = [], []
+    for i in range(per_phase * PHASES):
+        feature_id = i + 1
+        phase, position = divmod(i, per_phase)
+        passes = phase < PHASES - 1 or position < passing_in_current
+        depends = position % 10 == 9
+        rows.append((
+            feature_id,
+            position + 1,
+            f"category-{i % 12}",
+            f"Feature {i}",
+            f"Synthetic feature {i} covering area {i % 12} of the application",
+            json.dumps([f"Step {s} of feature {i}" for s in range(5)]),
+            passes,
+            phase + 1,
+            # The dependency (the previous feature) is pending only in the current phase
+            int(depends and phase == PHASES - 1 and position - 1 >= passing_in_current),
+            f"2025-01-01T00:00:{position % 60:02d}.000Z" if passes and i % 2 else None,
+            int(passes and i % 2),
+        ))
+        if depends:
+            edges.append((feature_id, feature_id - 1))
+
+    conn = sqlite3.connect(get_database_path(project_dir))
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO features (id, priority, category, name, description, steps, passes, "
+                "phase, blocked_by, last_verified_at, verification_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.executemany("INSERT INTO feature_dependencies (feature_id, depends_on_id) VALUES (?, ?)", edges)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def tool_calls(feature_count: int, calls: int) -> dict[str, tuple[str, object]]:
+    """
+    The benchmarked calls: label -> (tool name, fn(i) returning the arguments).
+
+    Writes target features of the current phase so every call does real work.
+    mark_passing needs a distinct pending feature per call (re-passing one is a
+    no-op), so it gets the first `calls` pending features and is left out at
+    sizes with too few; skip cycles through the rest, which stay pending.
+
+    Args:
+        feature_count: Size of the synthetic database (see build_database)
+        calls: Calls made per tool, warm-up included (fn is called with 0..calls-1)
+    """
+    per_phase = feature_count // PHASES
+    first_id = (PHASES - 1) * per_phase + 1
+    passing = int(per_phase * PASSING_SHARE)
+    pending = per_phase - passing
+    to_pass = calls if pending > calls else 0
+    first_skip_id = first_id + passing + to_pass
+
+    tools = {
+        "feature_get_stats": ("feature_get_stats", lambda i: {"breakdown": True}),
+        "feature_get_next": ("feature_get_next", lambda i: {}),
+        "feature_get_for_regression": ("feature_get_for_regression", lambda i: {"limit": 3}),
+        "feature_record_verification": (
+            "feature_record_verification",
+            lambda i: {"feature_id": first_id + i % passing, "passed": True},
+        ),
+        "feature_mark_passing": ("feature_mark_passing", lambda i: {"feature_id": first_id + passing + i}),
+        "feature_skip": ("feature_skip", lambda i: {"feature_id": first_skip_id + i % (pending - to_pass)}),
+        "feature_create_bulk (10)": ("feature_create_bulk", lambda i: {"features": make_features(10)}),
+    }
+    if not to_pass:
+        del tools["feature_mark_passing"]
+    return tools
+
+
+def check_result(tool: str, output: str) -> None:
+    """Fail the run if a tool returned an error, so no error path is timed as a result."""
+    result = json.loads(output)
+    if isinstance(result, dict) and "error" in result:
+        raise RuntimeError(f"{tool} failed: {result['error']}")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize(latencies: list[float], peak_kib: float) -> dict:
+    return {
+        "p50_ms": round(percentile(latencies, 50), 4),
+        "p99_ms": round(percentile(latencies, 99), 4),
+        "peak_kib": round(peak_kib, 1),
+    }
+
+
+async def run_direct(feature_count: int, iterations: int) -> dict[str, dict]:
+    """Time the tool coroutines awaited directly."""
+    results = {}
+    for label, (tool, arguments) in tool_calls(feature_count, iterations + MEMORY_CALLS + 1).items():
+        fn = getattr(feature_mcp, tool)
+        check_result(tool, await fn(**arguments(0)))  # Warm up caches and lazy imports
+        latencies = []
+        for i in range(1, iterations + 1):
+            args = arguments(i)
+            # Stats are cached between writes; invalidate to measure the query
+            feature_mcp._invalidate_stats()
+            start = time.perf_counter()
+            output = await fn(**args)
+            latencies.append((time.perf_counter() - start) * 1000)
+            check_result(tool, output)
+
+        tracemalloc.start()
+        peak = 0
+        for i in range(iterations + 1, iterations + MEMORY_CALLS + 1):
+            args = arguments(i)
+            feature_mcp._invalidate_stats()
+            tracemalloc.reset_peak()
+            output = await fn(**args)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            check_result(tool, output)
+        tracemalloc.stop()
+
+        results[label] = summarize(latencies, peak / 1024)
+    return results
+
+
+async def run_mcp(feature_count: int, iterations: int) -> dict[str, dict]:
+    """Time the tools through an in-process MCP client session."""
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    # The server logs every request at INFO level
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+
+    def check_call(tool: str, result) -> None:
+        if result.isError:
+            raise RuntimeError(f"{tool} failed: {result.content}")
+        check_result(tool, result.content[0].text)
+
+    results = {}
+    async with create_connected_server_and_client_session(feature_mcp.mcp) as client:
+        for label, (tool, arguments) in tool_calls(feature_count, iterations + MEMORY_CALLS + 1).items():
+            check_call(tool, await client.call_tool(tool, arguments(0)))  # Warm up
+            latencies = []
+            for i in range(1, iterations + 1):
+                args = arguments(i)
+                feature_mcp._invalidate_stats()
+                start = time.perf_counter()
+                result = await client.call_tool(tool, args)
+                latencies.append((time.perf_counter() - start) * 1000)
+                check_call(tool, result)
+
+            tracemalloc.start()
+            peak = 0
+            for i in range(iterations + 1, iterations + MEMORY_CALLS + 1):
+                args = arguments(i)
+                feature_mcp._invalidate_stats()
+                tracemalloc.reset_peak()
+                result = await client.call_tool(tool, args)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                check_call(tool, result)
+            tracemalloc.stop()
+
+            results[label] = summarize(latencies, peak / 1024)
+    return results
+
+
+def run_suite(sizes: list[int], modes: list[str], iterations: int, backend: str) -> dict[str, dict]:
+    """
+    Run every mode at every size, each on a fresh copy of the synthetic database.
+
+    Returns:
+        Dict mapping "mode/size/tool" to {"p50_ms", "p99_ms", "peak_kib"}
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            template = Path(tmp) / f"template-{size}"
+            template.mkdir()
+            print(f"Generating {size} features...", flush=True)
+            build_database(template, size)
+            if "feature_mark_passing" not in tool_calls(size, iterations + MEMORY_CALLS + 1):
+                print(f"Skipping feature_mark_passing at {size} features: too few pending features "
+                      f"for {iterations + MEMORY_CALLS + 1} distinct calls", flush=True)
+
+            for mode in modes:
+                project_dir = Path(tmp) / f"{mode}-{size}"
+                project_dir.mkdir()
+                shutil.copy(get_database_path(template), get_database_path(project_dir))
+
+                feature_mcp.PROJECT_DIR = project_dir
+                feature_mcp.CURRENT_PHASE = PHASES
+                feature_mcp.FEATURES_BACKEND = backend
+                feature_mcp._store = open_feature_store(project_dir, backend)
+                print(f"Benchmarking {mode} calls at {size} features...", flush=True)
+                try:
+                    run = run_direct if mode == "direct" else run_mcp
+                    mode_results = asyncio.run(run(size, iterations))
+                finally:
+                    feature_mcp.wait_for_writes()
+                    feature_mcp._store.close()
+                    feature_mcp._store = None
+
+                for label, summary in mode_results.items():
+                    results[f"{mode}/{size}/{label}"] = summary
+    return results
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float) -> list[str]:
+    """
+    Compare results with a baseline.
+
+    Returns:
+        A description of every metric that regressed past the threshold
+    """
+    regressions = []
+    for key, summary in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric, floor in (("p50_ms", MIN_REGRESSION_MS), ("peak_kib", MIN_REGRESSION_KIB)):
+            value, reference = summary[metric], base[metric]
+            if value > reference * threshold and value - reference > floor:
+                regressions.append(f"{key} {metric}: {value} (baseline {reference}, {value / reference:.2f}x)")
+    return regressions
+
+
+def print_results(results: dict[str, dict], baseline: dict[str, dict]) -> None:
+    header = f"{'mode/size/tool':<48}{'p50 ms':>10}{'p99 ms':>10}{'peak KiB':>10}{'p50 vs base':>13}"
+    print()
+    print(header)
+    print("-" * len(header))
+    for key, summary in results.items():
+        base = baseline.get(key)
+        ratio = f"{summary['p50_ms'] / base['p50_ms']:.2f}x" if base and base["p50_ms"] else ""
+        print(
+            f"{key:<48}{summary['p50_ms']:>10.3f}{summary['p99_ms']:>10.3f}"
+            f"{summary['peak_kib']:>10.1f}{ratio:>13}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Feature tool latency and memory benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Feature counts to test")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--iterations", type=int, default=100, help="Timed calls per tool")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help="Storage backend (see api/storage.py)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results in the baseline file")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a tool regressed past the threshold")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help=f"Allowed ratio to the baseline (default {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    if any(size < PHASES * 10 for size in args.sizes):
+        parser.error(f"--sizes must be at least {PHASES * 10}")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    results = run_suite(args.sizes, args.modes, args.iterations, args.backend)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results, baseline)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.check:
+        if not baseline:
+            print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) past {args.threshold}x baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions past {args.threshold}x baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Feature Database Load Generator
+===============================
+
+Runs N simulated agents as separate processes against one features.db,
+each calling the feature tools the way a features server does, while
+progress readers poll progress.count_passing_tests() like the agent loop
+and the launcher. Each combination of storage backend, journal mode and
+busy timeout is run on a fresh synthetic database (see bench_tools.py).
+
+Agents issue a weighted mix of calls (AGENT_MIX). There is no claim tool;
+a claim is simulated by feature_get_next_batch, which is what a worker
+reads before picking a feature. Regression checks that fail half the time
+return features to the queue, so the workload does not run dry; calls with
+nothing to do (marking without a served feature) are not counted.
+
+Reported per configuration: agent throughput and p50/p99 latency, readers'
+poll rate and p99 latency, how many calls failed with "database is locked"
+(readers use progress.py's own connection settings), and how many of the
+agents' queued bookkeeping writes (served events from get_next and claims)
+failed in the background after their call had returned.
+
+Run from the repository root:
+    python benchmarks/load_features.py --agents 4 --readers 2 --duration 10
+    python benchmarks/load_features.py --agents 8 --journal-modes wal --busy-timeouts 0 5000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.database import get_database_path  # noqa: E402
+from api.storage import STORAGE_BACKENDS  # noqa: E402
+from bench_tools import PHASES, build_database, percentile  # noqa: E402
+
+
+JOURNAL_MODES = ("delete", "wal")
+BUSY_TIMEOUTS_MS = (0, 5000)
+
+# Weighted call mix of a simulated agent
+AGENT_MIX = {
+    "get_next": 40,
+    "claim": 20,
+    "mark_passing": 25,
+    "skip": 5,
+    "verify": 10,
+    "get_stats": 5,
+}
+
+# Time allowed for every process to open the database before the run starts
+START_TIMEOUT_SECONDS = 60
+
+
+def is_locked_error(error: BaseException) -> bool:
+    return "database is locked" in str(error)
+
+
+def open_store(project_dir: Path, backend: str, busy_timeout_ms: int):
+    """Open a feature store and set busy_timeout on every connection it uses."""
+    from api.storage import SqliteFeatureStore, open_feature_store
+
+    # The journal mode is set once per run, before the agents start
+    store = open_feature_store(project_dir, backend, journal_mode=None)
+    if backend == "sqlite":
+        store.close()
+        return SqliteFeatureStore(get_database_path(project_dir), timeout=busy_timeout_ms / 1000)
+
+    from sqlalchemy import event
+
+    # Drop pooled connections so every new one gets the pragma
+    pragma = f"PRAGMA busy_timeout = {int(busy_timeout_ms)}"
+    store.engine.dispose()
+    event.listen(store.engine, "connect", lambda dbapi_conn, _: dbapi_conn.execute(pragma))
+    return store
+
+
+def agent_worker(index: int, project_dir: str, backend: str, busy_timeout_ms: int,
+                 feature_count: int, duration: float, barrier, results) -> None:
+    """Simulated agent: one features-server process issuing AGENT_MIX calls."""
+    from mcp_server import feature_mcp
+
+    run = asyncio.new_event_loop().run_until_complete
+    feature_mcp.PROJECT_DIR = Path(project_dir)
+    feature_mcp.CURRENT_PHASE = PHASES
+    feature_mcp.SESSION_ID = f"load-agent-{index}"
+    feature_mcp._store = open_store(Path(project_dir), backend, busy_timeout_ms)
+
+    per_phase = feature_count // PHASES
+    first_id = (PHASES - 1) * per_phase + 1
+    rng = random.Random(index)
+    ops, weights = list(AGENT_MIX), list(AGENT_MIX.values())
+    latencies: dict[str, list[float]] = {op: [] for op in ops}
+    locked = errors = 0
+    current_id = None
+    failed_writes_before = feature_mcp._failed_writes
+
+    barrier.wait(START_TIMEOUT_SECONDS)
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        op = rng.choices(ops, weights)[0]
+        start = time.perf_counter()
+        try:
+            if op == "get_next":
+                current_id = json.loads(run(feature_mcp.feature_get_next())).get("id")
+            elif op == "claim":
+                run(feature_mcp.feature_get_next_batch(k=3))
+            elif op in ("mark_passing", "skip"):
+                if current_id is None:
+                    continue
+                if op == "mark_passing":
+                    run(feature_mcp.feature_mark_passing(current_id))
+                else:
+                    run(feature_mcp.feature_skip(current_id))
+                current_id = None
+            elif op == "verify":
+                feature_id = first_id + rng.randrange(per_phase)
+                run(feature_mcp.feature_record_verification(feature_id, rng.random() < 0.5))
+            else:
+                run(feature_mcp.feature_get_stats())
+        except Exception as e:
+            if is_locked_error(e):
+                locked += 1
+            else:
+                errors += 1
+            continue
+        latencies[op].append((time.perf_counter() - start) * 1000)
+
+    feature_mcp.wait_for_writes()
+    feature_mcp._store.close()
+    # Queued writes report their failures to stderr only, never to the caller
+    failed_writes = feature_mcp._failed_writes - failed_writes_before
+    results.put(("agent", latencies, locked, errors, failed_writes))
+
+
+def reader_worker(project_dir: str, duration: float, interval: float, barrier, results) -> None:
+    """Progress reader polling count_passing_tests like the agent loop and launcher."""
+    from progress import count_passing_tests
+
+    latencies: list[float] = []
+    locked = errors = 0
+
+    barrier.wait(START_TIMEOUT_SECONDS)
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        # count_passing_tests reports database errors on stdout and returns (0, 0)
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            count_passing_tests(Path(project_dir), phase=PHASES)
+        elapsed = (time.perf_counter() - start) * 1000
+        message = output.getvalue()
+        if "database is locked" in message:
+            locked += 1
+        elif message:
+            errors += 1
+        else:
+            latencies.append(elapsed)
+        time.sleep(interval)
+
+    results.put(("reader", {"count_passing_tests": latencies}, locked, errors, 0))
+
+
+def run_config(template_db: Path, feature_count: int, backend: str, journal_mode: str, busy_timeout_ms: int,
+               agents: int, readers: int, duration: float, interval: float) -> dict:
+    """Run one load configuration on a fresh copy of the template database."""
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        db_path = get_database_path(project_dir)
+        shutil.copy(template_db, db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+        conn.close()
+
+        barrier = ctx.Barrier(agents + readers)
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=agent_worker, args=(
+                i, str(project_dir), backend, busy_timeout_ms, feature_count, duration, barrier, results
+            ))
+            for i in range(agents)
+        ] + [
+            ctx.Process(target=reader_worker, args=(str(project_dir), duration, interval, barrier, results))
+            for _ in range(readers)
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    summary = {}
+    for role in ("agent", "reader"):
+        role_results = [r for r in collected if r[0] == role]
+        calls = list(itertools.chain.from_iterable(
+            values for _, latencies, *_ in role_results for values in latencies.values()
+        ))
+        summary[role] = {
+            "calls": len(calls),
+            "per_second": round(len(calls) / duration, 1),
+            "p50_ms": round(percentile(calls, 50), 3) if calls else None,
+            "p99_ms": round(percentile(calls, 99), 3) if calls else None,
+            "locked": sum(r[2] for r in role_results),
+            "errors": sum(r[3] for r in role_results),
+            "failed_writes": sum(r[4] for r in role_results),
+        }
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent load test for features.db")
+    parser.add_argument("--agents", type=int, default=4, help="Simulated agent processes")
+    parser.add_argument("--readers", type=int, default=2, help="Progress reader processes")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per configuration")
+    parser.add_argument("--read-interval", type=float, default=0.05, help="Seconds between reader polls")
+    parser.add_argument("--features", type=int, default=10_000, help="Features in the synthetic database")
+    parser.add_argument("--backends", nargs="+", choices=STORAGE_BACKENDS, default=list(STORAGE_BACKENDS))
+    parser.add_argument("--journal-modes", nargs="+", choices=JOURNAL_MODES, default=list(JOURNAL_MODES))
+    parser.add_argument("--busy-timeouts", type=int, nargs="+", default=list(BUSY_TIMEOUTS_MS),
+                        help="busy_timeout values (ms) for the agents' connections")
+    args = parser.parse_args()
+
+    if args.agents < 1 or args.readers < 0:
+        parser.error("--agents must be at least 1 and --readers at least 0")
+
+    configs = list(itertools.product(args.backends, args.journal_modes, args.busy_timeouts))
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        template = Path(tmp)
+        print(f"Generating {args.features} features...", flush=True)
+        build_database(template, args.features)
+
+        for backend, journal_mode, busy_timeout_ms in configs:
+            print(f"Running {backend}, journal_mode={journal_mode}, busy_timeout={busy_timeout_ms}ms...", flush=True)
+            summary = run_config(
+                get_database_path(template), args.features, backend, journal_mode, busy_timeout_ms,
+                args.agents, args.readers, args.duration, args.read_interval,
+            )
+            rows.append(((backend, journal_mode, busy_timeout_ms), summary))
+
+    print(f"\n{args.agents} agents, {args.readers} readers, {args.duration:g}s per configuration\n")
+    header = (
+        f"{'backend':<8}{'journal':<8}{'busy ms':>8}"
+        f"{'agent/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'locked':>8}{'errors':>8}{'queued':>8}"
+        f"{'reads/s':>10}{'p99 ms':>9}{'locked':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for (backend, journal_mode, busy_timeout_ms), summary in rows:
+        agent, reader = summary["agent"], summary["reader"]
+        print(
+            f"{backend:<8}{journal_mode:<8}{busy_timeout_ms:>8}"
+            f"{agent['per_second']:>10.1f}{agent['p50_ms'] or 0:>9.2f}{agent['p99_ms'] or 0:>9.2f}"
+            f"{agent['locked']:>8}{agent['errors']:>8}{agent['failed_writes']:>8}"
+            f"{reader['per_second']:>10.1f}{reader['p99_ms'] or 0:>9.2f}{reader['locked']:>8}"
+        )
+    print("\nqueued: agents' background writes (served events) that failed after their call returned")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
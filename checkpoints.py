@@ -0,0 +1,381 @@
+"""
+Session Checkpoints
+===================
+
+Snapshots of a project's features.db and git HEAD, taken before every agent
+session, so a session that went wrong (features marked passing that don't
+work, a broken build) can be undone in seconds instead of repaired by hand.
+
+Checkpoints live in the project's .checkpoints/ directory (ignored by git).
+The database is copied with SQLite's online backup API, so it is consistent
+even while a features server has it open, then stored as content-addressed
+chunks: consecutive checkpoints share every chunk a session did not change,
+so keeping the last CHECKPOINT_KEEP checkpoints costs little more than one.
+
+Checkpoint N holds the state from just before session N started. Rolling back
+to it undoes session N and every later one:
+    python checkpoints.py list --project-dir generations/my_app
+    python checkpoints.py rollback --project-dir generations/my_app --to-session 12
+
+Stop the agent before rolling back.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+
+CHECKPOINT_DIRNAME = ".checkpoints"
+
+# Checkpoints kept per project (0 disables checkpoints)
+CHECKPOINT_KEEP = int(os.environ.get("CHECKPOINT_KEEP", "10"))
+
+# Snapshot chunk size: a multiple of every SQLite page size up to 64 KiB
+CHUNK_SIZE = 64 * 1024
+
+DATABASE_FILENAME = "features.db"
+
+
+def get_checkpoint_dir(project_dir: Path) -> Path:
+    """Get the directory holding a project's checkpoints."""
+    return project_dir / CHECKPOINT_DIRNAME
+
+
+def _manifest_path(checkpoint_dir: Path, session: int) -> Path:
+    return checkpoint_dir / f"session-{session:06d}.json"
+
+
+def _object_path(checkpoint_dir: Path, digest: str) -> Path:
+    return checkpoint_dir / "objects" / digest[:2] / digest
+
+
+def _git(project_dir: Path, *args: str) -> subprocess.CompletedProcess | None:
+    """Run a git command in the project, or return None if git cannot run."""
+    try:
+        return subprocess.run(
+            ["git", *args],
+            cwd=project_dir,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def _git_head(project_dir: Path) -> str | None:
+    """Current commit of the project's git repository, or None without one."""
+    result = _git(project_dir, "rev-parse", "--verify", "HEAD")
+    if result is None or result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def list_checkpoints(project_dir: Path) -> list[dict]:
+    """List a project's checkpoints, oldest first."""
+    checkpoint_dir = get_checkpoint_dir(project_dir)
+    if not checkpoint_dir.is_dir():
+        return []
+    return [
+        json.loads(path.read_text(encoding="utf-8"))
+        for path in sorted(checkpoint_dir.glob("session-*.json"))
+    ]
+
+
+def _store_chunks(checkpoint_dir: Path, snapshot: Path) -> list[str]:
+    """Split a snapshot into content-addressed chunks, writing only new ones."""
+    digests = []
+    with open(snapshot, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest = hashlib.sha256(chunk).hexdigest()
+            path = _object_path(checkpoint_dir, digest)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_bytes(chunk)
+                os.replace(tmp_path, path)
+            digests.append(digest)
+    return digests
+
+
+def create_checkpoint(
+    project_dir: Path,
+    session_id: Optional[str] = None,
+    phase: Optional[int] = None,
+) -> dict:
+    """
+    Checkpoint the project's features.db and git HEAD.
+
+    Args:
+        project_dir: The project directory
+        session_id: Agent session the checkpoint is taken for
+        phase: Phase the session runs
+
+    Returns:
+        The checkpoint manifest: session (the checkpoint number), session_id,
+        phase, created_at, git_head and database (None if there is no
+        features.db yet, else its size and chunk digests)
+
+    Raises:
+        OSError, sqlite3.Error: If the snapshot cannot be written
+    """
+    checkpoint_dir = get_checkpoint_dir(project_dir)
+    if not checkpoint_dir.is_dir():
+        checkpoint_dir.mkdir(parents=True)
+        # Keep checkpoints out of the project's commits (and out of git resets)
+        (checkpoint_dir / ".gitignore").write_text("*\n")
+
+    existing = list_checkpoints(project_dir)
+    session = existing[-1]["session"] + 1 if existing else 1
+
+    database = None
+    db_file = project_dir / DATABASE_FILENAME
+    if db_file.exists():
+        fd, tmp_name = tempfile.mkstemp(dir=checkpoint_dir, suffix=".db")
+        os.close(fd)
+        snapshot = Path(tmp_name)
+        try:
+            source = sqlite3.connect(db_file)
+            target = sqlite3.connect(snapshot)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            database = {"size": snapshot.stat().st_size, "chunks": _store_chunks(checkpoint_dir, snapshot)}
+        finally:
+            snapshot.unlink(missing_ok=True)
+
+    manifest = {
+        "session": session,
+        "session_id": session_id,
+        "phase": phase,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "git_head": _git_head(project_dir),
+        "database": database,
+    }
+    path = _manifest_path(checkpoint_dir, session)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def prune_checkpoints(project_dir: Path, keep: int = CHECKPOINT_KEEP) -> int:
+    """
+    Delete all but the newest keep checkpoints and the chunks only they used.
+
+    Returns:
+        Number of checkpoints deleted
+    """
+    checkpoint_dir = get_checkpoint_dir(project_dir)
+    checkpoints = list_checkpoints(project_dir)
+    expired = checkpoints[:max(len(checkpoints) - keep, 0)]
+    if not expired:
+        return 0
+
+    for checkpoint in expired:
+        _manifest_path(checkpoint_dir, checkpoint["session"]).unlink()
+
+    referenced = {
+        digest
+        for checkpoint in checkpoints[len(expired):]
+        for digest in (checkpoint["database"] or {}).get("chunks", [])
+    }
+    for path in (checkpoint_dir / "objects").glob("*/*"):
+        if path.name not in referenced:
+            path.unlink()
+    return len(expired)
+
+
+def checkpoint_session(
+    project_dir: Path,
+    session_id: Optional[str] = None,
+    phase: Optional[int] = None,
+    keep: int = CHECKPOINT_KEEP,
+) -> Optional[dict]:
+    """
+    Checkpoint the project before an agent session and prune old checkpoints.
+
+    Errors are reported but never raised, so a failed checkpoint does not
+    stop the session.
+
+    Returns:
+        The checkpoint manifest, or None if checkpoints are disabled or failed
+    """
+    if keep <= 0:
+        return None
+    try:
+        checkpoint = create_checkpoint(project_dir, session_id, phase)
+        prune_checkpoints(project_dir, keep)
+    except (OSError, sqlite3.Error) as e:
+        print(f"[Checkpoint failed: {e}]")
+        return None
+    return checkpoint
+
+
+def _restore_database(checkpoint_dir: Path, database: Optional[dict], db_file: Path) -> None:
+    """Replace features.db with a checkpointed snapshot (or remove it, if there was none)."""
+    if database is None:
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db_file}{suffix}").unlink(missing_ok=True)
+        return
+
+    fd, tmp_name = tempfile.mkstemp(dir=checkpoint_dir, suffix=".db")
+    snapshot = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for digest in database["chunks"]:
+                f.write(_object_path(checkpoint_dir, digest).read_bytes())
+        # Copy back through the backup API, which also resets any WAL contents
+        source = sqlite3.connect(snapshot)
+        target = sqlite3.connect(db_file)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    finally:
+        snapshot.unlink(missing_ok=True)
+        Path(f"{snapshot}-wal").unlink(missing_ok=True)
+        Path(f"{snapshot}-shm").unlink(missing_ok=True)
+
+
+def _uncommitted_paths(project_dir: Path) -> list[str]:
+    """
+    Tracked paths with uncommitted changes, other than features.db and its WAL files.
+
+    Untracked files are left out, since git reset --hard does not touch them.
+    Renames and copies count if either side is not a database file.
+    """
+    status = _git(project_dir, "status", "--porcelain", "-z", "--untracked-files=no")
+    if status is None:
+        return []
+    database_files = {DATABASE_FILENAME, f"{DATABASE_FILENAME}-wal", f"{DATABASE_FILENAME}-shm"}
+    fields = iter(status.stdout.split("\0"))
+    dirty = []
+    for entry in fields:
+        if not entry:
+            continue
+        code, paths = entry[:2], [entry[3:]]
+        if "R" in code or "C" in code:
+            # -z lists the source path of a rename or copy as its own field
+            paths.append(next(fields, ""))
+        if any(path not in database_files for path in paths):
+            dirty.append(paths[0])
+    return dirty
+
+
+def rollback(project_dir: Path, session: int, force: bool = False) -> dict:
+    """
+    Restore features.db and the git HEAD recorded by a checkpoint.
+
+    The git working tree is reset hard to the checkpoint's commit, so
+    uncommitted changes (other than features.db) make this fail unless
+    force is set.
+
+    Args:
+        project_dir: The project directory
+        session: Checkpoint number to restore (see list_checkpoints())
+        force: Discard uncommitted changes in the git working tree
+
+    Returns:
+        The restored checkpoint's manifest, with previous_head set to the
+        commit that was checked out before (None without git)
+
+    Raises:
+        ValueError: If there is no such checkpoint, or the working tree has
+            uncommitted changes and force is not set
+        RuntimeError: If the git reset fails
+    """
+    checkpoint_dir = get_checkpoint_dir(project_dir)
+    path = _manifest_path(checkpoint_dir, session)
+    if not path.exists():
+        available = ", ".join(str(c["session"]) for c in list_checkpoints(project_dir)) or "none"
+        raise ValueError(f"No checkpoint for session {session} (available: {available})")
+    checkpoint = json.loads(path.read_text(encoding="utf-8"))
+
+    db_file = project_dir / DATABASE_FILENAME
+    previous_head = _git_head(project_dir)
+
+    if checkpoint["git_head"] is not None and previous_head is not None:
+        dirty = _uncommitted_paths(project_dir)
+        if dirty and not force:
+            raise ValueError(
+                f"Uncommitted changes in {project_dir} ({len(dirty)} paths); commit them or use --force"
+            )
+
+        # Fold any WAL into features.db, so a tracked features.db reset by git
+        # never meets a stale WAL from the current state
+        if db_file.exists():
+            conn = sqlite3.connect(db_file)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                conn.close()
+
+        result = _git(project_dir, "reset", "--hard", checkpoint["git_head"])
+        if result is None or result.returncode != 0:
+            error = result.stderr.strip() if result is not None else "git could not be run"
+            raise RuntimeError(f"git reset failed: {error}")
+
+    _restore_database(checkpoint_dir, checkpoint["database"], db_file)
+    return {**checkpoint, "previous_head": previous_head}
+
+
+def main() -> int:
+    """Command line entry point for listing checkpoints and rolling back."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Session checkpoints of features.db and git state")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List a project's checkpoints")
+    list_parser.add_argument("--project-dir", type=Path, required=True, help="Project directory")
+
+    rollback_parser = subparsers.add_parser(
+        "rollback", help="Restore features.db and git to the state before a session"
+    )
+    rollback_parser.add_argument("--project-dir", type=Path, required=True, help="Project directory")
+    rollback_parser.add_argument(
+        "--to-session", type=int, required=True, help="Checkpoint number (see the list command)"
+    )
+    rollback_parser.add_argument(
+        "--force", action="store_true", help="Discard uncommitted changes in the git working tree"
+    )
+    args = parser.parse_args()
+
+    if args.command == "list":
+        checkpoints = list_checkpoints(args.project_dir)
+        if not checkpoints:
+            print(f"No checkpoints in {args.project_dir}")
+        for checkpoint in checkpoints:
+            head = (checkpoint["git_head"] or "no git")[:12]
+            size = f"{checkpoint['database']['size'] / 1024:.0f} KiB" if checkpoint["database"] else "no database"
+            print(
+                f"  {checkpoint['session']:>4}  {checkpoint['created_at']}  phase {checkpoint['phase'] or '-'}  "
+                f"{head:<12}  {size}  {checkpoint['session_id'] or ''}"
+            )
+        return 0
+
+    try:
+        checkpoint = rollback(args.project_dir, args.to_session, force=args.force)
+    except (ValueError, RuntimeError) as e:
+        print(f"Rollback failed: {e}")
+        return 1
+
+    print(f"Rolled back {args.project_dir} to before session {checkpoint['session']} ({checkpoint['created_at']})")
+    if checkpoint["git_head"] and checkpoint["previous_head"]:
+        print(f"  git: {checkpoint['previous_head'][:12]} -> {checkpoint['git_head'][:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,17 +13,23 @@ from pathlib import Path
 from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient
 from claude_agent_sdk.types import HookMatcher
 
-from security import bash_security_hook
+from security import create_bash_security_hook
+from security_policy import GLOBAL_POLICY_FILE, get_project_policy_path
 
 
 # Feature MCP tools for feature/test management
 FEATURE_MCP_TOOLS = [
     "mcp__features__feature_get_stats",
     "mcp__features__feature_get_next",
+    "mcp__features__feature_get_next_batch",
     "mcp__features__feature_get_for_regression",
     "mcp__features__feature_mark_passing",
+    "mcp__features__feature_mark_failing",
+    "mcp__features__feature_record_verification",
     "mcp__features__feature_skip",
     "mcp__features__feature_create_bulk",
+    "mcp__features__feature_get_init_status",
+    "mcp__features__feature_search",
 ]
 
 # Playwright MCP tools for browser automation
@@ -70,7 +76,7 @@ BUILTIN_TOOLS = [
 ]
 
 
-def create_client(project_dir: Path, model: str, phase: int = 1):
+def create_client(project_dir: Path, model: str, phase: int = 1, session_id: str | None = None):
     """
     Create a Claude Agent SDK client with multi-layered security.
 
@@ -78,6 +84,7 @@ def create_client(project_dir: Path, model: str, phase: int = 1):
         project_dir: Directory for the project
         model: Claude model to use
         phase: Current phase number (passed to MCP server, default: 1)
+        session_id: Agent session id recorded with feature events (passed to MCP server)
 
     Returns:
         Configured ClaudeSDKClient (from claude_agent_sdk)
@@ -86,7 +93,8 @@ def create_client(project_dir: Path, model: str, phase: int = 1):
     1. Sandbox - OS-level bash command isolation prevents filesystem escape
     2. Permissions - File operations restricted to project_dir only
     3. Security hooks - Bash commands validated against an allowlist
-       (see security.py for ALLOWED_COMMANDS)
+       (see security.py for ALLOWED_COMMANDS) and optional per-project
+       policy files (see security_policy.py)
 
     Note: Authentication is handled by start.bat/start.sh before this runs.
     The Claude SDK auto-detects credentials from ~/.claude/.credentials.json
@@ -113,6 +121,15 @@ def create_client(project_dir: Path, model: str, phase: int = 1):
                 # Allow Feature MCP tools for feature management
                 *FEATURE_MCP_TOOLS,
             ],
+            # The agent must not be able to loosen its own security policy.
+            # Policy files live outside the project, so the Write/Edit
+            # allowances above never reach them; these denies are an extra
+            # layer ("//" marks an absolute path).
+            "deny": [
+                f"{tool}(/{policy_file.resolve().as_posix()})"
+                for policy_file in (GLOBAL_POLICY_FILE, get_project_policy_path(project_dir))
+                for tool in ("Write", "Edit")
+            ],
         },
     }
 
@@ -128,6 +145,9 @@ def create_client(project_dir: Path, model: str, phase: int = 1):
     print("   - Sandbox enabled (OS-level bash isolation)")
     print(f"   - Filesystem restricted to: {project_dir.resolve()}")
     print("   - Bash commands restricted to allowlist (see security.py)")
+    for policy_file in (GLOBAL_POLICY_FILE, get_project_policy_path(project_dir)):
+        if policy_file.exists():
+            print(f"   - Security policy: {policy_file}")
     print("   - MCP servers: playwright (browser), features (database)")
     print("   - Project settings enabled (skills, commands, CLAUDE.md)")
     print()
@@ -152,12 +172,16 @@ def create_client(project_dir: Path, model: str, phase: int = 1):
                         "PROJECT_DIR": str(project_dir.resolve()),
                         "PYTHONPATH": str(Path(__file__).parent.resolve()),
                         "CURRENT_PHASE": str(phase),
+                        "FEATURES_BACKEND": os.environ.get("FEATURES_BACKEND", "sqlite"),
+                        # Unindented tool responses cost the agent fewer tokens
+                        "FEATURES_COMPACT": os.environ.get("FEATURES_COMPACT", "1"),
+                        "AGENT_SESSION_ID": session_id or "",
                     },
                 },
             },
             hooks={
                 "PreToolUse": [
-                    HookMatcher(matcher="Bash", hooks=[bash_security_hook]),
+                    HookMatcher(matcher="Bash", hooks=[create_bash_security_hook(project_dir)]),
                 ],
             },
             max_turns=1000,
@@ -8,33 +8,85 @@ replacing the previous FastAPI-based REST API.
 
 Tools:
 - feature_get_stats: Get progress statistics
-- feature_get_next: Get next feature to implement
-- feature_get_for_regression: Get random passing features for testing
+- feature_get_next: Get next ready feature to implement (all dependencies passing)
+- feature_get_next_batch: Get the next k ready features, optionally capped by total steps
+- feature_get_for_regression: Get the least recently verified passing features for testing
 - feature_mark_passing: Mark a feature as passing
+- feature_mark_failing: Mark a previously passing feature as failing (regression)
+- feature_record_verification: Record a regression check result (pass or fail)
 - feature_skip: Skip a feature (move to end of queue)
-- feature_create_bulk: Create multiple features at once
+- feature_create_bulk: Create multiple features at once, optionally checkpointing a spec section
+- feature_get_init_status: Which spec sections the initializer has created features for
+- feature_search: Full-text search over feature names, descriptions and steps
+
+Tools are async: database reads run on a bounded worker pool and mutations on
+a single writer thread, in arrival order, so a long feature_create_bulk never
+blocks the event loop or concurrent reads.
+
+Read tools accept fields= to return only some feature fields, compact=true for
+unindented JSON and short_keys=true for abbreviated feature keys; responses are
+encoded with orjson when it is installed.
+
+The server is spawned fresh for every agent session, so startup only imports
+what is needed to answer the MCP handshake. The database is opened, through the
+storage backend selected by FEATURES_BACKEND ("sqlite" or "orm", see
+api/storage.py), on the first tool call.
+Run it as a module from the repository root (python -m mcp_server.feature_mcp),
+as client.py does.
 """
 
+import asyncio
+import functools
 import json
 import os
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Annotated
 
 from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel, Field
-from sqlalchemy.sql.expression import func
 
-# Add parent directory to path so we can import from api module
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from api.database import Feature, create_database
-from api.migration import migrate_json_to_sqlite, migrate_add_phase_column
+try:
+    import orjson  # Optional: faster JSON encoding of tool responses
+except ImportError:
+    orjson = None
 
 # Configuration from environment
 PROJECT_DIR = Path(os.environ.get("PROJECT_DIR", ".")).resolve()
 CURRENT_PHASE = int(os.environ.get("CURRENT_PHASE", "1"))
+FEATURES_BACKEND = os.environ.get("FEATURES_BACKEND", "sqlite")
+# Agent session recorded with feature history events (None outside the agent)
+SESSION_ID = os.environ.get("AGENT_SESSION_ID") or None
+# Threads running read-only tool work (writes always run on one thread)
+READ_WORKERS = int(os.environ.get("FEATURES_READ_WORKERS", "4"))
+# Unindented JSON for every tool response (tools' compact flags still apply)
+COMPACT_OUTPUT = os.environ.get("FEATURES_COMPACT", "").lower() in ("1", "true", "yes")
+
+# Abbreviated feature keys returned with short_keys=true
+SHORT_KEYS = {
+    "id": "id",
+    "priority": "pr",
+    "category": "cat",
+    "name": "n",
+    "description": "d",
+    "steps": "st",
+    "passes": "ok",
+    "phase": "ph",
+    "blocked_by": "bb",
+    "last_verified_at": "lv",
+    "verification_count": "vc",
+    "snippet": "sn",
+}
+SHORT_KEYS_HELP = "Abbreviate feature keys (" + ", ".join(f"{k}={v}" for k, v in SHORT_KEYS.items() if k != v) + ")"
+FIELDS_HELP = "Only return these feature fields, e.g. [\"name\", \"passes\"] (id is always included)"
+
+# Feature columns feature_skip reads (it never needs description or steps)
+SKIP_COLUMNS = ("id", "priority", "name", "passes")
+# Feature columns read before a passes change, to patch the cached stats
+STATS_COLUMNS = ("id", "category", "passes", "phase")
 
 
 # Pydantic models for input validation
@@ -59,6 +111,8 @@ class FeatureCreateItem(BaseModel):
     name: str = Field(..., min_length=1, max_length=255, description="Feature name")
     description: str = Field(..., min_length=1, description="Detailed description")
     steps: list[str] = Field(..., min_length=1, description="Implementation/test steps")
+    depends_on: list[int] = Field(default_factory=list, description="Indices of features in the same batch this one depends on")
+    depends_on_ids: list[int] = Field(default_factory=list, description="IDs of existing features this one depends on")
 
 
 class BulkCreateInput(BaseModel):
@@ -66,145 +120,427 @@ class BulkCreateInput(BaseModel):
     features: list[FeatureCreateItem] = Field(..., min_length=1, description="List of features to create")
 
 
-# Global database session maker (initialized on startup)
-_session_maker = None
-_engine = None
+# Global feature store (opened on first use)
+_store = None
+_init_lock = threading.Lock()
 
+# Database work runs off the event loop: reads on a bounded pool, mutations on a
+# single writer thread so they apply one at a time in the order they arrive
+_read_executor = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="feature-read")
+_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feature-write")
+
+
+def _run_in(executor: ThreadPoolExecutor):
+    """Turn a blocking tool function into a coroutine running on the executor."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def tool(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+        return tool
+    return decorate
+
+
+_reads = _run_in(_read_executor)
+_writes = _run_in(_write_executor)
+
+# Progress pushes to the project registry run on their own thread, coalesced,
+# so a write never waits on the registry database
+_registry_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feature-registry")
+_registry_lock = threading.Lock()
+_registry_push_pending = False
+
+# Queued bookkeeping writes that failed since startup (reported by feature_get_stats)
+_failed_writes = 0
+_failed_writes_lock = threading.Lock()
 
-@asynccontextmanager
-async def server_lifespan(server: FastMCP):
-    """Initialize database on startup, cleanup on shutdown."""
-    global _session_maker, _engine
 
-    # Create project directory if it doesn't exist
-    PROJECT_DIR.mkdir(parents=True, exist_ok=True)
+def _report_write_error(future: Future) -> None:
+    global _failed_writes
+    error = future.exception()
+    if error is not None:
+        with _failed_writes_lock:
+            _failed_writes += 1
+        # stdout carries the MCP protocol
+        print(f"[Queued feature write failed: {error}]", file=sys.stderr)
 
-    # Initialize database
-    _engine, _session_maker = create_database(PROJECT_DIR)
 
-    # Run migration if needed (converts legacy JSON to SQLite)
-    migrate_json_to_sqlite(PROJECT_DIR, _session_maker)
+def _report_registry_error(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        print(f"[Registry update failed: {error}]", file=sys.stderr)
 
-    # Run phase column migration for existing databases
-    migrate_add_phase_column(PROJECT_DIR, _session_maker)
 
+def _queue_write(fn, *args) -> None:
+    """Queue bookkeeping writes (e.g. served events) on the writer without waiting; failures are counted."""
+    _write_executor.submit(fn, *args).add_done_callback(_report_write_error)
+
+
+def wait_for_writes() -> None:
+    """Block until every write queued so far, and its registry push, has been applied."""
+    _write_executor.submit(lambda: None).result()
+    _registry_executor.submit(lambda: None).result()
+
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP):
+    """Defer database setup to the first tool call, cleanup on shutdown."""
     yield
 
     # Cleanup
-    if _engine:
-        _engine.dispose()
+    wait_for_writes()
+    if _store is not None:
+        _store.close()
 
 
 # Initialize the MCP server
 mcp = FastMCP("features", lifespan=server_lifespan)
 
 
-def get_session():
-    """Get a new database session."""
-    if _session_maker is None:
-        raise RuntimeError("Database not initialized")
-    return _session_maker()
+def get_store():
+    """Get the feature store, opening the database on first use."""
+    global _store
+    if _store is None:
+        with _init_lock:
+            if _store is None:
+                from api.storage import open_feature_store
+
+                # Create project directory if it doesn't exist
+                PROJECT_DIR.mkdir(parents=True, exist_ok=True)
+                _store = open_feature_store(PROJECT_DIR, FEATURES_BACKEND)
+    return _store
+
+
+# Grouped (phase, category, total, passing) rows, kept current by this server's
+# writes (see _progress_changed). Keyed by the write generation and the database
+# files' signature so that writes from other processes invalidate it.
+_stats_cache: tuple[tuple, list] | None = None
+_stats_lock = threading.Lock()
+_write_generation = 0
+
+
+def _invalidate_stats() -> None:
+    """Invalidate cached stats after a write."""
+    global _write_generation
+    _write_generation += 1
+
+
+def _stats_signature() -> tuple:
+    signature = [_write_generation]
+    for suffix in ("", "-wal"):
+        try:
+            st = (PROJECT_DIR / f"features.db{suffix}").stat()
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _grouped_counts() -> list:
+    """Get (phase, category, total, passing) rows from a single GROUP BY."""
+    global _stats_cache
+    signature = _stats_signature()
+    cache = _stats_cache
+    if cache is not None and cache[0] == signature:
+        return cache[1]
+
+    rows = get_store().grouped_counts()
+    with _stats_lock:
+        _stats_cache = (signature, rows)
+    return rows
+
+
+def _current_stats():
+    """The cached stats if they are current; taken before a write for _progress_changed."""
+    cache = _stats_cache
+    return cache if cache is not None and cache[0] == _stats_signature() else None
+
+
+def _passes_delta(before: dict, after: dict) -> dict[tuple[int, str], tuple[int, int]]:
+    """Stats delta of a feature's passes change: {(phase, category): (total, passing)}."""
+    change = int(after["passes"]) - int(before["passes"])
+    return {(before["phase"], before["category"]): (0, change)} if change else {}
+
+
+def _progress_changed(cached, delta: dict[tuple[int, str], tuple[int, int]] | None) -> None:
+    """
+    Apply a write to the cached stats and schedule a registry push.
+
+    cached is _current_stats() from before the write and delta the write's
+    count changes per (phase, category). The cached rows are patched in place
+    of a new GROUP BY; if they were stale, or replaced during the write, they
+    are invalidated instead and the next read recomputes them.
+    """
+    global _stats_cache
+    with _stats_lock:
+        if cached is not None and delta is not None and _stats_cache is cached:
+            counts = {(phase, category): [total, passing] for phase, category, total, passing in cached[1]}
+            for key, (total, passing) in delta.items():
+                entry = counts.setdefault(key, [0, 0])
+                entry[0] += total
+                entry[1] += passing
+            rows = [(phase, category, total, passing) for (phase, category), (total, passing) in counts.items()]
+            _stats_cache = (_stats_signature(), rows)
+        else:
+            _invalidate_stats()
+    _schedule_registry_push()
+
+
+def _schedule_registry_push() -> None:
+    """Push the current phase's counts to the project registry soon, once per burst of writes."""
+    global _registry_push_pending
+    with _registry_lock:
+        if _registry_push_pending:
+            return
+        _registry_push_pending = True
+    _registry_executor.submit(_push_progress).add_done_callback(_report_registry_error)
+
+
+def _push_progress() -> None:
+    global _registry_push_pending
+    from registry import update_project
+
+    with _registry_lock:
+        # Writes from here on schedule another push
+        _registry_push_pending = False
+    passing = total = 0
+    for phase, _, phase_total, phase_passing in _grouped_counts():
+        if phase == CURRENT_PHASE:
+            passing += phase_passing
+            total += phase_total
+    # Failures reach _report_registry_error; stdout carries the MCP protocol
+    update_project(PROJECT_DIR, phase=CURRENT_PHASE, passing=passing, total=total, raise_errors=True)
+
+
+def _summary(passing: int, total: int, compact: bool):
+    if compact:
+        return [passing, total]
+    percentage = round((passing / total) * 100, 1) if total > 0 else 0.0
+    return {"passing": passing, "total": total, "percentage": percentage}
+
+
+def _dumps(obj, compact: bool = False) -> str:
+    """Encode a tool response, indented unless compact (or FEATURES_COMPACT is set)."""
+    compact = compact or COMPACT_OUTPUT
+    if orjson is not None:
+        return orjson.dumps(obj, option=0 if compact else orjson.OPT_INDENT_2).decode()
+    # Same bytes as orjson: no spaces when compact, non-ASCII text unescaped
+    if compact:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def _fields_error(fields: list[str] | None, allowed: tuple[str, ...]) -> str | None:
+    """Return an error response if fields names anything but allowed fields."""
+    unknown = sorted(set(fields or ()) - set(allowed))
+    if unknown:
+        return json.dumps({"error": f"Unknown fields {unknown} (available: {', '.join(allowed)})"})
+    return None
+
+
+def _shape(items: list[dict], fields: list[str] | None, short_keys: bool) -> list[dict]:
+    """Apply a field projection (keeping id) and key abbreviation to feature objects."""
+    if fields is not None:
+        wanted = {"id", *fields}
+        items = [{key: value for key, value in item.items() if key in wanted} for item in items]
+    if short_keys:
+        items = [{SHORT_KEYS.get(key, key): value for key, value in item.items()} for item in items]
+    return items
 
 
 @mcp.tool()
-def feature_get_stats() -> str:
+@_reads
+def feature_get_stats(
+    breakdown: Annotated[bool, Field(default=False, description="Include per-category and per-phase breakdowns")] = False,
+    compact: Annotated[bool, Field(default=False, description="Compact output: no indentation, breakdowns as [passing, total]")] = False,
+) -> str:
     """Get statistics about feature completion progress for the current phase.
 
     Returns the number of passing features, total features, and completion percentage
     for the current phase. Use this to track overall progress of the implementation.
+    With breakdown=true, also shows which categories and phases lag behind.
+
+    Args:
+        breakdown: Include by_category (current phase) and by_phase breakdowns
+        compact: Unindented JSON, with breakdown entries as [passing, total]
 
     Returns:
-        JSON with: passing (int), total (int), percentage (float), phase (int)
+        JSON with: passing (int), total (int), percentage (float), phase (int),
+        with breakdown: by_category, by_phase, and failed_writes (int) if any
+        queued bookkeeping writes (feature history events) failed
     """
-    session = get_session()
-    try:
-        total = session.query(Feature).filter(Feature.phase == CURRENT_PHASE).count()
-        passing = session.query(Feature).filter(
-            Feature.passes == True,
-            Feature.phase == CURRENT_PHASE
-        ).count()
-        percentage = round((passing / total) * 100, 1) if total > 0 else 0.0
+    rows = _grouped_counts()
 
-        return json.dumps({
-            "passing": passing,
-            "total": total,
-            "percentage": percentage,
-            "phase": CURRENT_PHASE
-        }, indent=2)
-    finally:
-        session.close()
+    by_category: dict[str, list[int]] = {}
+    by_phase: dict[int, list[int]] = {}
+    for phase, category, total, passing in rows:
+        phase_counts = by_phase.setdefault(phase, [0, 0])
+        phase_counts[0] += passing
+        phase_counts[1] += total
+        if phase == CURRENT_PHASE:
+            by_category[category] = [passing, total]
+
+    passing, total = by_phase.get(CURRENT_PHASE, [0, 0])
+    result = {**_summary(passing, total, compact=False), "phase": CURRENT_PHASE}
+
+    if breakdown:
+        result["by_category"] = {
+            category: _summary(p, t, compact) for category, (p, t) in sorted(by_category.items())
+        }
+        result["by_phase"] = {
+            str(phase): _summary(p, t, compact) for phase, (p, t) in sorted(by_phase.items())
+        }
+    if _failed_writes:
+        result["failed_writes"] = _failed_writes
+
+    return _dumps(result, compact)
 
 
 @mcp.tool()
-def feature_get_next() -> str:
-    """Get the highest-priority pending feature to work on for the current phase.
+@_reads
+def feature_get_next(
+    fields: Annotated[list[str] | None, Field(default=None, description=FIELDS_HELP)] = None,
+    compact: Annotated[bool, Field(default=False, description="Unindented JSON")] = False,
+    short_keys: Annotated[bool, Field(default=False, description=SHORT_KEYS_HELP)] = False,
+) -> str:
+    """Get the highest-priority ready feature to work on for the current phase.
 
     Returns the feature with the lowest priority number that has passes=false
-    within the current phase.
+    and whose dependencies are all passing, within the current phase.
     Use this at the start of each coding session to determine what to implement next.
 
+    Args:
+        fields: Optional list of feature fields to return (id is always included)
+        compact: Unindented JSON
+        short_keys: Abbreviated feature keys
+
     Returns:
-        JSON with feature details (id, priority, category, name, description, steps, passes, phase)
-        or message if all features in this phase are passing.
+        JSON with feature details (id, priority, category, name, description, steps, passes, phase,
+        blocked_by, last_verified_at, verification_count)
+        or message if all features in this phase are passing or waiting on dependencies.
     """
-    session = get_session()
-    try:
-        feature = (
-            session.query(Feature)
-            .filter(Feature.passes == False, Feature.phase == CURRENT_PHASE)
-            .order_by(Feature.priority.asc(), Feature.id.asc())
-            .first()
-        )
-
-        if feature is None:
+    from api.storage import FEATURE_COLUMNS, select_columns
+
+    error = _fields_error(fields, FEATURE_COLUMNS)
+    if error:
+        return error
+
+    store = get_store()
+    ready = store.next_ready(CURRENT_PHASE, 1, select_columns(fields))
+
+    if not ready:
+        blocked = store.count_pending(CURRENT_PHASE)
+        if blocked > 0:
             return json.dumps({
-                "message": f"All features in Phase {CURRENT_PHASE} are passing!",
+                "message": f"{blocked} pending features in Phase {CURRENT_PHASE} are waiting on dependencies",
                 "phase": CURRENT_PHASE,
-                "status": "complete"
+                "status": "blocked"
             })
+        return json.dumps({
+            "message": f"All features in Phase {CURRENT_PHASE} are passing!",
+            "phase": CURRENT_PHASE,
+            "status": "complete"
+        })
+
+    _queue_write(store.record_served, [ready[0]["id"]], SESSION_ID)
+    return _dumps(_shape(ready, fields, short_keys)[0], compact)
+
+
+@mcp.tool()
+@_reads
+def feature_get_next_batch(
+    k: Annotated[int, Field(default=3, ge=1, le=10, description="Maximum number of features to return")] = 3,
+    max_total_steps: Annotated[int | None, Field(default=None, ge=1, description="Optional cap on the combined number of steps")] = None,
+    fields: Annotated[list[str] | None, Field(default=None, description=FIELDS_HELP)] = None,
+    compact: Annotated[bool, Field(default=False, description="Unindented JSON")] = False,
+    short_keys: Annotated[bool, Field(default=False, description=SHORT_KEYS_HELP)] = False,
+) -> str:
+    """Get the next k ready features for the current phase in queue order.
+
+    Like feature_get_next, but returns several features at once so a session
+    can take a sized chunk of work in one call. If max_total_steps is given,
+    features are taken in queue order until adding the next one would exceed
+    the cap (the first feature is always included).
 
-        return json.dumps(feature.to_dict(), indent=2)
-    finally:
-        session.close()
+    Args:
+        k: Maximum number of features to return (1-10, default 3)
+        max_total_steps: Optional cap on the combined step count of the returned features
+        fields: Optional list of feature fields to return (id is always included)
+        compact: Unindented JSON
+        short_keys: Abbreviated feature keys
+
+    Returns:
+        JSON with: features (list of feature objects), count (int), total_steps (int), phase (int)
+    """
+    from api.storage import FEATURE_COLUMNS, select_columns
+
+    error = _fields_error(fields, FEATURE_COLUMNS)
+    if error:
+        return error
+
+    # Steps are always read for total_steps; projected away below if not requested
+    columns = select_columns(None if fields is None else [*fields, "steps"])
+    store = get_store()
+    features = []
+    total_steps = 0
+    for feature in store.next_ready(CURRENT_PHASE, k, columns):
+        steps = len(feature["steps"] or [])
+        if features and max_total_steps is not None and total_steps + steps > max_total_steps:
+            break
+        features.append(feature)
+        total_steps += steps
+
+    _queue_write(store.record_served, [feature["id"] for feature in features], SESSION_ID)
+
+    return _dumps({
+        "features": _shape(features, fields, short_keys),
+        "count": len(features),
+        "total_steps": total_steps,
+        "phase": CURRENT_PHASE
+    }, compact)
 
 
 @mcp.tool()
+@_reads
 def feature_get_for_regression(
-    limit: Annotated[int, Field(default=3, ge=1, le=10, description="Maximum number of passing features to return")] = 3
+    limit: Annotated[int, Field(default=3, ge=1, le=10, description="Maximum number of passing features to return")] = 3,
+    fields: Annotated[list[str] | None, Field(default=None, description=FIELDS_HELP)] = None,
+    compact: Annotated[bool, Field(default=False, description="Unindented JSON")] = False,
+    short_keys: Annotated[bool, Field(default=False, description=SHORT_KEYS_HELP)] = False,
 ) -> str:
-    """Get random passing features from the current phase for regression testing.
+    """Get passing features from the current phase for regression testing.
 
-    Returns a random selection of features that are currently passing
-    within the current phase.
-    Use this to verify that previously implemented features still work
-    after making changes.
+    Returns the features that have gone longest without a regression check:
+    never-verified features first, then the oldest last_verified_at. Record
+    each check with feature_record_verification, so successive calls cover
+    every passing feature before repeating any.
 
     Args:
         limit: Maximum number of features to return (1-10, default 3)
+        fields: Optional list of feature fields to return (id is always included)
+        compact: Unindented JSON
+        short_keys: Abbreviated feature keys
 
     Returns:
         JSON with: features (list of feature objects), count (int), phase (int)
     """
-    session = get_session()
-    try:
-        features = (
-            session.query(Feature)
-            .filter(Feature.passes == True, Feature.phase == CURRENT_PHASE)
-            .order_by(func.random())
-            .limit(limit)
-            .all()
-        )
+    from api.storage import FEATURE_COLUMNS, select_columns
 
-        return json.dumps({
-            "features": [f.to_dict() for f in features],
-            "count": len(features),
-            "phase": CURRENT_PHASE
-        }, indent=2)
-    finally:
-        session.close()
+    error = _fields_error(fields, FEATURE_COLUMNS)
+    if error:
+        return error
+
+    features = get_store().least_recently_verified(CURRENT_PHASE, limit, select_columns(fields))
+
+    return _dumps({
+        "features": _shape(features, fields, short_keys),
+        "count": len(features),
+        "phase": CURRENT_PHASE
+    }, compact)
 
 
 @mcp.tool()
+@_writes
 def feature_mark_passing(
     feature_id: Annotated[int, Field(description="The ID of the feature to mark as passing", ge=1)]
 ) -> str:
@@ -219,23 +555,81 @@ def feature_mark_passing(
     Returns:
         JSON with the updated feature details, or error if not found.
     """
-    session = get_session()
-    try:
-        feature = session.query(Feature).filter(Feature.id == feature_id).first()
+    store = get_store()
+    cached = _current_stats()
+    before = store.get(feature_id, STATS_COLUMNS)
+    feature = store.mark_passing(feature_id, SESSION_ID) if before is not None else None
+
+    if feature is None:
+        return json.dumps({"error": f"Feature with ID {feature_id} not found"})
+
+    _progress_changed(cached, _passes_delta(before, feature))
+    return _dumps(feature)
+
+
+@mcp.tool()
+@_writes
+def feature_mark_failing(
+    feature_id: Annotated[int, Field(description="The ID of the passing feature that no longer works", ge=1)]
+) -> str:
+    """Mark a previously passing feature as failing after a regression.
+
+    Use this when regression testing shows that a feature marked as passing
+    no longer works. The feature returns to the queue, and features that
+    depend on it wait until it passes again.
+
+    Args:
+        feature_id: The ID of the feature to mark as failing
+
+    Returns:
+        JSON with the updated feature details, or error if not found.
+    """
+    store = get_store()
+    cached = _current_stats()
+    before = store.get(feature_id, STATS_COLUMNS)
+    feature = store.mark_failing(feature_id, SESSION_ID) if before is not None else None
+
+    if feature is None:
+        return json.dumps({"error": f"Feature with ID {feature_id} not found"})
 
-        if feature is None:
-            return json.dumps({"error": f"Feature with ID {feature_id} not found"})
+    _progress_changed(cached, _passes_delta(before, feature))
+    return _dumps(feature)
 
-        feature.passes = True
-        session.commit()
-        session.refresh(feature)
 
-        return json.dumps(feature.to_dict(), indent=2)
-    finally:
-        session.close()
+@mcp.tool()
+@_writes
+def feature_record_verification(
+    feature_id: Annotated[int, Field(description="The ID of the feature that was checked", ge=1)],
+    passed: Annotated[bool, Field(description="Whether the feature still works")]
+) -> str:
+    """Record the result of a regression check on a feature.
+
+    Call this for every feature returned by feature_get_for_regression after
+    checking it. The check time and count are recorded either way; a failed
+    check also marks the feature as failing (as feature_mark_failing does),
+    returning it to the queue.
+
+    Args:
+        feature_id: The ID of the feature that was checked
+        passed: True if the feature still works, False if it regressed
+
+    Returns:
+        JSON with the updated feature details, or error if not found.
+    """
+    store = get_store()
+    cached = _current_stats()
+    before = store.get(feature_id, STATS_COLUMNS)
+    feature = store.record_verification(feature_id, passed, SESSION_ID) if before is not None else None
+
+    if feature is None:
+        return json.dumps({"error": f"Feature with ID {feature_id} not found"})
+
+    _progress_changed(cached, _passes_delta(before, feature))
+    return _dumps(feature)
 
 
 @mcp.tool()
+@_writes
 def feature_skip(
     feature_id: Annotated[int, Field(description="The ID of the feature to skip", ge=1)]
 ) -> str:
@@ -243,6 +637,7 @@ def feature_skip(
 
     Use this when a feature cannot be implemented yet due to:
     - Dependencies on other features that aren't implemented yet
+      (declare these with depends_on in feature_create_bulk where possible)
     - External blockers (missing assets, unclear requirements)
     - Technical prerequisites that need to be addressed first
 
@@ -255,48 +650,82 @@ def feature_skip(
     Returns:
         JSON with skip details: id, name, old_priority, new_priority, message
     """
-    session = get_session()
-    try:
-        feature = session.query(Feature).filter(Feature.id == feature_id).first()
-
-        if feature is None:
-            return json.dumps({"error": f"Feature with ID {feature_id} not found"})
-
-        if feature.passes:
-            return json.dumps({"error": "Cannot skip a feature that is already passing"})
-
-        old_priority = feature.priority
-
-        # Get max priority and set this feature to max + 1
-        max_priority_result = session.query(Feature.priority).order_by(Feature.priority.desc()).first()
-        new_priority = (max_priority_result[0] + 1) if max_priority_result else 1
+    store = get_store()
+    feature = store.get(feature_id, SKIP_COLUMNS)
+
+    if feature is None:
+        return json.dumps({"error": f"Feature with ID {feature_id} not found"})
+
+    if feature["passes"]:
+        return json.dumps({"error": "Cannot skip a feature that is already passing"})
+
+    new_priority = store.move_to_end(feature_id, SESSION_ID)
+
+    return _dumps({
+        "id": feature["id"],
+        "name": feature["name"],
+        "old_priority": feature["priority"],
+        "new_priority": new_priority,
+        "message": f"Feature '{feature['name']}' moved to end of queue"
+    })
+
+
+def _dependency_error(features: list[dict]) -> str | None:
+    """Return an error message if batch-internal dependencies form a cycle."""
+    remaining = {
+        i: set(feature_data.get("depends_on", []))
+        for i, feature_data in enumerate(features)
+    }
+    ready = [i for i, deps in remaining.items() if not deps]
+    dependents: dict[int, list[int]] = {}
+    for i, deps in remaining.items():
+        for dep in deps:
+            dependents.setdefault(dep, []).append(i)
+
+    resolved = 0
+    while ready:
+        i = ready.pop()
+        resolved += 1
+        for dependent in dependents.get(i, []):
+            remaining[dependent].discard(i)
+            if not remaining[dependent]:
+                ready.append(dependent)
+
+    if resolved < len(features):
+        cyclic = sorted(i for i, deps in remaining.items() if deps)
+        return f"Dependency cycle between features at indices {cyclic}"
+    return None
+
+
+def _spec_section_names() -> list[str] | None:
+    """Section names of the current phase's spec, or None if the spec cannot be read."""
+    from prompts import get_phase_spec, get_spec_sections
 
-        feature.priority = new_priority
-        session.commit()
-        session.refresh(feature)
-
-        return json.dumps({
-            "id": feature.id,
-            "name": feature.name,
-            "old_priority": old_priority,
-            "new_priority": new_priority,
-            "message": f"Feature '{feature.name}' moved to end of queue"
-        }, indent=2)
-    finally:
-        session.close()
+    try:
+        return [name for name, _ in get_spec_sections(get_phase_spec(PROJECT_DIR, CURRENT_PHASE))]
+    except FileNotFoundError:
+        return None
 
 
 @mcp.tool()
+@_writes
 def feature_create_bulk(
-    features: Annotated[list[dict], Field(description="List of features to create, each with category, name, description, and steps")]
+    features: Annotated[list[dict], Field(description="List of features to create, each with category, name, description, steps, and optionally depends_on (batch indices) and depends_on_ids (existing feature IDs)")],
+    section: Annotated[str | None, Field(default=None, description="Spec section these features cover; records the section as done (one call per section)")] = None,
 ) -> str:
     """Create multiple features for the current phase in a single operation.
 
     Features are assigned sequential priorities based on their order.
     All features start with passes=false and are assigned to the current phase.
 
+    Dependencies can be declared so that feature_get_next only offers a feature
+    once everything it depends on is passing.
+
     This is typically used by the initializer agent to set up the initial
-    feature list from the app specification.
+    feature list from the app specification. Passing section records that
+    spec section as done in the same transaction, so an interrupted
+    initializer resumes with the remaining sections (see
+    feature_get_init_status); each section can only be recorded once.
 
     Args:
         features: List of features to create, each with:
@@ -304,52 +733,161 @@ def feature_create_bulk(
             - name (str): Feature name
             - description (str): Detailed description
             - steps (list[str]): Implementation/test steps
+            - depends_on (list[int], optional): 0-based indices of features in
+              this same list that must pass first
+            - depends_on_ids (list[int], optional): IDs of existing features
+              that must pass first
+        section: Optional spec section name the features cover (may be an
+            empty list of features for a section that needs none)
 
     Returns:
-        JSON with: created (int), phase (int) - number of features created and phase
+        JSON with: created (int), phase (int) - number of features created and phase,
+        and with section: section (str) and pending_sections (list of names)
     """
-    session = get_session()
     try:
-        # Get the starting priority for this phase
-        max_priority_result = (
-            session.query(Feature.priority)
-            .filter(Feature.phase == CURRENT_PHASE)
-            .order_by(Feature.priority.desc())
-            .first()
-        )
-        start_priority = (max_priority_result[0] + 1) if max_priority_result else 1
-
-        created_count = 0
+        store = get_store()
+
+        section_names = None
+        if section is not None:
+            section_names = _spec_section_names()
+            if section_names is not None and section not in section_names:
+                return json.dumps({
+                    "error": f"Unknown spec section {section!r} (sections: {', '.join(section_names)})"
+                })
+            completed = store.completed_sections(CURRENT_PHASE)
+            if section in completed:
+                return json.dumps({
+                    "error": f"Section {section!r} already has its features ({completed[section]} created); "
+                             "continue with the pending sections"
+                })
+
+        # Validate all features before writing anything
         for i, feature_data in enumerate(features):
-            # Validate required fields
             if not all(key in feature_data for key in ["category", "name", "description", "steps"]):
                 return json.dumps({
                     "error": f"Feature at index {i} missing required fields (category, name, description, steps)"
                 })
+            for dep in feature_data.get("depends_on", []):
+                if not isinstance(dep, int) or not 0 <= dep < len(features) or dep == i:
+                    return json.dumps({
+                        "error": f"Feature at index {i} has invalid depends_on index {dep!r}"
+                    })
+
+        cycle_error = _dependency_error(features)
+        if cycle_error:
+            return json.dumps({"error": cycle_error})
+
+        # Passing state of referenced existing features
+        existing_ids = {dep for f in features for dep in f.get("depends_on_ids", [])}
+        existing_passes = store.passes_by_id(existing_ids)
+        missing = existing_ids - existing_passes.keys()
+        if missing:
+            return json.dumps({"error": f"depends_on_ids reference unknown features: {sorted(missing)}"})
+
+        rows = []
+        for feature_data in features:
+            batch_deps = set(feature_data.get("depends_on", []))
+            existing_deps = set(feature_data.get("depends_on_ids", []))
+            rows.append({
+                **feature_data,
+                # New features never pass, so every batch dependency is unsatisfied
+                "blocked_by": len(batch_deps) + sum(1 for d in existing_deps if not existing_passes[d]),
+            })
 
-            db_feature = Feature(
-                priority=start_priority + i,
-                category=feature_data["category"],
-                name=feature_data["name"],
-                description=feature_data["description"],
-                steps=feature_data["steps"],
-                passes=False,
-                phase=CURRENT_PHASE,
-            )
-            session.add(db_feature)
-            created_count += 1
-
-        session.commit()
+        cached = _current_stats()
+        created = store.create_features(CURRENT_PHASE, rows, section)
+        delta: dict[tuple[int, str], tuple[int, int]] = {}
+        for feature_data in features:
+            key = (CURRENT_PHASE, feature_data["category"])
+            delta[key] = (delta.get(key, (0, 0))[0] + 1, 0)
+        _progress_changed(cached, delta)
 
-        return json.dumps({
-            "created": created_count,
+        result = {
+            "created": created,
             "phase": CURRENT_PHASE
-        }, indent=2)
+        }
+        if section is not None:
+            completed = store.completed_sections(CURRENT_PHASE)
+            result["section"] = section
+            result["pending_sections"] = [name for name in section_names or [] if name not in completed]
+        return _dumps(result)
     except Exception as e:
-        session.rollback()
         return json.dumps({"error": str(e)})
-    finally:
-        session.close()
+
+
+@mcp.tool()
+@_reads
+def feature_get_init_status() -> str:
+    """Get which spec sections of the current phase already have their features.
+
+    The initializer creates features one spec section at a time with
+    feature_create_bulk(section=...). Call this at the start of an
+    initializer session to see whether an earlier, interrupted session
+    already covered some sections, and continue with the pending ones.
+
+    Returns:
+        JSON with: phase (int), sections (list of {name, status ("done" or
+        "pending"), features}), done (int), total (int), complete (bool) and
+        next_section (name of the first pending section, or null)
+    """
+    completed = get_store().completed_sections(CURRENT_PHASE)
+    names = _spec_section_names()
+    if names is None:
+        names = list(completed)  # No readable spec: report what was recorded
+
+    sections = [
+        {"name": name, "status": "done", "features": completed[name]} if name in completed
+        else {"name": name, "status": "pending", "features": 0}
+        for name in names
+    ]
+    pending = [section["name"] for section in sections if section["status"] == "pending"]
+    return _dumps({
+        "phase": CURRENT_PHASE,
+        "sections": sections,
+        "done": len(sections) - len(pending),
+        "total": len(sections),
+        "complete": not pending,
+        "next_section": pending[0] if pending else None,
+    })
+
+
+@mcp.tool()
+@_reads
+def feature_search(
+    query: Annotated[str, Field(min_length=1, description="Search terms, e.g. 'auth' or 'sidebar collapse'")],
+    phase: Annotated[int | None, Field(default=None, ge=1, description="Only search this phase (default: all phases)")] = None,
+    passes: Annotated[bool | None, Field(default=None, description="Only passing (true) or pending (false) features")] = None,
+    limit: Annotated[int, Field(default=10, ge=1, le=50, description="Maximum number of results")] = 10,
+    fields: Annotated[list[str] | None, Field(default=None, description=FIELDS_HELP)] = None,
+    compact: Annotated[bool, Field(default=False, description="Unindented JSON")] = False,
+    short_keys: Annotated[bool, Field(default=False, description=SHORT_KEYS_HELP)] = False,
+) -> str:
+    """Search features by name, description and steps, best matches first.
+
+    Use this to find every feature touching an area (e.g. "auth", "sidebar")
+    instead of exporting or paging through the whole feature list. All terms
+    must match; prefix searches like "auth*" are supported.
+
+    Args:
+        query: Search terms
+        phase: Optional phase to restrict results to
+        passes: Optional passing state to restrict results to
+        limit: Maximum number of results (1-50, default 10)
+        fields: Optional list of result fields to return (id is always included)
+        compact: Unindented JSON
+        short_keys: Abbreviated result keys
+
+    Returns:
+        JSON with: features (list of id, priority, category, name, passes, phase, snippet), count (int)
+    """
+    from api.storage import SEARCH_FIELDS
+
+    error = _fields_error(fields, SEARCH_FIELDS)
+    if error:
+        return error
+
+    features = get_store().search(query, phase, passes, limit)
+    return _dumps({"features": _shape(features, fields, short_keys), "count": len(features)}, compact)
 
 
 if __name__ == "__main__":
@@ -9,13 +9,22 @@ Uses direct SQLite access for database queries.
 import json
 import os
 import sqlite3
+import subprocess
 import urllib.request
 from datetime import datetime
 from pathlib import Path
 
+from project_state import get_state_path
+from registry import update_project
+
 
 WEBHOOK_URL = os.environ.get("PROGRESS_N8N_WEBHOOK_URL")
 PROGRESS_CACHE_FILE = ".progress_cache"
+SESSION_DIGEST_FILE = ".session_digest.json"
+
+# Feature list files imported by the MCP server (mirrors api.migration.FEATURE_IMPORT_FILES,
+# not imported from there to keep the harness free of SQLAlchemy)
+LEGACY_FEATURE_FILES = ("feature_list.json", "feature_list.ndjson", "feature_list.jsonl", "feature_list.csv")
 
 
 def has_features(project_dir: Path, phase: int = 1) -> bool:
@@ -32,14 +41,14 @@ def has_features(project_dir: Path, phase: int = 1) -> bool:
 
     Returns True if:
     - features.db exists AND has at least 1 feature for the given phase, OR
-    - feature_list.json exists (legacy format, assumes phase 1)
+    - a legacy feature list file exists (feature_list.json, .ndjson, .jsonl
+      or .csv; assumes phase 1, imported when the MCP server starts)
 
     Returns False if no features exist for the phase (initializer needs to run).
     """
-    # Check legacy JSON file first (only valid for phase 1)
+    # Check legacy feature list files first (only valid for phase 1)
     if phase == 1:
-        json_file = project_dir / "feature_list.json"
-        if json_file.exists():
+        if any((project_dir / name).exists() for name in LEGACY_FEATURE_FILES):
             return True
 
     # Check SQLite database
@@ -72,6 +81,151 @@ def has_features(project_dir: Path, phase: int = 1) -> bool:
         return False
 
 
+def get_completed_sections(project_dir: Path, phase: int) -> dict[str, int]:
+    """
+    Get the spec sections of a phase the initializer has created features for.
+
+    Args:
+        project_dir: Directory containing the project
+        phase: Phase number
+
+    Returns:
+        Dict mapping section name to the number of features created (empty
+        if there is no database or it predates section checkpoints)
+    """
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return {}
+
+    try:
+        conn = sqlite3.connect(db_file)
+        try:
+            rows = conn.execute(
+                "SELECT name, features_created FROM spec_sections WHERE phase = ?", (phase,)
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+    return dict(rows)
+
+
+def merge_section_features(project_dir: Path, phase: int, sections: list[str]) -> dict:
+    """
+    Merge the features that parallel initializer sessions created per spec section.
+
+    The sessions insert concurrently, so priorities follow the order their
+    batches arrived in, and overlapping sections can describe the same
+    feature twice. This removes pending section features whose name (ignoring
+    case and whitespace) matches an earlier feature, pointing the duplicate's
+    dependents at the kept feature, then renumbers the phase's priorities in
+    spec order: features without a section first, then by section, keeping
+    each batch's own order.
+
+    A repointed dependency closes a cycle when the kept feature already
+    depends (transitively) on the dependent, e.g. when one section referenced
+    another section's features by id. Such edges are dropped and reported, so
+    the queue never deadlocks. Each section's features_created count is
+    recomputed after the duplicates are gone.
+
+    Args:
+        project_dir: Directory containing the project
+        phase: Phase number
+        sections: Spec section names, in spec order
+
+    Returns:
+        Dict with features (remaining in the phase), duplicates (removed) and
+        cycles (dependencies dropped because they closed a cycle)
+    """
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return {"features": 0, "duplicates": 0, "cycles": 0}
+
+    position = {name: i for i, name in enumerate(sections)}
+
+    def order(row: tuple) -> tuple:
+        feature_id, _, section, _, priority = row
+        return (-1 if section is None else position.get(section, len(sections)), priority, feature_id)
+
+    try:
+        conn = sqlite3.connect(db_file, timeout=30)
+        try:
+            with conn:
+                rows = conn.execute(
+                    "SELECT id, name, section, passes, priority FROM features WHERE phase = ?", (phase,)
+                ).fetchall()
+
+                kept: dict[str, int] = {}
+                ordered: list[int] = []
+                duplicates: list[tuple[int, int]] = []
+                for feature_id, name, section, passes, _ in sorted(rows, key=order):
+                    key = " ".join(name.lower().split())
+                    if key in kept and section is not None and not passes:
+                        duplicates.append((feature_id, kept[key]))
+                    else:
+                        kept.setdefault(key, feature_id)
+                        ordered.append(feature_id)
+
+                cycles: list[tuple[int, int]] = []
+                for duplicate, keep in duplicates:
+                    # The kept feature's own dependencies stand; the duplicate's dependents now wait on it
+                    conn.execute("DELETE FROM feature_dependencies WHERE feature_id = ?", (duplicate,))
+                    conn.execute(
+                        "UPDATE OR IGNORE feature_dependencies SET depends_on_id = ? WHERE depends_on_id = ?",
+                        (keep, duplicate),
+                    )
+                    conn.execute("DELETE FROM feature_dependencies WHERE depends_on_id = ?", (duplicate,))
+                    conn.execute("DELETE FROM feature_dependencies WHERE feature_id = depends_on_id")
+                    conn.execute("DELETE FROM feature_events WHERE feature_id = ?", (duplicate,))
+                    conn.execute("DELETE FROM features WHERE id = ?", (duplicate,))
+
+                    # Every new edge points at keep, so a new cycle runs through a
+                    # dependent of keep that keep itself (transitively) depends on
+                    closing = conn.execute(
+                        "WITH RECURSIVE upstream(id) AS ("
+                        "SELECT depends_on_id FROM feature_dependencies WHERE feature_id = :keep "
+                        "UNION SELECT d.depends_on_id FROM feature_dependencies d JOIN upstream u ON d.feature_id = u.id"
+                        ") SELECT feature_id FROM feature_dependencies "
+                        "WHERE depends_on_id = :keep AND feature_id IN upstream",
+                        {"keep": keep},
+                    ).fetchall()
+                    for (dependent,) in closing:
+                        conn.execute(
+                            "DELETE FROM feature_dependencies WHERE feature_id = ? AND depends_on_id = ?",
+                            (dependent, keep),
+                        )
+                        cycles.append((dependent, keep))
+
+                if duplicates:
+                    conn.execute(
+                        "UPDATE features SET blocked_by = ("
+                        "SELECT COUNT(*) FROM feature_dependencies d JOIN features f ON f.id = d.depends_on_id "
+                        "WHERE d.feature_id = features.id AND f.passes = 0"
+                        ") WHERE phase = ?",
+                        (phase,),
+                    )
+                    conn.execute(
+                        "UPDATE spec_sections SET features_created = ("
+                        "SELECT COUNT(*) FROM features f WHERE f.phase = spec_sections.phase "
+                        "AND f.section = spec_sections.name"
+                        ") WHERE phase = ?",
+                        (phase,),
+                    )
+                conn.executemany(
+                    "UPDATE features SET priority = ? WHERE id = ?",
+                    [(priority, feature_id) for priority, feature_id in enumerate(ordered, start=1)],
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"[Database error in merge_section_features: {e}]")
+        return {"features": 0, "duplicates": 0, "cycles": 0}
+
+    for dependent, keep in cycles:
+        print(f"Dropped dependency of feature {dependent} on feature {keep}: merging duplicates made it a cycle")
+    return {"features": len(ordered), "duplicates": len(duplicates), "cycles": len(cycles)}
+
+
 def count_passing_tests(project_dir: Path, phase: int | None = None) -> tuple[int, int]:
     """
     Count passing and total tests via direct database access.
@@ -266,6 +420,157 @@ def send_progress_webhook(passing: int, total: int, project_dir: Path) -> None:
             )
 
 
+def _git(project_dir: Path, *args: str) -> str | None:
+    """Run a git command in the project, returning stdout or None on failure."""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=project_dir,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def build_session_digest(project_dir: Path, phase: int, next_limit: int = 5) -> str:
+    """
+    Build a compact summary of project state for the start of a coding session.
+
+    Covers phase progress, the next pending features, features that changed
+    state since the previous session, and git activity since then. Appended
+    to the coding prompt so the agent can skip its orientation turns.
+
+    The state seen by this session is saved to .agent_state/.session_digest.json
+    so the next session's digest can report what changed. A missing, corrupt
+    or unreadable snapshot is treated as a first session.
+
+    Args:
+        project_dir: Directory containing the project
+        phase: Current phase number
+        next_limit: Number of pending features to list
+
+    Returns:
+        Markdown section to append to the coding prompt, or '' if the
+        database has no features yet
+    """
+    db_file = project_dir / "features.db"
+    if not db_file.exists():
+        return ""
+
+    try:
+        conn = sqlite3.connect(db_file)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT COUNT(*), COALESCE(SUM(passes), 0) FROM features WHERE phase = ?",
+                (phase,),
+            )
+            total, passing = cursor.fetchone()
+
+            # Only list features that are ready (dependencies passing), if tracked
+            cursor.execute("PRAGMA table_info(features)")
+            columns = [col[1] for col in cursor.fetchall()]
+            ready_filter = " AND blocked_by = 0" if "blocked_by" in columns else ""
+            cursor.execute(
+                "SELECT id, category, name FROM features WHERE passes = 0 AND phase = ?"
+                + ready_filter
+                + " ORDER BY priority ASC, id ASC LIMIT ?",
+                (phase, next_limit),
+            )
+            pending = cursor.fetchall()
+            cursor.execute("SELECT id, name FROM features WHERE passes = 1 AND phase = ?", (phase,))
+            passing_names = dict(cursor.fetchall())
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"[Database error in build_session_digest: {e}]")
+        return ""
+
+    if total == 0:
+        return ""
+
+    # Load what the previous session saw
+    digest_file = get_state_path(project_dir, SESSION_DIGEST_FILE)
+    previous = {}
+    if digest_file.exists():
+        try:
+            previous = json.loads(digest_file.read_text())
+        except (OSError, ValueError):
+            previous = {}
+    if (
+        not isinstance(previous, dict)
+        or previous.get("phase") != phase
+        or not isinstance(previous.get("passing_ids", []), list)
+        or not all(type(fid) is int for fid in previous.get("passing_ids", []))
+        or not isinstance(previous.get("git_head", ""), (str, type(None)))
+    ):
+        previous = {}
+
+    head = _git(project_dir, "rev-parse", "HEAD")
+
+    percentage = round((passing / total) * 100, 1)
+    lines = [
+        "",
+        "",
+        "## SESSION STATE DIGEST",
+        "",
+        "Computed by the harness just before this session started. You do not need to",
+        "call feature_get_stats or read git log to orient yourself; still call",
+        "feature_get_next for the full details of the feature you work on.",
+        "",
+        f"Phase {phase} progress: {passing}/{total} features passing ({percentage}%)",
+    ]
+
+    if pending:
+        lines += ["", "Next ready features (queue order):"]
+        lines += [f"- #{fid} [{category}] {name}" for fid, category, name in pending]
+
+    if previous:
+        previous_ids = set(previous.get("passing_ids", []))
+        newly_passing = [fid for fid in passing_names if fid not in previous_ids]
+        regressed = sorted(previous_ids - passing_names.keys())
+
+        lines += ["", f"Since the previous session ({previous.get('timestamp', 'unknown time')}):"]
+        if newly_passing:
+            shown = ", ".join(f"#{fid} {passing_names[fid]}" for fid in newly_passing[:10])
+            more = f" (+{len(newly_passing) - 10} more)" if len(newly_passing) > 10 else ""
+            lines.append(f"- Newly passing: {shown}{more}")
+        else:
+            lines.append("- Newly passing: none")
+        if regressed:
+            lines.append(f"- No longer passing: {', '.join(f'#{fid}' for fid in regressed[:20])}")
+
+        last_head = previous.get("git_head")
+        if head and last_head and last_head != head:
+            shortstat = _git(project_dir, "diff", "--shortstat", last_head, head)
+            log = _git(project_dir, "log", "--oneline", "--no-decorate", "-n", "10", f"{last_head}..{head}")
+            if shortstat:
+                lines.append(f"- Git changes: {shortstat}")
+            if log:
+                lines.append("- Commits:")
+                lines += [f"  - {line}" for line in log.splitlines()]
+        elif head and last_head == head:
+            lines.append("- Git: no new commits")
+
+    # Save this session's view for the next digest
+    try:
+        digest_file.write_text(json.dumps({
+            "phase": phase,
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git_head": head,
+            "passing_ids": sorted(passing_names),
+        }))
+    except OSError as e:
+        print(f"[Could not save session digest: {e}]")
+
+    return "\n".join(lines) + "\n"
+
+
 def print_session_header(session_num: int, is_initializer: bool) -> None:
     """Print a formatted header for the session."""
     session_type = "INITIALIZER" if is_initializer else "CODING AGENT"
@@ -285,6 +590,9 @@ def print_progress_summary(project_dir: Path, phase: int | None = None) -> None:
     """
     passing, total = count_passing_tests(project_dir, phase=phase)
 
+    if phase is not None:
+        update_project(project_dir, phase=phase, passing=passing, total=total)
+
     phase_str = f" (Phase {phase})" if phase else ""
     if total > 0:
         percentage = (passing / total) * 100
@@ -0,0 +1,30 @@
+"""
+Project State Directory
+=======================
+
+Home of the harness's own per-project bookkeeping files (security audit log,
+blocked command statistics, session digest). They live in
+{project_dir}/.agent_state/, which carries its own .gitignore so the agent's
+commits never pick them up, the same way .checkpoints/ is kept out of git.
+"""
+
+from pathlib import Path
+
+
+STATE_DIRNAME = ".agent_state"
+
+
+def get_state_dir(project_dir: Path) -> Path:
+    """Get a project's state directory, creating it (git-ignored) if needed."""
+    state_dir = project_dir / STATE_DIRNAME
+    if not state_dir.is_dir():
+        state_dir.mkdir(parents=True, exist_ok=True)
+    gitignore = state_dir / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("*\n")
+    return state_dir
+
+
+def get_state_path(project_dir: Path, filename: str) -> Path:
+    """Get the path of a state file, e.g. {project_dir}/.agent_state/.session_digest.json."""
+    return get_state_dir(project_dir) / filename
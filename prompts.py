@@ -7,10 +7,15 @@ Functions for loading prompt templates with project-specific support.
 Fallback chain:
 1. Project-specific: generations/{project}/prompts/{name}.md
 2. Base template: .claude/templates/{name}.template.md
+
+Prompt and spec files are read through a cache keyed by path and mtime, so
+repeated sessions only stat() files that have not changed. Templates with
+{{PLACEHOLDER}} markers are compiled once and rendered in a single pass.
 """
 
 from __future__ import annotations
 
+import re
 import shutil
 from pathlib import Path
 from typing import Optional
@@ -23,6 +28,85 @@ TEMPLATES_DIR = Path(__file__).parent / ".claude" / "templates"
 SYSTEM_ROOT = Path(__file__).parent
 
 
+# Matches {{PLACEHOLDER}} markers in prompt templates
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Z0-9_]+)\}\}")
+
+# Spec root element and its top-level section elements, e.g. <core_features>...</core_features>
+SPEC_ROOT_PATTERN = re.compile(r"<project_specification[^>]*>(.*)</project_specification>", re.DOTALL)
+SPEC_SECTION_PATTERN = re.compile(r"<([A-Za-z_][\w-]*)(?:\s[^>]*)?>.*?</\1\s*>", re.DOTALL)
+
+# File content cache: path -> (mtime_ns, size, text)
+_file_cache: dict[str, tuple[int, int, str]] = {}
+
+# Compiled template cache: path -> (source text, compiled template)
+_template_cache: dict[str, tuple[str, "CompiledTemplate"]] = {}
+
+
+def read_cached(path: Path) -> str | None:
+    """
+    Read a UTF-8 text file, reusing the cached content if it has not changed.
+
+    Costs a single stat() when the cached content is still current.
+
+    Args:
+        path: The file to read
+
+    Returns:
+        The file content, or None if the file does not exist
+
+    Raises:
+        OSError: If the file exists but cannot be read
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+
+    key = str(path)
+    cached = _file_cache.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
+    text = path.read_text(encoding="utf-8")
+    _file_cache[key] = (st.st_mtime_ns, st.st_size, text)
+    return text
+
+
+class CompiledTemplate:
+    """
+    A prompt template pre-split at its {{PLACEHOLDER}} markers.
+
+    render() substitutes all placeholders in one pass, so substituted values
+    are never rescanned and the template is never copied per placeholder.
+    Placeholders without a value are left as-is.
+    """
+
+    def __init__(self, text: str):
+        parts = PLACEHOLDER_PATTERN.split(text)
+        self._literals = parts[0::2]
+        self._names = parts[1::2]
+        self.placeholders = frozenset(self._names)
+
+    def render(self, **values: object) -> str:
+        """Render the template with the given placeholder values."""
+        out = [self._literals[0]]
+        for name, literal in zip(self._names, self._literals[1:]):
+            out.append(str(values[name]) if name in values else "{{" + name + "}}")
+            out.append(literal)
+        return "".join(out)
+
+
+def compile_template(path: Path, text: str) -> CompiledTemplate:
+    """Compile a template, reusing the cached compilation for unchanged text."""
+    key = str(path)
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] is text:
+        return cached[1]
+    template = CompiledTemplate(text)
+    _template_cache[key] = (text, template)
+    return template
+
+
 def get_system_version() -> str:
     """
     Get the current system version from the VERSION file.
@@ -85,6 +169,29 @@ def get_project_prompts_dir(project_dir: Path) -> Path:
     return project_dir / "prompts"
 
 
+def _find_prompt(name: str, project_dir: Path | None = None) -> tuple[Path, str]:
+    """Resolve a prompt through the fallback chain, returning (path, content)."""
+    candidates = []
+    if project_dir:
+        candidates.append(get_project_prompts_dir(project_dir) / f"{name}.md")
+    candidates.append(TEMPLATES_DIR / f"{name}.template.md")
+
+    for path in candidates:
+        try:
+            content = read_cached(path)
+        except (OSError, PermissionError) as e:
+            print(f"Warning: Could not read {path}: {e}")
+            continue
+        if content is not None:
+            return path, content
+
+    raise FileNotFoundError(
+        f"Prompt '{name}' not found in:\n"
+        f"  - Project: {project_dir / 'prompts' if project_dir else 'N/A'}\n"
+        f"  - Templates: {TEMPLATES_DIR}"
+    )
+
+
 def load_prompt(name: str, project_dir: Path | None = None) -> str:
     """
     Load a prompt template with fallback chain.
@@ -103,29 +210,20 @@ def load_prompt(name: str, project_dir: Path | None = None) -> str:
     Raises:
         FileNotFoundError: If prompt not found in any location
     """
-    # 1. Try project-specific first
-    if project_dir:
-        project_prompts = get_project_prompts_dir(project_dir)
-        project_path = project_prompts / f"{name}.md"
-        if project_path.exists():
-            try:
-                return project_path.read_text(encoding="utf-8")
-            except (OSError, PermissionError) as e:
-                print(f"Warning: Could not read {project_path}: {e}")
+    return _find_prompt(name, project_dir)[1]
 
-    # 2. Try base template
-    template_path = TEMPLATES_DIR / f"{name}.template.md"
-    if template_path.exists():
-        try:
-            return template_path.read_text(encoding="utf-8")
-        except (OSError, PermissionError) as e:
-            print(f"Warning: Could not read {template_path}: {e}")
 
-    raise FileNotFoundError(
-        f"Prompt '{name}' not found in:\n"
-        f"  - Project: {project_dir / 'prompts' if project_dir else 'N/A'}\n"
-        f"  - Templates: {TEMPLATES_DIR}"
-    )
+def load_template(name: str, project_dir: Path | None = None) -> CompiledTemplate:
+    """
+    Load a prompt template compiled for placeholder substitution.
+
+    Uses the same fallback chain as load_prompt().
+
+    Raises:
+        FileNotFoundError: If prompt not found in any location
+    """
+    path, content = _find_prompt(name, project_dir)
+    return compile_template(path, content)
 
 
 def get_initializer_prompt(project_dir: Path | None = None) -> str:
@@ -155,22 +253,17 @@ def get_app_spec(project_dir: Path) -> str:
     Raises:
         FileNotFoundError: If no app_spec.txt found
     """
-    # Try project prompts directory first
-    project_prompts = get_project_prompts_dir(project_dir)
-    spec_path = project_prompts / "app_spec.txt"
-    if spec_path.exists():
+    # Try project prompts directory first, then the legacy location in project root
+    for spec_path in (
+        get_project_prompts_dir(project_dir) / "app_spec.txt",
+        project_dir / "app_spec.txt",
+    ):
         try:
-            return spec_path.read_text(encoding="utf-8")
+            content = read_cached(spec_path)
         except (OSError, PermissionError) as e:
             raise FileNotFoundError(f"Could not read {spec_path}: {e}") from e
-
-    # Fallback to legacy location in project root
-    legacy_spec = project_dir / "app_spec.txt"
-    if legacy_spec.exists():
-        try:
-            return legacy_spec.read_text(encoding="utf-8")
-        except (OSError, PermissionError) as e:
-            raise FileNotFoundError(f"Could not read {legacy_spec}: {e}") from e
+        if content is not None:
+            return content
 
     raise FileNotFoundError(f"No app_spec.txt found for project: {project_dir}")
 
@@ -200,19 +293,14 @@ def get_phase_spec(project_dir: Path, phase: int) -> str:
     spec_filename = f"phase{phase}_spec.txt"
     spec_path = project_prompts / spec_filename
 
-    if spec_path.exists():
-        try:
-            return spec_path.read_text(encoding="utf-8")
-        except (OSError, PermissionError) as e:
-            raise FileNotFoundError(f"Could not read {spec_path}: {e}") from e
-
-    # Also check project root as fallback
-    root_spec = project_dir / spec_filename
-    if root_spec.exists():
+    # Try the prompts directory, then project root as fallback
+    for path in (spec_path, project_dir / spec_filename):
         try:
-            return root_spec.read_text(encoding="utf-8")
+            content = read_cached(path)
         except (OSError, PermissionError) as e:
-            raise FileNotFoundError(f"Could not read {root_spec}: {e}") from e
+            raise FileNotFoundError(f"Could not read {path}: {e}") from e
+        if content is not None:
+            return content
 
     raise FileNotFoundError(
         f"No specification file found for Phase {phase}.\n"
@@ -239,16 +327,148 @@ def get_phase_initializer_prompt(project_dir: Path, phase: int) -> str:
         return get_initializer_prompt(project_dir)
 
     # Load phase initializer template
-    template = load_prompt("phase_initializer_prompt", project_dir)
+    template = load_template("phase_initializer_prompt", project_dir)
 
     # Load the phase spec
     phase_spec = get_phase_spec(project_dir, phase)
 
-    # Substitute placeholders
-    prompt = template.replace("{{PHASE_NUMBER}}", str(phase))
-    prompt = prompt.replace("{{PHASE_SPEC}}", phase_spec)
+    # Substitute placeholders in one pass
+    return template.render(PHASE_NUMBER=phase, PHASE_SPEC=phase_spec)
+
 
-    return prompt
+def get_spec_sections(spec: str) -> list[tuple[str, str]]:
+    """
+    Split a spec into its top-level sections.
+
+    Sections are the child elements of <project_specification> (or the
+    top-level elements of a spec without one), in document order. Repeated
+    element names get a suffix (name-2, name-3, ...) so section names are
+    unique. A spec without any elements is a single section named "spec".
+
+    Args:
+        spec: The spec text (app_spec.txt or phaseN_spec.txt)
+
+    Returns:
+        (name, text) pairs, the text including the section's tags
+    """
+    root = SPEC_ROOT_PATTERN.search(spec)
+    body = root.group(1) if root else spec
+
+    sections = []
+    seen: dict[str, int] = {}
+    for match in SPEC_SECTION_PATTERN.finditer(body):
+        tag = match.group(1)
+        seen[tag] = seen.get(tag, 0) + 1
+        name = tag if seen[tag] == 1 else f"{tag}-{seen[tag]}"
+        sections.append((name, match.group(0)))
+
+    if not sections:
+        return [("spec", spec)]
+    return sections
+
+
+def get_initializer_checkpoint_section(sections: list[str], completed: dict[str, int]) -> str:
+    """
+    Build the prompt section that has the initializer create features per spec section.
+
+    Each section's features go in with one feature_create_bulk(section=...)
+    call, which records the section as done, so an interrupted initializer
+    resumes with the sections that are still pending.
+
+    Args:
+        sections: Spec section names, in order (see get_spec_sections)
+        completed: Sections that already have their features, with the number created
+
+    Returns:
+        The prompt section (empty if every section is done)
+    """
+    pending = [name for name in sections if name not in completed]
+    if not pending:
+        return ""
+
+    lines = [
+        "",
+        "",
+        "## FEATURE CREATION CHECKPOINTS",
+        "",
+        "Create features one spec section at a time, so finished work is saved if this session is",
+        "interrupted. For each pending section below, in order, write all of its features and insert",
+        'them with ONE `feature_create_bulk` call passing `section="<name>"`; that call records the',
+        "section as done. Sections that need no features still get a call with an empty `features` list.",
+        "Use `feature_get_init_status` to see which sections are still pending.",
+        "",
+    ]
+    if completed:
+        lines += [
+            "This initialization was interrupted and is being resumed. Sections marked done already have",
+            "their features in the database: do not create features for them again, and check which",
+            "setup steps (init.sh, git repository, project structure) already exist before redoing them.",
+            "",
+        ]
+    for name in sections:
+        if name in completed:
+            lines.append(f"- {name}: done ({completed[name]} features)")
+        else:
+            lines.append(f"- {name}: pending")
+    return "\n".join(lines) + "\n"
+
+
+def get_section_initializer_prompt(phase: int, section: str, section_text: str, sections: list[str]) -> str:
+    """
+    Build the prompt of a parallel initializer sub-session covering one spec section.
+
+    Args:
+        phase: Phase number
+        section: Name of the section this session covers
+        section_text: The section's text (see get_spec_sections)
+        sections: All section names, in spec order
+
+    Returns:
+        The sub-session prompt
+    """
+    spec_file = "app_spec.txt" if phase == 1 else f"prompts/phase{phase}_spec.txt"
+    others = ", ".join(name for name in sections if name != section) or "none"
+    return f"""## YOUR ROLE - SECTION INITIALIZER
+
+You are one of several initializer agents working in parallel, each creating the test
+features for one section of the Phase {phase} specification. Your section is `{section}`:
+
+{section_text}
+
+The full specification is in {spec_file}; read it only for context. Other agents are covering
+the other sections ({others}) at the same time, so do not create features for them.
+
+Write detailed, testable features for your section only, each with category, name,
+description and steps (use depends_on for features in your list that build on each other).
+Then insert them all with ONE call:
+
+    feature_create_bulk(features=[...], section="{section}")
+
+If your section needs no features, make the call with an empty features list. Do not write
+application files, set up the project or commit to git: a later session does that. Stop once
+the call has succeeded.
+"""
+
+
+def get_initializer_setup_section(feature_count: int) -> str:
+    """
+    Build the prompt section for the initializer session that follows a parallel initializer.
+
+    Args:
+        feature_count: Number of features the parallel sub-sessions created
+
+    Returns:
+        The prompt section
+    """
+    return f"""
+
+## FEATURES ALREADY CREATED
+
+Parallel initializer sessions have already created all {feature_count} features for this phase
+from the specification. Do NOT create any features: skip the feature list steps and complete
+the remaining setup (init.sh, project structure, git repository and first commit). Use
+`feature_get_stats` and `feature_get_next` if you need to see the features.
+"""
 
 
 def scaffold_project_prompts(project_dir: Path) -> Path:
@@ -311,26 +531,11 @@ def has_project_prompts(project_dir: Path) -> bool:
     Returns:
         True if valid project prompts exist, False otherwise
     """
-    project_prompts = get_project_prompts_dir(project_dir)
-    app_spec = project_prompts / "app_spec.txt"
-
-    if not app_spec.exists():
-        # Also check legacy location in project root
-        legacy_spec = project_dir / "app_spec.txt"
-        if legacy_spec.exists():
-            try:
-                content = legacy_spec.read_text(encoding="utf-8")
-                return "<project_specification>" in content
-            except (OSError, PermissionError):
-                return False
-        return False
-
-    # Check for valid spec content
     try:
-        content = app_spec.read_text(encoding="utf-8")
-        return "<project_specification>" in content
-    except (OSError, PermissionError):
+        content = get_app_spec(project_dir)
+    except FileNotFoundError:
         return False
+    return "<project_specification>" in content
 
 
 def copy_spec_to_project(project_dir: Path) -> None:
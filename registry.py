@@ -0,0 +1,215 @@
+"""
+Project Registry
+================
+
+Small SQLite index of all projects, stored in generations/.registry.db.
+
+Each project row holds its current phase, passing/total feature counts for
+that phase, spec status and the time of its last agent session. The agent
+and the features MCP server push updates whenever progress changes, so the
+launcher can list and sort hundreds of projects with one query instead of
+opening every project's features.db.
+
+The registry is only an index: it can be deleted at any time and is rebuilt
+from the project directories by sync_registry().
+"""
+
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+# System root directory (where the generations folder lives)
+SYSTEM_ROOT = Path(__file__).parent
+
+GENERATIONS_DIR = SYSTEM_ROOT / "generations"
+REGISTRY_FILENAME = ".registry.db"
+
+# Sort orders accepted by list_projects()
+REGISTRY_ORDERS = {
+    "name": "name",
+    "recent": "last_session_at IS NULL, last_session_at DESC, name",
+    "progress": "CAST(passing AS REAL) / MAX(total, 1) DESC, total DESC, name",
+    "status": "total = 0 OR passing < total DESC, CAST(passing AS REAL) / MAX(total, 1), name",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    phase INTEGER NOT NULL DEFAULT 1,
+    passing INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    spec_ok INTEGER NOT NULL DEFAULT 0,
+    last_session_at TEXT,
+    updated_at TEXT NOT NULL
+)
+"""
+
+_COLUMNS = ("path", "name", "phase", "passing", "total", "spec_ok", "last_session_at", "updated_at")
+
+
+def get_registry_path(generations_dir: Path | None = None) -> Path:
+    """Get the path of the project registry database."""
+    return (generations_dir or GENERATIONS_DIR) / REGISTRY_FILENAME
+
+
+def _connect(generations_dir: Path) -> sqlite3.Connection:
+    generations_dir.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(get_registry_path(generations_dir), timeout=5)
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def update_project(
+    project_dir: Path,
+    *,
+    phase: int | None = None,
+    passing: int | None = None,
+    total: int | None = None,
+    spec_ok: bool | None = None,
+    session: bool = False,
+    generations_dir: Path | None = None,
+    raise_errors: bool = False,
+) -> None:
+    """
+    Insert or update a project's registry row.
+
+    Only the given fields are changed. Projects outside generations_dir are
+    ignored, since the launcher only lists projects in generations/. Errors
+    are reported on stderr but not raised, since the registry is only an
+    index, unless raise_errors is set.
+
+    Args:
+        project_dir: The project directory
+        phase: Current phase
+        passing: Passing features in the current phase
+        total: Total features in the current phase
+        spec_ok: Whether the project has a valid spec
+        session: Record an agent session as happening now
+        generations_dir: Directory holding the registry (default: generations/)
+        raise_errors: Raise OSError/sqlite3.Error to the caller instead of
+            reporting them (used by the features MCP server, whose stdout
+            is the protocol stream and which reports failures itself)
+    """
+    generations_dir = generations_dir or GENERATIONS_DIR
+    project_dir = Path(project_dir).resolve()
+    if project_dir.parent != generations_dir.resolve():
+        return
+
+    now = _now()
+    values = {"phase": phase, "passing": passing, "total": total, "updated_at": now}
+    if spec_ok is not None:
+        values["spec_ok"] = int(spec_ok)
+    if session:
+        values["last_session_at"] = now
+    values = {key: value for key, value in values.items() if value is not None}
+
+    columns = ["path", "name", *values]
+    assignments = ", ".join(f"{key} = excluded.{key}" for key in values)
+    sql = (
+        f"INSERT INTO projects ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT(path) DO UPDATE SET {assignments}"
+    )
+
+    try:
+        conn = _connect(generations_dir)
+        try:
+            with conn:
+                conn.execute(sql, (str(project_dir), project_dir.name, *values.values()))
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error) as e:
+        if raise_errors:
+            raise
+        print(f"[Project registry update failed: {e}]", file=sys.stderr)
+
+
+def list_projects(order: str = "name", generations_dir: Path | None = None) -> list[dict]:
+    """
+    List registered projects in one query.
+
+    Args:
+        order: "name", "recent" (last session first), "progress" (most
+            complete first) or "status" (unfinished first, least complete first)
+        generations_dir: Directory holding the registry
+
+    Returns:
+        Dicts with path, name, phase, passing, total, spec_ok, last_session_at, updated_at
+    """
+    generations_dir = generations_dir or GENERATIONS_DIR
+    if order not in REGISTRY_ORDERS:
+        raise ValueError(f"Unknown order {order!r} (expected one of {', '.join(REGISTRY_ORDERS)})")
+    if not get_registry_path(generations_dir).exists():
+        return []
+
+    conn = _connect(generations_dir)
+    try:
+        rows = conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM projects ORDER BY {REGISTRY_ORDERS[order]}"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    projects = [dict(zip(_COLUMNS, row)) for row in rows]
+    for project in projects:
+        project["spec_ok"] = bool(project["spec_ok"])
+    return projects
+
+
+def sync_registry(generations_dir: Path | None = None) -> list[dict]:
+    """
+    Reconcile the registry with the project directories in generations/.
+
+    Projects missing from the registry are scanned once (features.db and
+    spec); rows of deleted project directories are removed. Projects that
+    are already registered are not opened.
+
+    Returns:
+        The registered projects, sorted by name
+    """
+    # Imported here to keep the registry free of the prompt/progress modules
+    # for callers that only push updates (e.g. the features MCP server)
+    from progress import count_passing_tests, get_current_phase
+    from prompts import has_project_prompts
+
+    generations_dir = generations_dir or GENERATIONS_DIR
+    if not generations_dir.exists():
+        return []
+
+    directories = {
+        str(item.resolve()): item
+        for item in generations_dir.iterdir()
+        if item.is_dir() and not item.name.startswith(".")
+    }
+    registered = {project["path"] for project in list_projects(generations_dir=generations_dir)}
+
+    for path in directories.keys() - registered:
+        project_dir = directories[path]
+        phase = get_current_phase(project_dir)
+        passing, total = count_passing_tests(project_dir, phase=phase)
+        update_project(
+            project_dir,
+            phase=phase,
+            passing=passing,
+            total=total,
+            spec_ok=has_project_prompts(project_dir),
+            generations_dir=generations_dir,
+        )
+
+    # Forget projects whose directory is gone
+    stale = registered - directories.keys()
+    if stale:
+        conn = _connect(generations_dir)
+        try:
+            with conn:
+                conn.executemany("DELETE FROM projects WHERE path = ?", [(path,) for path in stale])
+        finally:
+            conn.close()
+
+    return list_projects(generations_dir=generations_dir)
@@ -4,10 +4,25 @@ Security Hooks for Autonomous Coding Agent
 
 Pre-tool-use hooks that validate bash commands for security.
 Uses an allowlist approach - only explicitly permitted commands can run.
+The allowlist can be extended or restricted per project with a declarative
+policy file (see security_policy.py).
 """
 
+import fnmatch
 import os
+import re
 import shlex
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from security_audit import get_audit_log, load_blocked_stats, record_decision
+from security_policy import (
+    GLOBAL_POLICY_FILE,
+    SecurityPolicy,
+    get_project_policy_path,
+    load_policy,
+)
 
 
 # Allowed commands for development tasks
@@ -60,6 +75,64 @@ ALLOWED_COMMANDS = {
 # Commands that need additional validation even when in the allowlist
 COMMANDS_NEEDING_EXTRA_VALIDATION = {"pkill", "chmod", "init.sh"}
 
+# Suggested allowed equivalents for commands agents commonly try.
+# Included in block reasons and in the coding prompt's blocked commands section.
+COMMAND_ALTERNATIVES = {
+    "python": "Python is not available; use node (e.g. node -e or a .js script)",
+    "python3": "Python is not available; use node (e.g. node -e or a .js script)",
+    "pip": "Python packages are not available; use npm or pnpm packages",
+    "pip3": "Python packages are not available; use npm or pnpm packages",
+    "sed": "use the Edit tool to modify files",
+    "awk": "use grep, or the Read tool and Edit tool",
+    "perl": "use the Edit tool to modify files, or node for scripting",
+    "find": "use the Glob tool to find files, or ls",
+    "tree": "use the Glob tool or ls",
+    "less": "use cat, head or tail",
+    "more": "use cat, head or tail",
+    "vim": "use the Edit or Write tool",
+    "vi": "use the Edit or Write tool",
+    "nano": "use the Edit or Write tool",
+    "tee": "use the Write tool",
+    "diff": "use git diff",
+    "sort": "use the Read tool, or grep/head/tail",
+    "uniq": "use the Read tool, or grep/head/tail",
+    "cut": "use the Read tool, or grep/head/tail",
+    "wget": "use curl",
+    "yarn": "use npm or pnpm",
+    "killall": "use pkill with a dev process name (node, npm, npx, vite, next)",
+    "cd": "commands already run in the project directory; pass paths instead (e.g. npm --prefix dir run build)",
+    "tsc": "use npx tsc",
+    "vite": "use npx vite or npm run dev",
+    "next": "use npx next or npm run dev",
+    "jest": "use npx jest or npm test",
+    "vitest": "use npx vitest or npm test",
+    "eslint": "use npx eslint or npm run lint",
+    "prettier": "use npx prettier",
+    "which": "use npx --no-install <tool> --version",
+    "open": "use the Playwright browser tools",
+    "xdg-open": "use the Playwright browser tools",
+}
+
+# Shell keywords that may precede a command
+SHELL_KEYWORDS = {
+    "if",
+    "then",
+    "else",
+    "elif",
+    "fi",
+    "for",
+    "while",
+    "until",
+    "do",
+    "done",
+    "case",
+    "esac",
+    "in",
+    "!",
+    "{",
+    "}",
+}
+
 
 def split_command_segments(command_string: str) -> list[str]:
     """
@@ -91,20 +164,21 @@ def split_command_segments(command_string: str) -> list[str]:
     return result
 
 
-def extract_commands(command_string: str) -> list[str]:
+def extract_command_argvs(command_string: str) -> list[list[str]]:
     """
-    Extract command names from a shell command string.
+    Extract the argv of each command in a shell command string.
 
-    Handles pipes, command chaining (&&, ||, ;), and subshells.
-    Returns the base command names (without paths).
+    Uses the same parsing rules as extract_commands(): the first token of each
+    argv is the command as written (possibly a path), followed by its arguments
+    up to the next shell operator.
 
     Args:
         command_string: The full shell command
 
     Returns:
-        List of command names found in the string
+        List of argv token lists, or empty list if the command could not be parsed
     """
-    commands = []
+    argvs = []
 
     # shlex doesn't treat ; as a separator, so we need to pre-process
     import re
@@ -130,32 +204,21 @@ def extract_commands(command_string: str) -> list[str]:
 
         # Track when we expect a command vs arguments
         expect_command = True
+        current = None
 
         for token in tokens:
             # Shell operators indicate a new command follows
             if token in ("|", "||", "&&", "&"):
                 expect_command = True
+                current = None
+                continue
+
+            if not expect_command:
+                current.append(token)
                 continue
 
             # Skip shell keywords that precede commands
-            if token in (
-                "if",
-                "then",
-                "else",
-                "elif",
-                "fi",
-                "for",
-                "while",
-                "until",
-                "do",
-                "done",
-                "case",
-                "esac",
-                "in",
-                "!",
-                "{",
-                "}",
-            ):
+            if token in SHELL_KEYWORDS:
                 continue
 
             # Skip flags/options
@@ -166,13 +229,28 @@ def extract_commands(command_string: str) -> list[str]:
             if "=" in token and not token.startswith("="):
                 continue
 
-            if expect_command:
-                # Extract the base command name (handle paths like /usr/bin/python)
-                cmd = os.path.basename(token)
-                commands.append(cmd)
-                expect_command = False
+            current = [token]
+            argvs.append(current)
+            expect_command = False
+
+    return argvs
+
 
-    return commands
+def extract_commands(command_string: str) -> list[str]:
+    """
+    Extract command names from a shell command string.
+
+    Handles pipes, command chaining (&&, ||, ;), and subshells.
+    Returns the base command names (without paths).
+
+    Args:
+        command_string: The full shell command
+
+    Returns:
+        List of command names found in the string
+    """
+    # Extract the base command name (handle paths like /usr/bin/python)
+    return [os.path.basename(argv[0]) for argv in extract_command_argvs(command_string)]
 
 
 def validate_pkill_command(command_string: str) -> tuple[bool, str]:
@@ -311,16 +389,242 @@ def get_command_for_validation(cmd: str, segments: list[str]) -> str:
     return ""
 
 
-async def bash_security_hook(input_data, tool_use_id=None, context=None):
+# Bespoke validators for commands in COMMANDS_NEEDING_EXTRA_VALIDATION
+EXTRA_VALIDATORS = {
+    "pkill": validate_pkill_command,
+    "chmod": validate_chmod_command,
+    "init.sh": validate_init_script,
+}
+
+
+@dataclass
+class SecurityDecision:
+    """Outcome of validating a bash command."""
+
+    allowed: bool
+    reason: str
+    rule: str  # Identifier of the rule(s) that decided, for audit logs
+    commands: list[str] = field(default_factory=list)
+    blocked: Optional[str] = None  # Command name that caused a block
+
+
+# Commands that write to the files named in their arguments
+FILE_WRITING_COMMANDS = {"cp", "mv", "rm", "touch", "chmod", "tee", "ln", "sed", "dd", "truncate", "install", "rsync"}
+
+# Commands whose arguments can be scripts that write files themselves
+SCRIPT_COMMANDS = {"sh", "bash", "node"}
+
+# Redirection operator at the start of a token or between a word and its target (>, >>, 2>, &>, <)
+REDIRECTION_PATTERN = re.compile(r"\d*(?:&>>?|[<>]+&?)")
+
+
+def _policy_spellings(project_dir: Optional[Path]) -> list[str]:
+    """Absolute paths of the policy files that apply to the project."""
+    paths = [GLOBAL_POLICY_FILE.resolve()]
+    if project_dir is not None:
+        paths.append(get_project_policy_path(Path(project_dir)).resolve())
+    return list(dict.fromkeys(path.as_posix() for path in paths))
+
+
+def _token_names_policy(token: str, spellings: list[str], writes: bool, base: str) -> bool:
+    """
+    Check whether a token (with shell quoting already resolved) may name a policy file.
+
+    Relative tokens are resolved against base, the directory commands run in.
+    """
+    def absolute(path: str) -> str:
+        resolved = os.path.normpath(os.path.join(base, os.path.expanduser(path)))
+        return resolved + "/" if path.endswith("/") and not resolved.endswith("/") else resolved
+
+    dynamic = re.search(r"[$`]", token)
+    if dynamic:
+        # A variable or substitution can expand to anything after its static
+        # prefix; only writes through it are treated as touching the policy
+        static = token[:dynamic.start()]
+        prefix = absolute(static) if static else base.rstrip("/") + "/"
+        return writes and any(spelling.startswith(prefix) for spelling in spellings)
+    path = absolute(token)
+    if any(char in token for char in "*?["):
+        return any(fnmatch.fnmatchcase(spelling, path) for spelling in spellings)
+    if path in spellings:
+        return True
+    # Moving or deleting a directory holding a policy also replaces it
+    return writes and any(spelling.startswith(path.rstrip("/") + "/") for spelling in spellings)
+
+
+def references_policy_file(command: str, project_dir: Optional[Path] = None) -> bool:
+    """
+    Check whether a command names a security policy file as a path.
+
+    Policy files live outside the project (see security_policy.py), which is
+    what keeps the agent from rewriting them; this check is an extra layer on
+    top. Every token and redirection target of every segment is checked after
+    shell quoting is resolved, relative to the project directory. Globs that
+    could match a policy file count, and so do variables or command
+    substitutions in redirection targets and arguments of
+    FILE_WRITING_COMMANDS, since they could expand to one. Scripts passed to
+    sh/bash are checked as commands themselves, and other SCRIPT_COMMANDS
+    arguments for a policy file name anywhere in them. Mentions of the name
+    inside other text, such as a commit message, are not references.
+
+    Args:
+        command: The full shell command
+        project_dir: Project directory, to recognize absolute paths of the policy
+
+    Returns:
+        True if the command may read or write the policy file
+    """
+    spellings = _policy_spellings(project_dir)
+    base = str(Path(project_dir).resolve()) if project_dir is not None else os.getcwd()
+    names = {os.path.basename(spelling) for spelling in spellings}
+
+    for segment in re.split(r'(?<!["\'])\s*;\s*(?!["\'])', command):
+        try:
+            tokens = shlex.split(segment)
+        except ValueError:
+            return False  # Unparseable commands are blocked by evaluate_command
+
+        cmd = None
+        redirect_next = False
+        for token in tokens:
+            if token in ("|", "||", "&&", "&"):
+                cmd = None
+                continue
+
+            # Words before a redirection operator are arguments, words after it targets
+            pieces = REDIRECTION_PATTERN.split(token)
+            words, targets = pieces[:1], pieces[1:]
+            if redirect_next:
+                targets.insert(0, words.pop())
+            redirect_next = len(pieces) > 1 and pieces[-1] == ""
+
+            for word in words:
+                if cmd is None and "=" in word[1:]:
+                    word = word.split("=", 1)[1]  # Assignment: check its value
+                if word and _token_names_policy(word, spellings, cmd in FILE_WRITING_COMMANDS, base):
+                    return True
+            if any(target and _token_names_policy(target, spellings, True, base) for target in targets):
+                return True
+
+            if not words or not words[0]:
+                continue
+            if cmd is None:
+                if token in SHELL_KEYWORDS or token.startswith("-") or "=" in token[1:]:
+                    continue
+                cmd = os.path.basename(token)
+            elif cmd in SCRIPT_COMMANDS and not token.startswith("-"):
+                if cmd == "node" and any(name in token for name in names):
+                    return True
+                if cmd != "node" and " " in token and references_policy_file(token, project_dir):
+                    return True
+
+    return False
+
+
+def suggest_alternative(cmd: str, policy: Optional[SecurityPolicy] = None) -> str:
+    """
+    Return a suggested allowed equivalent for a blocked command, or ''.
+
+    If the security policy allows narrower forms of the command (e.g.
+    "python -m pytest"), those are suggested instead of COMMAND_ALTERNATIVES,
+    whose generic advice ("Python is not available") would contradict them.
+    """
+    if policy is not None:
+        forms = []
+        for rule in policy.rules:
+            if rule.action != "allow" or rule.tokens[0] != cmd:
+                continue
+            form = f"`{' '.join(rule.tokens)}`"
+            if rule.args is not None:
+                form += f" with arguments matching `{rule.args.pattern}`"
+            forms.append(form)
+        if forms:
+            return f"the security policy only allows {', '.join(dict.fromkeys(forms))}"
+    return COMMAND_ALTERNATIVES.get(cmd, "")
+
+
+def evaluate_command(command: str, project_dir: Optional[Path] = None) -> SecurityDecision:
+    """
+    Validate a bash command against the security policy and allowlist.
+
+    Only commands in ALLOWED_COMMANDS, or allowed by the security policy
+    (see security_policy.py), are permitted. Policy deny rules always block.
+
+    Args:
+        command: The full shell command
+        project_dir: Project directory for the project-specific policy
+
+    Returns:
+        SecurityDecision with the verdict and the rule that decided it
+    """
+    # The agent must never be able to rewrite its own policy
+    if references_policy_file(command, project_dir):
+        return SecurityDecision(
+            False, "Commands referencing security policy files are not allowed", "policy-file"
+        )
+
+    # Extract all commands (with their arguments) from the command string
+    argvs = extract_command_argvs(command)
+    commands = [os.path.basename(argv[0]) for argv in argvs]
+
+    if not argvs:
+        # Could not parse - fail safe by blocking
+        return SecurityDecision(
+            False, f"Could not parse command for security validation: {command}", "parse-error"
+        )
+
+    policy = load_policy(project_dir, ALLOWED_COMMANDS)
+
+    # Split into segments for per-command validation
+    segments = split_command_segments(command)
+
+    # Check each command against the policy and allowlist
+    rules = []
+    for argv, cmd in zip(argvs, commands):
+        rule = policy.match(argv)
+
+        if rule is not None and rule.action == "deny":
+            reason = rule.reason or (
+                f"Command '{shlex.join(argv)}' is denied by security policy ({rule.source})"
+            )
+            return SecurityDecision(False, reason, rule.source, commands, blocked=cmd)
+
+        if rule is None and cmd not in policy.allowed_commands:
+            reason = f"Command '{cmd}' is not in the allowed commands list"
+            alternative = suggest_alternative(cmd, policy)
+            if alternative:
+                reason += f". Instead, {alternative}"
+            return SecurityDecision(False, reason, "allowlist", commands, blocked=cmd)
+        rules.append(rule.source if rule is not None else "allowlist")
+
+        # Additional validation for sensitive commands
+        if cmd in COMMANDS_NEEDING_EXTRA_VALIDATION:
+            # Find the specific segment containing this command
+            cmd_segment = get_command_for_validation(cmd, segments)
+            if not cmd_segment:
+                cmd_segment = command  # Fallback to full command
+
+            allowed, reason = EXTRA_VALIDATORS[cmd](cmd_segment)
+            if not allowed:
+                return SecurityDecision(False, reason, f"validator:{cmd}", commands, blocked=cmd)
+            rules.append(f"validator:{cmd}")
+
+    return SecurityDecision(True, "", ",".join(dict.fromkeys(rules)), commands)
+
+
+async def bash_security_hook(input_data, tool_use_id=None, context=None, project_dir=None):
     """
     Pre-tool-use hook that validates bash commands using an allowlist.
 
-    Only commands in ALLOWED_COMMANDS are permitted.
+    See evaluate_command() for the rules. Every decision is recorded in the
+    project's security audit log (see security_audit.py).
 
     Args:
         input_data: Dict containing tool_name and tool_input
         tool_use_id: Optional tool use ID
         context: Optional context
+        project_dir: Project directory for the project-specific policy
+            (defaults to the "cwd" reported in input_data)
 
     Returns:
         Empty dict to allow, or {"decision": "block", "reason": "..."} to block
@@ -332,45 +636,102 @@ async def bash_security_hook(input_data, tool_use_id=None, context=None):
     if not command:
         return {}
 
-    # Extract all commands from the command string
-    commands = extract_commands(command)
+    if project_dir is None and input_data.get("cwd"):
+        project_dir = Path(input_data["cwd"])
+
+    decision = evaluate_command(command, project_dir)
+
+    # Read before recording so the count does not race the audit writer thread
+    times_blocked = 0
+    if project_dir is not None and decision.blocked:
+        times_blocked = get_audit_log(project_dir).blocked_count(decision.blocked)
+
+    record_decision(
+        project_dir,
+        decision="allow" if decision.allowed else "block",
+        command=command,
+        commands=decision.commands,
+        rule=decision.rule,
+        reason=decision.reason,
+        blocked_command=decision.blocked,
+        session_id=input_data.get("session_id"),
+        tool_use_id=tool_use_id,
+    )
+
+    if decision.allowed:
+        return {}
 
-    if not commands:
-        # Could not parse - fail safe by blocking
-        return {
-            "decision": "block",
-            "reason": f"Could not parse command for security validation: {command}",
-        }
+    reason = decision.reason
+    if times_blocked:
+        # Discourage retrying near-identical variants of a known-blocked command
+        reason += (
+            f" ('{decision.blocked}' has been blocked {times_blocked + 1} times in this project;"
+            " do not retry variants of it)"
+        )
+    return {"decision": "block", "reason": reason}
 
-    # Split into segments for per-command validation
-    segments = split_command_segments(command)
 
-    # Check each command against the allowlist
-    for cmd in commands:
-        if cmd not in ALLOWED_COMMANDS:
-            return {
-                "decision": "block",
-                "reason": f"Command '{cmd}' is not in the allowed commands list",
-            }
+def get_blocked_commands_section(project_dir: Path, limit: int = 10) -> str:
+    """
+    Build a prompt section listing commands blocked in this project.
 
-        # Additional validation for sensitive commands
-        if cmd in COMMANDS_NEEDING_EXTRA_VALIDATION:
-            # Find the specific segment containing this command
-            cmd_segment = get_command_for_validation(cmd, segments)
-            if not cmd_segment:
-                cmd_segment = command  # Fallback to full command
+    Uses the blocked command statistics from the audit log. Commands that the
+    current policy now allows are left out.
+
+    Args:
+        project_dir: The project directory
+        limit: Maximum number of commands to list (most frequently blocked first)
+
+    Returns:
+        Markdown section to append to the coding prompt, or '' if nothing was blocked
+    """
+    stats = load_blocked_stats(project_dir)
+    if not stats:
+        return ""
+
+    policy = load_policy(project_dir, ALLOWED_COMMANDS)
+    lines = []
+    for cmd, entry in sorted(stats.items(), key=lambda item: -item[1].get("count", 0)):
+        # Skip commands that were only blocked for missing from an allowlist they are now on
+        not_allowed = entry.get("last_reason", "").startswith(f"Command '{cmd}' is not in the allowed")
+        if not_allowed and cmd in policy.allowed_commands:
+            continue
+        line = f"- `{cmd}` (blocked {entry.get('count', 0)}x)"
+        alternative = suggest_alternative(cmd, policy)
+        if alternative:
+            line += f": {alternative}"
+        elif entry.get("last_reason"):
+            line += f": {entry['last_reason']}"
+        lines.append(line)
+        if len(lines) >= limit:
+            break
+
+    if not lines:
+        return ""
+
+    return (
+        "\n\n## COMMANDS BLOCKED IN THIS PROJECT\n\n"
+        "These commands were blocked by the security hook in earlier sessions. "
+        "Do not run them or variants of them; use the alternatives instead.\n\n"
+        + "\n".join(lines)
+        + "\n"
+    )
+
+
+def create_bash_security_hook(project_dir: Path):
+    """
+    Create a bash security hook bound to a project directory.
+
+    Args:
+        project_dir: Project directory whose security policy applies
+
+    Returns:
+        Async hook function suitable for a PreToolUse HookMatcher
+    """
+
+    async def hook(input_data, tool_use_id=None, context=None):
+        return await bash_security_hook(
+            input_data, tool_use_id, context, project_dir=project_dir
+        )
 
-            if cmd == "pkill":
-                allowed, reason = validate_pkill_command(cmd_segment)
-                if not allowed:
-                    return {"decision": "block", "reason": reason}
-            elif cmd == "chmod":
-                allowed, reason = validate_chmod_command(cmd_segment)
-                if not allowed:
-                    return {"decision": "block", "reason": reason}
-            elif cmd == "init.sh":
-                allowed, reason = validate_init_script(cmd_segment)
-                if not allowed:
-                    return {"decision": "block", "reason": reason}
-
-    return {}
+    return hook
@@ -0,0 +1,297 @@
+"""
+Security Audit Log
+==================
+
+Append-only, per-project log of every bash security hook decision.
+
+Each decision is written as one JSON line to
+{project_dir}/.agent_state/.security_audit.jsonl (see project_state.py) with a timestamp, session id, the parsed commands and the rule that matched.
+Records are queued in memory and written by a background thread, so the hook
+never waits on disk I/O. When the log grows past a size limit it is rotated
+to gzip-compressed backups (.security_audit.jsonl.1.gz, .2.gz, ...).
+
+The writer thread also keeps per-command statistics of blocked commands in
+{project_dir}/.agent_state/.blocked_commands.json, which feed the "blocked commands"
+section of the coding prompt (see security.get_blocked_commands_section).
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from project_state import get_state_path
+
+
+AUDIT_LOG_FILENAME = ".security_audit.jsonl"
+BLOCKED_STATS_FILENAME = ".blocked_commands.json"
+
+# Example commands kept per blocked command in the stats file
+BLOCKED_STATS_MAX_EXAMPLES = 3
+
+# Rotation defaults
+AUDIT_LOG_MAX_BYTES = 5 * 1024 * 1024
+AUDIT_LOG_BACKUP_COUNT = 5
+
+
+def get_audit_log_path(project_dir: Path) -> Path:
+    """Get the path of a project's security audit log."""
+    return get_state_path(project_dir, AUDIT_LOG_FILENAME)
+
+
+def get_blocked_stats_path(project_dir: Path) -> Path:
+    """Get the path of a project's blocked command statistics."""
+    return get_state_path(project_dir, BLOCKED_STATS_FILENAME)
+
+
+def load_blocked_stats(project_dir: Path) -> dict[str, dict]:
+    """
+    Load blocked command statistics for a project.
+
+    Returns:
+        Dict mapping command name to {"count", "last_seen", "last_reason", "examples"},
+        empty if no command has been blocked yet
+    """
+    return _read_blocked_stats(get_blocked_stats_path(project_dir))
+
+
+def _read_blocked_stats(stats_file: Path) -> dict[str, dict]:
+    try:
+        stats = json.loads(stats_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(stats, dict):
+        return {}
+    # Drop malformed entries (e.g. a hand-edited file) rather than failing on them
+    return {
+        command: entry for command, entry in stats.items()
+        if isinstance(entry, dict)
+        and isinstance(entry.get("count"), int)
+        and isinstance(entry.get("examples", []), list)
+    }
+
+
+class AuditLog:
+    """
+    Buffered append-only JSON lines log with gzip rotation.
+
+    record() only enqueues; a daemon thread batches queued records into
+    appends and handles rotation. If stats_path is given, the thread also
+    maintains blocked command statistics there.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = AUDIT_LOG_MAX_BYTES,
+        backup_count: int = AUDIT_LOG_BACKUP_COUNT,
+        stats_path: Optional[Path] = None,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.stats_path = Path(stats_path) if stats_path is not None else None
+        # Loaded up front so blocked_count() is right from the first call
+        self.blocked_stats: dict[str, dict] = (
+            _read_blocked_stats(self.stats_path) if self.stats_path is not None else {}
+        )
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"audit-log:{self.path.parent.name}", daemon=True
+        )
+        self._thread.start()
+
+    def record(self, entry: dict) -> None:
+        """Queue an entry for writing. Never blocks on I/O."""
+        if self._closed:
+            return
+        self._queue.put(entry)
+
+    def flush(self) -> None:
+        """Block until every queued entry has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush pending entries and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def blocked_count(self, command: str) -> int:
+        """Number of times a command has been blocked (from memory, no I/O)."""
+        return self.blocked_stats.get(command, {}).get("count", 0)
+
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            batch = [entry]
+            # Drain whatever else is already queued into the same write
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            lines = [json.dumps(e, separators=(",", ":")) + "\n" for e in batch if e is not None]
+            try:
+                if lines:
+                    self._write(lines)
+                if self._update_blocked_stats(batch):
+                    self._write_blocked_stats()
+            except OSError as e:
+                print(f"[Security audit log write failed: {e}]")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if stop:
+                return
+
+    def _write(self, lines: list[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            size = f.tell()
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _update_blocked_stats(self, batch: list) -> bool:
+        if self.stats_path is None:
+            return False
+        changed = False
+        for entry in batch:
+            if entry is None or entry.get("decision") != "block":
+                continue
+            command = entry.get("blocked_command")
+            if not command:
+                continue
+            stats = {"count": 0, "examples": [], **self.blocked_stats.get(command, {})}
+            stats["count"] += 1
+            stats["last_seen"] = entry.get("ts")
+            stats["last_reason"] = entry.get("reason", "")
+            if entry["command"] not in stats["examples"]:
+                stats["examples"] = (stats["examples"] + [entry["command"]])[-BLOCKED_STATS_MAX_EXAMPLES:]
+            # Replace rather than mutate so readers on other threads see whole values
+            self.blocked_stats = {**self.blocked_stats, command: stats}
+            changed = True
+        return changed
+
+    def _write_blocked_stats(self) -> None:
+        # Unique temp file + atomic replace: readers never see a partial file,
+        # and two writers (e.g. two agent processes) never share a temp file
+        fd, tmp = tempfile.mkstemp(prefix=self.stats_path.name + ".", suffix=".tmp", dir=self.stats_path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(self.blocked_stats, indent=2))
+            os.replace(tmp, self.stats_path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _rotate(self) -> None:
+        """Shift compressed backups and compress the current log to .1.gz."""
+        def backup(n: int) -> Path:
+            return self.path.with_name(f"{self.path.name}.{n}.gz")
+
+        oldest = backup(self.backup_count)
+        if oldest.exists():
+            oldest.unlink()
+        for n in range(self.backup_count - 1, 0, -1):
+            if backup(n).exists():
+                backup(n).replace(backup(n + 1))
+
+        with open(self.path, "rb") as src, gzip.open(backup(1), "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        self.path.unlink()
+
+
+# Open audit logs: resolved project directory -> AuditLog
+_audit_logs: dict[str, AuditLog] = {}
+_audit_logs_lock = threading.Lock()
+
+
+def get_audit_log(project_dir: Path) -> AuditLog:
+    """Get (or open) the audit log for a project."""
+    key = str(Path(project_dir).resolve())
+    with _audit_logs_lock:
+        log = _audit_logs.get(key)
+        if log is None:
+            path = get_audit_log_path(Path(project_dir))
+            log = AuditLog(path, stats_path=get_blocked_stats_path(Path(project_dir)))
+            _audit_logs[key] = log
+        return log
+
+
+def record_decision(
+    project_dir: Optional[Path],
+    *,
+    decision: str,
+    command: str,
+    commands: list[str],
+    rule: str,
+    reason: str = "",
+    blocked_command: Optional[str] = None,
+    session_id: Optional[str] = None,
+    tool_use_id: Optional[str] = None,
+) -> None:
+    """
+    Queue a security hook decision for the project's audit log.
+
+    Args:
+        project_dir: Project directory (no-op if None)
+        decision: "allow" or "block"
+        command: The full command string
+        commands: Parsed command names
+        rule: Identifier of the rule that decided (e.g. "allowlist", "project:deny[0]")
+        reason: Block reason, if any
+        blocked_command: Name of the command that caused a block, if any
+        session_id: Agent SDK session id
+        tool_use_id: Tool use id of the Bash call
+    """
+    if project_dir is None:
+        return
+    get_audit_log(project_dir).record({
+        "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "session_id": session_id,
+        "tool_use_id": tool_use_id,
+        "decision": decision,
+        "rule": rule,
+        "commands": commands,
+        "command": command,
+        "reason": reason,
+        "blocked_command": blocked_command,
+    })
+
+
+def flush_audit_logs() -> None:
+    """Block until all queued audit records have been written."""
+    with _audit_logs_lock:
+        logs = list(_audit_logs.values())
+    for log in logs:
+        log.flush()
+
+
+@atexit.register
+def close_audit_logs() -> None:
+    """Flush and close all open audit logs."""
+    with _audit_logs_lock:
+        logs = list(_audit_logs.values())
+        _audit_logs.clear()
+    for log in logs:
+        log.close()
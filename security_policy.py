@@ -0,0 +1,302 @@
+"""
+Declarative Security Policy
+===========================
+
+Per-project and global allow/deny rules for bash commands, layered on top of
+the built-in allowlist in security.py.
+
+Policy files (JSON) are looked up in two places and merged in order:
+1. Global: {system_root}/security_policy.json
+2. Project: {system_root}/policies/{project name}.json, or
+   {SECURITY_POLICY_DIR}/{project name}.json when SECURITY_POLICY_DIR is set
+
+Both live outside the project directory on purpose: the agent can write
+anywhere in its project (through node, git or npm scripts as well as the
+shell), so a policy file there could be rewritten to widen its own allowlist.
+
+Example policy:
+
+    {
+        "inherit_defaults": true,
+        "allow": [
+            "yarn",
+            "python -m pytest",
+            {"command": "uv", "subcommand": "run", "args": "^pytest( |$)"}
+        ],
+        "deny": [
+            {"command": "git", "subcommand": "push", "reason": "Pushing is done by the operator"}
+        ]
+    }
+
+A rule matches a command when its tokens are a prefix of the command's argv
+(the first token is compared against the base command name, so "python" also
+matches "/usr/bin/python") and, if given, its "args" regex matches the
+remaining arguments joined by spaces. Deny rules always win over allow rules;
+otherwise the most specific (longest prefix) allow rule applies. Commands that
+no rule matches fall back to the allowlist.
+
+Policies are compiled once into a trie over argv tokens and recompiled
+automatically when a policy file changes on disk, so edits take effect on the
+next bash command without restarting the agent.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shlex
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+# System root directory (where the global policy lives)
+SYSTEM_ROOT = Path(__file__).parent
+
+# Policy file names
+POLICY_FILENAME = "security_policy.json"
+GLOBAL_POLICY_FILE = SYSTEM_ROOT / POLICY_FILENAME
+
+# Directory holding project policies as {project name}.json, owned by the harness
+PROJECT_POLICY_DIR = Path(os.environ.get("SECURITY_POLICY_DIR") or SYSTEM_ROOT / "policies")
+
+
+def get_project_policy_path(project_dir: Path) -> Path:
+    """Get the path of the project-specific security policy file."""
+    return Path(PROJECT_POLICY_DIR) / f"{Path(project_dir).resolve().name}.json"
+
+
+@dataclass(frozen=True)
+class PolicyRule:
+    """A single compiled allow/deny rule."""
+
+    action: str  # "allow" or "deny"
+    tokens: tuple[str, ...]  # argv prefix, tokens[0] is the command name
+    args: Optional[re.Pattern] = None
+    reason: str = ""
+    source: str = ""  # e.g. "project:deny[0]", used in block reasons and audit logs
+
+    def matches_args(self, remaining: list[str]) -> bool:
+        """Check the optional args pattern against the remaining argv."""
+        if self.args is None:
+            return True
+        return self.args.search(" ".join(remaining)) is not None
+
+
+@dataclass
+class _TrieNode:
+    children: dict[str, "_TrieNode"] = field(default_factory=dict)
+    rules: list[PolicyRule] = field(default_factory=list)
+
+
+class PolicyError(ValueError):
+    """Raised when a policy file is malformed."""
+
+
+class SecurityPolicy:
+    """
+    Compiled security policy.
+
+    Holds the effective command allowlist and a trie of allow/deny rules
+    keyed by argv tokens.
+    """
+
+    def __init__(self, allowed_commands: set[str], rules: list[PolicyRule]):
+        self.allowed_commands = frozenset(allowed_commands)
+        self.rules = tuple(rules)
+        self._root = _TrieNode()
+        for rule in rules:
+            node = self._root
+            for token in rule.tokens:
+                node = node.children.setdefault(token, _TrieNode())
+            node.rules.append(rule)
+
+    def match(self, argv: list[str]) -> Optional[PolicyRule]:
+        """
+        Find the rule that decides a single command's argv.
+
+        Walks the trie along argv, collecting rules whose args pattern matches.
+        Returns the first deny rule found, else the deepest allow rule, else None.
+
+        Args:
+            argv: Command tokens, argv[0] being the command (path allowed)
+
+        Returns:
+            The deciding PolicyRule, or None if no rule applies
+        """
+        if not argv:
+            return None
+
+        best_allow = None
+        node = self._root.children.get(os.path.basename(argv[0]))
+        depth = 1
+        while node is not None:
+            remaining = argv[depth:]
+            for rule in node.rules:
+                if not rule.matches_args(remaining):
+                    continue
+                if rule.action == "deny":
+                    return rule
+                best_allow = rule
+            if depth >= len(argv):
+                break
+            node = node.children.get(argv[depth])
+            depth += 1
+
+        return best_allow
+
+
+def _compile_rule(entry, action: str, source: str) -> PolicyRule:
+    """Compile one rule entry (string shorthand or dict) from a policy file."""
+    if isinstance(entry, str):
+        try:
+            tokens = shlex.split(entry)
+        except ValueError as e:
+            raise PolicyError(f"{source}: could not parse rule {entry!r}: {e}") from e
+        args_pattern = None
+        reason = ""
+    elif isinstance(entry, dict):
+        if "argv" in entry:
+            tokens = entry["argv"]
+            if not isinstance(tokens, list) or not all(isinstance(t, str) for t in tokens):
+                raise PolicyError(f"{source}: 'argv' must be a list of strings")
+        else:
+            command = entry.get("command")
+            if not isinstance(command, str):
+                raise PolicyError(f"{source}: rule requires 'command' or 'argv'")
+            tokens = [command]
+            subcommand = entry.get("subcommand")
+            if subcommand is not None:
+                if not isinstance(subcommand, str):
+                    raise PolicyError(f"{source}: 'subcommand' must be a string")
+                tokens.append(subcommand)
+        args_pattern = entry.get("args")
+        reason = entry.get("reason", "")
+    else:
+        raise PolicyError(f"{source}: rule must be a string or an object")
+
+    if not tokens:
+        raise PolicyError(f"{source}: rule has no command")
+
+    compiled_args = None
+    if args_pattern is not None:
+        try:
+            compiled_args = re.compile(args_pattern)
+        except (re.error, TypeError) as e:
+            raise PolicyError(f"{source}: invalid 'args' pattern {args_pattern!r}: {e}") from e
+
+    tokens[0] = os.path.basename(tokens[0])
+    return PolicyRule(
+        action=action,
+        tokens=tuple(tokens),
+        args=compiled_args,
+        reason=reason,
+        source=source,
+    )
+
+
+def compile_policy(
+    documents: list[tuple[str, dict]],
+    default_allowed: set[str],
+) -> SecurityPolicy:
+    """
+    Compile policy documents into a SecurityPolicy.
+
+    Args:
+        documents: (label, parsed JSON) pairs, applied in order
+        default_allowed: The built-in allowlist
+
+    Returns:
+        Compiled SecurityPolicy
+
+    Raises:
+        PolicyError: If a document is malformed
+    """
+    allowed = set(default_allowed)
+    rules: list[PolicyRule] = []
+
+    for label, doc in documents:
+        if not isinstance(doc, dict):
+            raise PolicyError(f"{label}: policy must be a JSON object")
+
+        if doc.get("inherit_defaults", True) is False:
+            allowed = set()
+
+        for action in ("allow", "deny"):
+            entries = doc.get(action, [])
+            if not isinstance(entries, list):
+                raise PolicyError(f"{label}: '{action}' must be a list")
+            for i, entry in enumerate(entries):
+                rule = _compile_rule(entry, action, f"{label}:{action}[{i}]")
+                rules.append(rule)
+                # Plain "allow <command>" rules extend the allowlist itself
+                if action == "allow" and len(rule.tokens) == 1 and rule.args is None:
+                    allowed.add(rule.tokens[0])
+
+    return SecurityPolicy(allowed, rules)
+
+
+# Compiled policy cache: project key -> (file signature, policy)
+_policy_cache: dict[str, tuple[tuple, SecurityPolicy]] = {}
+
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    """Return (mtime_ns, size) for a file, or None if it does not exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _policy_files(project_dir: Optional[Path]) -> list[tuple[str, Path]]:
+    files = [("global", GLOBAL_POLICY_FILE)]
+    if project_dir is not None:
+        files.append(("project", get_project_policy_path(Path(project_dir))))
+    return files
+
+
+def load_policy(
+    project_dir: Optional[Path],
+    default_allowed: set[str],
+) -> SecurityPolicy:
+    """
+    Get the compiled policy for a project, recompiling if a policy file changed.
+
+    Costs one stat() per policy file when nothing changed. If a policy file
+    is malformed, a warning is printed and the last good policy (or the
+    built-in defaults) stays in effect.
+
+    Args:
+        project_dir: Project directory, or None for the global policy only
+        default_allowed: The built-in allowlist
+
+    Returns:
+        Compiled SecurityPolicy
+    """
+    files = _policy_files(project_dir)
+    signature = tuple(_file_signature(path) for _, path in files)
+    key = str(Path(project_dir).resolve()) if project_dir is not None else ""
+
+    cached = _policy_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    documents = []
+    try:
+        for (label, path), sig in zip(files, signature):
+            if sig is None:
+                continue
+            try:
+                documents.append((label, json.loads(path.read_text(encoding="utf-8"))))
+            except (OSError, json.JSONDecodeError) as e:
+                raise PolicyError(f"{label}: could not load {path}: {e}") from e
+        policy = compile_policy(documents, default_allowed)
+    except PolicyError as e:
+        print(f"[Security policy error: {e}]")
+        policy = cached[1] if cached is not None else SecurityPolicy(default_allowed, [])
+
+    # Cache even on error so a broken file is only reported once per change
+    _policy_cache[key] = (signature, policy)
+    return policy
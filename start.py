@@ -18,10 +18,7 @@ from prompts import (
     has_project_prompts,
     get_project_prompts_dir,
 )
-
-
-# Directory containing generated projects
-GENERATIONS_DIR = Path(__file__).parent / "generations"
+from registry import GENERATIONS_DIR, sync_registry, update_project
 
 
 def check_spec_exists(project_dir: Path) -> bool:
@@ -32,42 +29,33 @@ def check_spec_exists(project_dir: Path) -> bool:
     1. Project prompts directory: {project_dir}/prompts/app_spec.txt
     2. Project root (legacy): {project_dir}/app_spec.txt
     """
-    # Check project prompts directory first
-    project_prompts = get_project_prompts_dir(project_dir)
-    spec_file = project_prompts / "app_spec.txt"
-    if spec_file.exists():
-        try:
-            content = spec_file.read_text(encoding="utf-8")
-            return "<project_specification>" in content
-        except (OSError, PermissionError):
-            return False
+    return has_project_prompts(project_dir)
 
-    # Check legacy location in project root
-    legacy_spec = project_dir / "app_spec.txt"
-    if legacy_spec.exists():
-        try:
-            content = legacy_spec.read_text(encoding="utf-8")
-            return "<project_specification>" in content
-        except (OSError, PermissionError):
-            return False
-
-    return False
 
+def get_existing_projects() -> list[dict]:
+    """
+    Get existing projects in the generations folder with their status.
 
-def get_existing_projects() -> list[str]:
-    """Get list of existing projects from generations folder."""
-    if not GENERATIONS_DIR.exists():
-        return []
+    Status comes from the project registry (see registry.py); only projects
+    not registered yet are scanned.
+    """
+    return sync_registry(GENERATIONS_DIR)
 
-    projects = []
-    for item in GENERATIONS_DIR.iterdir():
-        if item.is_dir() and not item.name.startswith('.'):
-            projects.append(item.name)
 
-    return sorted(projects)
+def format_project_status(project: dict) -> str:
+    """Format a registry entry as a one-line status, e.g. 'Phase 2  45/200 (22.5%)'."""
+    if not project["spec_ok"]:
+        return "no spec yet"
+    if project["total"] == 0:
+        return f"Phase {project['phase']}  not initialized"
+    percentage = project["passing"] / project["total"] * 100
+    status = f"Phase {project['phase']}  {project['passing']}/{project['total']} ({percentage:.1f}%)"
+    if project["last_session_at"]:
+        status += f"  last session {project['last_session_at'][:16].replace('T', ' ')}"
+    return status
 
 
-def display_menu(projects: list[str]) -> None:
+def display_menu(projects: list[dict]) -> None:
     """Display the main menu."""
     print("\n" + "=" * 50)
     print("  Autonomous Coding Agent Launcher")
@@ -81,21 +69,22 @@ def display_menu(projects: list[str]) -> None:
     print()
 
 
-def display_projects(projects: list[str]) -> None:
-    """Display list of existing projects."""
+def display_projects(projects: list[dict]) -> None:
+    """Display list of existing projects with their status."""
     print("\n" + "-" * 40)
     print("  Existing Projects")
     print("-" * 40)
 
+    width = max(len(project["name"]) for project in projects)
     for i, project in enumerate(projects, 1):
-        print(f"  [{i}] {project}")
+        print(f"  [{i}] {project['name']:<{width}}  {format_project_status(project)}")
 
     print("\n  [b] Back to main menu")
     print()
 
 
-def get_project_choice(projects: list[str]) -> str | None:
-    """Get user's project selection."""
+def get_project_choice(projects: list[dict]) -> str | None:
+    """Get user's project selection, returning the project name."""
     while True:
         choice = input("Select project number: ").strip().lower()
 
@@ -105,7 +94,7 @@ def get_project_choice(projects: list[str]) -> str | None:
         try:
             idx = int(choice) - 1
             if 0 <= idx < len(projects):
-                return projects[idx]
+                return projects[idx]["name"]
             print(f"Please enter a number between 1 and {len(projects)}")
         except ValueError:
             print("Invalid input. Enter a number or 'b' to go back.")
@@ -311,7 +300,9 @@ def run_agent(project_name: str) -> None:
     project_dir = GENERATIONS_DIR / project_name
 
     # Final validation before running
-    if not has_project_prompts(project_dir):
+    spec_ok = has_project_prompts(project_dir)
+    update_project(project_dir, spec_ok=spec_ok)
+    if not spec_ok:
         print(f"\nWarning: No valid spec found for project '{project_name}'")
         print("The agent may not work correctly.")
         confirm = input("Continue anyway? [y/N]: ").strip().lower()
@@ -0,0 +1,1343 @@
+#!/usr/bin/env python3
+"""
+Feature MCP Server Tests
+========================
+
+Tests for the feature management tools, called directly against a
+temporary project database.
+Run with: python test_features.py
+"""
+
+import asyncio
+import contextlib
+import gzip
+import io
+import json
+import os
+import re
+import threading
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from api.database import SCHEMA_VERSION, Feature, ImportProgress, create_database
+from api.history import build_report, load_events, throughput, time_to_pass_by_category
+from api.migration import (
+    SCHEMA_MIGRATIONS,
+    export_to_json,
+    get_schema_version,
+    import_features,
+    iter_feature_records,
+    migrate_json_to_sqlite,
+)
+from api.storage import DEFAULT_BACKEND, STORAGE_BACKENDS, FeatureStore, open_feature_store
+from mcp_server import feature_mcp
+import checkpoints
+import registry
+
+
+def setup_project(tmp: str, phase: int = 1, backend: str = DEFAULT_BACKEND) -> None:
+    """Point the feature server at a fresh database in a temporary directory."""
+    project_dir = Path(tmp)
+    if feature_mcp._store is not None:
+        feature_mcp.wait_for_writes()
+        feature_mcp._store.close()
+    feature_mcp.PROJECT_DIR = project_dir
+    feature_mcp.CURRENT_PHASE = phase
+    feature_mcp._store = open_feature_store(project_dir, backend)
+
+
+def call(tool, *args, **kwargs):
+    """Run an async feature tool to completion."""
+    return asyncio.run(tool(*args, **kwargs))
+
+
+def make_feature(name: str, **extra) -> dict:
+    """Build a minimal feature for feature_create_bulk."""
+    return {
+        "category": "test",
+        "name": name,
+        "description": f"{name} description",
+        "steps": [f"Verify {name}"],
+        **extra,
+    }
+
+
+# Verification timestamps differ between runs, so parity compares outputs without them
+TIMESTAMP_PATTERN = re.compile(r'"\d{4}-\d{2}-\d{2}T[\d:.]+Z"')
+
+
+def check(description: str, ok: bool) -> bool:
+    print(f"  {'PASS' if ok else 'FAIL'}: {description}")
+    return ok
+
+
+def test_dependencies():
+    """Test dependency-aware scheduling in feature_get_next."""
+    print("\nTesting feature dependencies:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_project(tmp)
+
+        created = json.loads(call(feature_mcp.feature_create_bulk, [
+            make_feature("Dashboard", depends_on=[1]),
+            make_feature("Login"),
+            make_feature("Settings", depends_on=[0, 1]),
+        ]))
+        results.append(check("bulk create with dependencies", created.get("created") == 3))
+
+        def next_name():
+            return json.loads(call(feature_mcp.feature_get_next)).get("name")
+
+        results.append(check("blocked feature is not served first", next_name() == "Login"))
+
+        login_id = json.loads(call(feature_mcp.feature_get_next))["id"]
+        call(feature_mcp.feature_mark_passing, login_id)
+        results.append(check("dependent becomes ready when dependency passes", next_name() == "Dashboard"))
+
+        # Marking passing twice must not decrement counters twice
+        call(feature_mcp.feature_mark_passing, login_id)
+        dashboard = json.loads(call(feature_mcp.feature_get_next))
+        results.append(check("mark_passing is idempotent for counters", dashboard["blocked_by"] == 0))
+
+        call(feature_mcp.feature_skip, dashboard["id"])
+        status = json.loads(call(feature_mcp.feature_get_next))
+        results.append(check("skip does not bypass dependencies", status.get("name") == "Dashboard"))
+
+        call(feature_mcp.feature_mark_passing, dashboard["id"])
+        results.append(check("last dependency releases feature", next_name() == "Settings"))
+
+        extra = json.loads(call(feature_mcp.feature_create_bulk, [
+            make_feature("Profile", depends_on_ids=[login_id]),
+        ]))
+        results.append(check("depends_on_ids on passing feature is satisfied", extra.get("created") == 1))
+
+        cycle = json.loads(call(feature_mcp.feature_create_bulk, [
+            make_feature("A", depends_on=[1]),
+            make_feature("B", depends_on=[0]),
+        ]))
+        results.append(check("dependency cycles are rejected", "cycle" in cycle.get("error", "")))
+
+        unknown = json.loads(call(feature_mcp.feature_create_bulk, [
+            make_feature("C", depends_on_ids=[999]),
+        ]))
+        results.append(check("unknown depends_on_ids are rejected", "unknown" in unknown.get("error", "")))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_next_batch():
+    """Test feature_get_next_batch sizing."""
+    print("\nTesting next batch:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_project(tmp)
+        call(feature_mcp.feature_create_bulk, [
+            make_feature("One", steps=["a", "b"]),
+            make_feature("Two", steps=["a", "b", "c"]),
+            make_feature("Blocked", depends_on=[0]),
+            make_feature("Three", steps=["a"]),
+        ])
+
+        def batch_names(**kwargs):
+            batch = json.loads(call(feature_mcp.feature_get_next_batch, **kwargs))
+            return [f["name"] for f in batch["features"]]
+
+        results.append(check("returns ready features in queue order", batch_names(k=3) == ["One", "Two", "Three"]))
+        results.append(check("respects k", batch_names(k=1) == ["One"]))
+        results.append(check("stops at step cap", batch_names(k=3, max_total_steps=5) == ["One", "Two"]))
+        results.append(check("always returns the first feature", batch_names(k=3, max_total_steps=1) == ["One"]))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_search():
+    """Test full-text feature search and its sync triggers."""
+    print("\nTesting feature search:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_project(tmp)
+        call(feature_mcp.feature_create_bulk, [
+            make_feature("Login form", description="User can authenticate with email"),
+            make_feature("Sidebar collapse", description="Sidebar collapses on mobile"),
+            make_feature("Logout", description="Clears the auth session", steps=["Click logout"]),
+        ])
+
+        def search_names(query, **kwargs):
+            found = json.loads(call(feature_mcp.feature_search, query, **kwargs))
+            return [f["name"] for f in found["features"]]
+
+        results.append(check("matches description terms", search_names("sidebar mobile") == ["Sidebar collapse"]))
+        results.append(check("prefix queries", sorted(search_names("auth*")) == ["Login form", "Logout"]))
+        results.append(check("name matches rank first", search_names("logout")[0] == "Logout"))
+        results.append(check("invalid FTS syntax is quoted", search_names('"login') == ["Login form"]))
+
+        logout_id = json.loads(call(feature_mcp.feature_get_next_batch, k=3))["features"][2]["id"]
+        call(feature_mcp.feature_mark_passing, logout_id)
+        results.append(check("passes filter", search_names("auth*", passes=True) == ["Logout"]))
+        results.append(check("phase filter", search_names("logout", phase=2) == []))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_stats_breakdown():
+    """Test grouped stats and their invalidation on writes."""
+    print("\nTesting stats breakdown:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_project(tmp)
+        call(feature_mcp.feature_create_bulk, [
+            make_feature("Login", category="auth"),
+            make_feature("Logout", category="auth"),
+            make_feature("Sidebar", category="layout"),
+        ])
+        feature_mcp.CURRENT_PHASE = 2
+        call(feature_mcp.feature_create_bulk, [make_feature("Billing", category="billing")])
+        feature_mcp.CURRENT_PHASE = 1
+
+        stats = json.loads(call(feature_mcp.feature_get_stats))
+        results.append(check("totals for current phase", (stats["passing"], stats["total"]) == (0, 3)))
+        results.append(check("no breakdown by default", "by_category" not in stats))
+
+        login_id = json.loads(call(feature_mcp.feature_get_next))["id"]
+        call(feature_mcp.feature_mark_passing, login_id)
+
+        stats = json.loads(call(feature_mcp.feature_get_stats, breakdown=True))
+        results.append(check("cache invalidated by writes", stats["passing"] == 1))
+        results.append(check("per-category breakdown", stats["by_category"]["auth"] == {
+            "passing": 1, "total": 2, "percentage": 50.0,
+        }))
+        results.append(check("per-phase breakdown", stats["by_phase"]["2"]["total"] == 1))
+
+        compact = call(feature_mcp.feature_get_stats, breakdown=True, compact=True)
+        results.append(check("compact output", "\n" not in compact and json.loads(compact)["by_category"]["layout"] == [0, 1]))
+
+        # Writes patch the cached counts instead of running the GROUP BY again
+        # (waiting in between so no deferred registry push reads during a write)
+        feature_mcp.wait_for_writes()
+        queries = []
+        grouped_counts = feature_mcp._store.grouped_counts
+        feature_mcp._store.grouped_counts = lambda: queries.append(1) or grouped_counts()
+        call(feature_mcp.feature_mark_failing, login_id)
+        feature_mcp.wait_for_writes()
+        call(feature_mcp.feature_create_bulk, [make_feature("Signup", category="auth")])
+        feature_mcp.wait_for_writes()
+        patched = call(feature_mcp.feature_get_stats, breakdown=True)
+        results.append(check("writes patch cached stats", not queries and json.loads(patched)["by_category"]["auth"] == {
+            "passing": 0, "total": 3, "percentage": 0.0,
+        }))
+        feature_mcp._invalidate_stats()
+        results.append(check("patched stats match a fresh count", call(feature_mcp.feature_get_stats, breakdown=True) == patched))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def run_tool_script() -> list[str]:
+    """Run a fixed sequence of tool calls, returning every output."""
+    outputs = [call(feature_mcp.feature_create_bulk, [
+        make_feature("Login", category="auth"),
+        make_feature("Dashboard", depends_on=[0], steps=["Open", "Check widgets"]),
+        make_feature("Settings", depends_on=[0, 1]),
+        make_feature("Logout", category="auth", description="Sign out of the session"),
+    ])]
+    outputs.append(call(feature_mcp.feature_create_bulk, [make_feature("Profile", depends_on_ids=[2])]))
+    outputs.append(call(feature_mcp.feature_create_bulk, [make_feature("Bad", depends_on_ids=[99])]))
+    outputs.append(call(feature_mcp.feature_get_next))
+    outputs.append(call(feature_mcp.feature_get_next_batch, k=5, max_total_steps=3))
+    outputs.append(call(feature_mcp.feature_mark_passing, 1))
+    outputs.append(call(feature_mcp.feature_mark_passing, 1))
+    outputs.append(call(feature_mcp.feature_mark_passing, 42))
+    outputs.append(call(feature_mcp.feature_skip, 2))
+    outputs.append(call(feature_mcp.feature_skip, 1))
+    outputs.append(call(feature_mcp.feature_get_next_batch, k=10))
+    outputs.append(call(feature_mcp.feature_get_for_regression, limit=5))
+    outputs.append(call(feature_mcp.feature_mark_passing, 4))
+    outputs.append(call(feature_mcp.feature_record_verification, 4, True))
+    outputs.append(call(feature_mcp.feature_get_for_regression, limit=5))
+    outputs.append(call(feature_mcp.feature_record_verification, 42, True))
+    outputs.append(call(feature_mcp.feature_mark_failing, 1))
+    outputs.append(call(feature_mcp.feature_mark_failing, 1))
+    outputs.append(call(feature_mcp.feature_record_verification, 4, False))
+    outputs.append(call(feature_mcp.feature_get_stats, breakdown=True))
+    outputs.append(call(feature_mcp.feature_search, "auth*"))
+    outputs.append(call(feature_mcp.feature_search, '"sign', passes=False))
+    return outputs
+
+
+def test_backend_parity():
+    """Test that every storage backend returns the same tool output."""
+    print("\nTesting storage backend parity:\n")
+    results = []
+
+    outputs = {}
+    for backend in STORAGE_BACKENDS:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_project(tmp, backend=backend)
+            outputs[backend] = [TIMESTAMP_PATTERN.sub('"<time>"', out) for out in run_tool_script()]
+            feature_mcp.wait_for_writes()
+            feature_mcp._store.close()
+            feature_mcp._store = None
+
+    reference = outputs["orm"]
+    for backend, result in outputs.items():
+        if backend == "orm":
+            continue
+        mismatches = [i for i, (a, b) in enumerate(zip(reference, result)) if a != b]
+        results.append(check(f"{backend} matches orm output", not mismatches and len(result) == len(reference)))
+        for i in mismatches:
+            print(f"    call {i}:\n      orm: {reference[i]}\n      {backend}: {result[i]}")
+
+    for backend in STORAGE_BACKENDS:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = open_feature_store(Path(tmp), backend)
+            store.create_features(1, [{**make_feature(f"F{i}"), "blocked_by": 0} for i in range(3)])
+            store.mark_passing(1)
+            store.mark_passing(2)
+            results.append(check(f"{backend} counts passing features", store.grouped_counts() == [(1, "test", 3, 2)]))
+            store.close()
+
+    class IncompleteStore(FeatureStore):
+        def get(self, feature_id, columns=()):
+            return None
+
+    try:
+        IncompleteStore()
+        rejected = False
+    except TypeError:
+        rejected = True
+    results.append(check("backend missing methods fails at creation", rejected))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_compact_output():
+    """Test field projection, compact encoding and short keys."""
+    print("\nTesting compact output:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_project(tmp)
+        call(feature_mcp.feature_create_bulk, [make_feature("Login", category="auth"), make_feature("Logout")])
+
+        full = call(feature_mcp.feature_get_next_batch, k=2)
+        projected = call(feature_mcp.feature_get_next_batch, k=2, fields=["name", "passes"], compact=True)
+        results.append(check("projection keeps id and the requested fields", json.loads(projected)["features"][0] == {
+            "id": 1, "name": "Login", "passes": False,
+        }))
+        results.append(check("compact output has no indentation", "\n" not in projected and len(projected) < len(full) / 3))
+
+        short = json.loads(call(feature_mcp.feature_get_next, fields=["category"], short_keys=True))
+        results.append(check("short keys abbreviate feature keys", short == {"id": 1, "cat": "auth"}))
+
+        call(feature_mcp.feature_mark_passing, 1)
+        regression = json.loads(call(feature_mcp.feature_get_for_regression, fields=["name"]))
+        results.append(check("regression results are projected", regression["features"] == [{"id": 1, "name": "Login"}]))
+        found = json.loads(call(feature_mcp.feature_search, "logout", fields=["snippet"], short_keys=True))
+        results.append(check("search results are projected", list(found["features"][0]) == ["id", "sn"]))
+
+        error = json.loads(call(feature_mcp.feature_get_next, fields=["name", "colour"]))
+        results.append(check("unknown fields are an error", "colour" in error.get("error", "")))
+
+        # The stdlib fallback must emit the same bytes as orjson, compact or not
+        sample = {"name": "Résumé ✓", "steps": ["a", "b"], "passes": False, "percentage": 50.0, "empty": []}
+        original_orjson = feature_mcp.orjson
+        feature_mcp.orjson = None
+        try:
+            fallback = call(feature_mcp.feature_get_next_batch, k=2)
+            fallback_compact = call(feature_mcp.feature_get_next_batch, k=2, compact=True)
+            fallback_sample = [feature_mcp._dumps(sample), feature_mcp._dumps(sample, compact=True)]
+        finally:
+            feature_mcp.orjson = original_orjson
+        encoded = call(feature_mcp.feature_get_next_batch, k=2)
+        encoded_compact = call(feature_mcp.feature_get_next_batch, k=2, compact=True)
+        encoded_sample = [feature_mcp._dumps(sample), feature_mcp._dumps(sample, compact=True)]
+        results.append(check("stdlib fallback encodes the same bytes",
+                             (fallback, fallback_compact) == (encoded, encoded_compact) and fallback_sample == encoded_sample))
+        results.append(check("stdlib fallback keeps non-ASCII text", "Résumé ✓" in fallback_sample[1]))
+
+        feature_mcp.COMPACT_OUTPUT = True
+        try:
+            marked = call(feature_mcp.feature_mark_passing, 2)
+        finally:
+            feature_mcp.COMPACT_OUTPUT = False
+        results.append(check("FEATURES_COMPACT applies to every tool", "\n" not in marked))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_deferred_columns():
+    """Test that description and steps are only read by tools that return them."""
+    print("\nTesting deferred heavy columns:\n")
+    results = []
+
+    from sqlalchemy import event
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_project(tmp, backend="orm")
+        call(feature_mcp.feature_create_bulk, [make_feature("Login"), make_feature("Logout")])
+
+        statements = []
+        event.listen(
+            feature_mcp._store.engine, "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+
+        def reads_heavy_columns(tool, *args, **kwargs) -> bool:
+            statements.clear()
+            call(tool, *args, **kwargs)
+            feature_mcp.wait_for_writes()
+            return any("features.steps" in s or "features.description" in s for s in statements)
+
+        results.append(check("stats do not read heavy columns", not reads_heavy_columns(feature_mcp.feature_get_stats)))
+        results.append(check("skip does not read heavy columns", not reads_heavy_columns(feature_mcp.feature_skip, 1)))
+        results.append(check("projected reads skip heavy columns", not reads_heavy_columns(
+            feature_mcp.feature_get_next, fields=["name"]
+        )))
+        results.append(check("full reads load heavy columns", reads_heavy_columns(feature_mcp.feature_get_next)))
+
+        feature = json.loads(call(feature_mcp.feature_get_next))
+        results.append(check("full reads return description and steps", feature["steps"] == ["Verify Logout"]))
+        batch = json.loads(call(feature_mcp.feature_get_next_batch, k=2, max_total_steps=1, fields=["name"]))
+        results.append(check("step cap works with projected fields", batch["total_steps"] == 1 and batch["features"] == [
+            {"id": 2, "name": "Logout"},
+        ]))
+
+        plan = sqlite3.connect(Path(tmp) / "features.db").execute(
+            "EXPLAIN QUERY PLAN SELECT phase, category, COUNT(id), SUM(passes) FROM features GROUP BY phase, category"
+        ).fetchall()
+        results.append(check("stats are counted from a covering index", any(
+            "COVERING INDEX ix_features_stats" in row[-1] for row in plan
+        )))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_concurrent_tools():
+    """Test that reads are not held up by a busy writer."""
+    print("\nTesting concurrent tool calls:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_project(tmp)
+        call(feature_mcp.feature_create_bulk, [make_feature("One"), make_feature("Two")])
+
+        async def scenario():
+            # Occupy the writer thread, as a long feature_create_bulk would
+            release = threading.Event()
+            busy = asyncio.get_running_loop().run_in_executor(feature_mcp._write_executor, release.wait)
+            mark = asyncio.ensure_future(feature_mcp.feature_mark_passing(1))
+            stats = await asyncio.wait_for(feature_mcp.feature_get_stats(), 5)
+            following = await asyncio.wait_for(feature_mcp.feature_get_next(), 5)
+            mark_waited = not mark.done()
+            release.set()
+            await busy
+            return json.loads(stats), json.loads(following), mark_waited, json.loads(await mark)
+
+        stats, following, mark_waited, marked = asyncio.run(scenario())
+        results.append(check("stats served while the writer is busy", stats["total"] == 2))
+        results.append(check("get_next served while the writer is busy", following["id"] == 1))
+        results.append(check("writes wait for the writer", mark_waited and marked["passes"] is True))
+
+        # An open write transaction from another process does not block readers (WAL)
+        conn = sqlite3.connect(Path(tmp) / "features.db")
+        conn.execute("BEGIN EXCLUSIVE")
+        conn.execute("UPDATE features SET priority = priority + 10")
+        try:
+            following = json.loads(call(feature_mcp.feature_get_next))
+        finally:
+            conn.rollback()
+            conn.close()
+        results.append(check("reads see committed state during a foreign write", following["id"] == 2))
+
+        # Failed bookkeeping writes are counted and reported with the stats
+        def locked():
+            raise sqlite3.OperationalError("database is locked")
+
+        failed_before = feature_mcp._failed_writes
+        feature_mcp._queue_write(locked)
+        feature_mcp.wait_for_writes()
+        stats = json.loads(call(feature_mcp.feature_get_stats))
+        results.append(check("failed queued writes are reported", stats.get("failed_writes") == failed_before + 1))
+        feature_mcp._failed_writes = failed_before
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_verification():
+    """Test least-recently-verified regression selection."""
+    print("\nTesting regression verification:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_project(tmp)
+        call(feature_mcp.feature_create_bulk, [make_feature(f"F{i}") for i in range(5)])
+        call(feature_mcp.feature_create_bulk, [make_feature("Dependent", depends_on_ids=[3])])
+        for feature_id in range(1, 6):
+            call(feature_mcp.feature_mark_passing, feature_id)
+
+        def regression_ids(limit):
+            batch = json.loads(call(feature_mcp.feature_get_for_regression, limit=limit))
+            return [f["id"] for f in batch["features"]]
+
+        # Verify two features per round, as an agent would
+        checked = []
+        for _ in range(3):
+            for feature_id in regression_ids(2):
+                call(feature_mcp.feature_record_verification, feature_id, True)
+                checked.append(feature_id)
+        results.append(check("covers every passing feature before repeating", sorted(checked[:5]) == [1, 2, 3, 4, 5]))
+        results.append(check("then starts over with the oldest check", checked[5] == 1))
+
+        feature = json.loads(call(feature_mcp.feature_record_verification, 2, True))
+        results.append(check("counts verifications", feature["verification_count"] == 2))
+        results.append(check("stamps verification time", feature["last_verified_at"] is not None))
+        results.append(check("freshly verified feature goes last", regression_ids(5)[-1] == 2))
+
+        feature = json.loads(call(feature_mcp.feature_record_verification, 3, False))
+        results.append(check("failed check marks feature failing", feature["passes"] is False))
+        results.append(check("failed check leaves regression queue", 3 not in regression_ids(5)))
+        next_ids = [f["id"] for f in json.loads(call(feature_mcp.feature_get_next_batch, k=5))["features"]]
+        results.append(check("failed check re-blocks dependents", next_ids == [3]))
+        events = [e["event"] for e in load_events(Path(tmp)) if e["feature_id"] == 3 and e["event"] != "served"]
+        results.append(check("failed check is recorded as a regression", events == ["passed", "failed"]))
+
+        missing = json.loads(call(feature_mcp.feature_record_verification, 42, True))
+        results.append(check("unknown feature is an error", "error" in missing))
+
+        plan = sqlite3.connect(Path(tmp) / "features.db").execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM features WHERE phase = 1 AND passes = 1 "
+            "ORDER BY last_verified_at, id LIMIT 3"
+        ).fetchall()
+        results.append(check("selection uses the regression index", any("ix_features_regression" in row[-1] for row in plan)))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+SECTIONED_SPEC = """<project_specification>
+  <project_name>Demo</project_name>
+  <core_features>
+    <auth>Login and logout</auth>
+  </core_features>
+  <ui_layout>Sidebar and header</ui_layout>
+</project_specification>
+"""
+
+
+def test_initializer_checkpoints():
+    """Test per-section feature creation checkpoints for a resumable initializer."""
+    print("\nTesting initializer checkpoints:\n")
+    results = []
+
+    from agent import get_initializer_state
+    from progress import get_completed_sections
+    from prompts import get_initializer_checkpoint_section, get_spec_sections
+
+    sections = get_spec_sections(SECTIONED_SPEC)
+    results.append(check("spec splits into top-level sections", [name for name, _ in sections] == [
+        "project_name", "core_features", "ui_layout",
+    ]))
+    results.append(check("sections keep their nested content", "<auth>" in sections[1][1]))
+    results.append(check("spec without elements is one section", [n for n, _ in get_spec_sections("Build a todo app")] == ["spec"]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / "prompts").mkdir()
+        (project_dir / "prompts" / "app_spec.txt").write_text(SECTIONED_SPEC)
+        setup_project(tmp)
+
+        status = json.loads(call(feature_mcp.feature_get_init_status))
+        results.append(check("new project has every section pending", (status["done"], status["total"], status["next_section"]) == (0, 3, "project_name")))
+        results.append(check("new project needs the initializer", get_initializer_state(project_dir, 1)[0]))
+
+        call(feature_mcp.feature_create_bulk, [], section="project_name")
+        created = json.loads(call(feature_mcp.feature_create_bulk, [make_feature("Login"), make_feature("Logout")], section="core_features"))
+        results.append(check("section batch reports pending sections", created["created"] == 2 and created["pending_sections"] == ["ui_layout"]))
+
+        repeated = json.loads(call(feature_mcp.feature_create_bulk, [make_feature("Login again")], section="core_features"))
+        stats = json.loads(call(feature_mcp.feature_get_stats))
+        results.append(check("completed section cannot be created twice", "error" in repeated and stats["total"] == 2))
+        unknown = json.loads(call(feature_mcp.feature_create_bulk, [make_feature("Other")], section="pricing"))
+        results.append(check("unknown section is an error", "ui_layout" in unknown.get("error", "")))
+        invalid = json.loads(call(feature_mcp.feature_create_bulk, [make_feature("Bad", depends_on=[5])], section="ui_layout"))
+        results.append(check("failed batch leaves its section pending", "error" in invalid and "ui_layout" not in get_completed_sections(project_dir, 1)))
+
+        feature_mcp.wait_for_writes()
+        needs_initializer, names, completed = get_initializer_state(project_dir, 1)
+        results.append(check("harness sees completed sections", completed == {"project_name": 0, "core_features": 2}))
+        results.append(check("interrupted initializer is resumed", needs_initializer))
+        resume_prompt = get_initializer_checkpoint_section(names, completed)
+        results.append(check("resume prompt lists done and pending sections", "core_features: done (2 features)" in resume_prompt and "ui_layout: pending" in resume_prompt))
+
+        call(feature_mcp.feature_create_bulk, [make_feature("Sidebar")], section="ui_layout")
+        feature_mcp.wait_for_writes()
+        status = json.loads(call(feature_mcp.feature_get_init_status))
+        results.append(check("all sections done completes initialization", status["complete"] and not get_initializer_state(project_dir, 1)[0]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Features created without section checkpoints: initialized in one pass
+        setup_project(tmp)
+        call(feature_mcp.feature_create_bulk, [make_feature("Login")])
+        feature_mcp.wait_for_writes()
+        results.append(check("features without checkpoints count as initialized", not get_initializer_state(Path(tmp), 1)[0]))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_parallel_initializer_merge():
+    """Test merging features created by concurrent per-section initializers."""
+    print("\nTesting parallel initializer merge:\n")
+    results = []
+
+    from progress import merge_section_features
+    from prompts import get_section_initializer_prompt, get_spec_sections
+
+    sections = get_spec_sections(SECTIONED_SPEC)
+    names = [name for name, _ in sections]
+    prompt = get_section_initializer_prompt(1, "core_features", sections[1][1], names)
+    results.append(check("section prompt carries only its section", "<auth>" in prompt and "Sidebar and header" not in prompt))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / "prompts").mkdir()
+        (project_dir / "prompts" / "app_spec.txt").write_text(SECTIONED_SPEC)
+        setup_project(tmp)
+
+        # Batches arrive out of spec order, and two sections describe "Login"
+        call(feature_mcp.feature_create_bulk, [
+            make_feature("Sidebar"), make_feature("login ", depends_on=[0]), make_feature("Profile", depends_on=[1]),
+        ], section="ui_layout")
+        call(feature_mcp.feature_create_bulk, [make_feature("Login"), make_feature("Logout", depends_on=[0])], section="core_features")
+        call(feature_mcp.feature_create_bulk, [], section="project_name")
+        feature_mcp.wait_for_writes()
+
+        merged = merge_section_features(project_dir, 1, names)
+        results.append(check("duplicates across sections are removed", merged == {"features": 4, "duplicates": 1, "cycles": 0}))
+
+        conn = sqlite3.connect(project_dir / "features.db")
+        order = [row[0] for row in conn.execute("SELECT name FROM features WHERE phase = 1 ORDER BY priority")]
+        profile_deps = conn.execute(
+            "SELECT d.depends_on_id, f.blocked_by FROM feature_dependencies d JOIN features f ON f.id = d.feature_id "
+            "WHERE f.name = 'Profile'"
+        ).fetchall()
+        sections_by_name = dict(conn.execute("SELECT name, section FROM features"))
+        conn.close()
+        results.append(check("priorities follow spec order", order == ["Login", "Logout", "Sidebar", "Profile"]))
+        results.append(check("dependents wait on the kept feature", profile_deps == [(4, 1)]))
+        results.append(check("features record their section", sections_by_name["Sidebar"] == "ui_layout"))
+
+        call(feature_mcp.feature_mark_passing, 4)
+        next_ids = [f["id"] for f in json.loads(call(feature_mcp.feature_get_next_batch, k=5))["features"]]
+        results.append(check("merged queue releases dependents", next_ids == [5, 1, 3]))
+
+        results.append(check("merging again changes nothing", merge_section_features(project_dir, 1, names) == {"features": 4, "duplicates": 0, "cycles": 0}))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        (project_dir / "prompts").mkdir()
+        (project_dir / "prompts" / "app_spec.txt").write_text(SECTIONED_SPEC)
+        setup_project(tmp)
+
+        # core_features' "Auth" depends on ui_layout's "Settings", which depends on
+        # ui_layout's own "Auth": keeping one "Auth" would close a cycle
+        call(feature_mcp.feature_create_bulk, [
+            make_feature("Auth"), make_feature("Settings", depends_on=[0]),
+        ], section="ui_layout")
+        call(feature_mcp.feature_create_bulk, [make_feature("Auth", depends_on_ids=[2])], section="core_features")
+        feature_mcp.wait_for_writes()
+
+        merged = merge_section_features(project_dir, 1, names)
+        results.append(check("cross-section cycle is broken", merged == {"features": 2, "duplicates": 1, "cycles": 1}))
+
+        conn = sqlite3.connect(project_dir / "features.db")
+        edges = conn.execute("SELECT feature_id, depends_on_id FROM feature_dependencies").fetchall()
+        created = dict(conn.execute("SELECT name, features_created FROM spec_sections"))
+        conn.close()
+        results.append(check("only the closing dependency is dropped", edges == [(3, 2)]))
+        results.append(check("section counts exclude removed duplicates", created == {"ui_layout": 1, "core_features": 1}))
+        next_names = [f["name"] for f in json.loads(call(feature_mcp.feature_get_next_batch, k=5))["features"]]
+        results.append(check("queue does not deadlock after merging", next_names == ["Settings"]))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_history():
+    """Test feature event recording and the history report."""
+    print("\nTesting feature history:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_project(tmp)
+        feature_mcp.SESSION_ID = "s1"
+        try:
+            call(feature_mcp.feature_create_bulk, [
+                make_feature("Login", category="auth"),
+                make_feature("Dashboard", depends_on=[0]),
+            ])
+            call(feature_mcp.feature_get_next)
+            call(feature_mcp.feature_mark_passing, 1)
+            call(feature_mcp.feature_mark_passing, 1)
+            dashboard = json.loads(call(feature_mcp.feature_get_next))
+            call(feature_mcp.feature_skip, dashboard["id"])
+            failed = json.loads(call(feature_mcp.feature_mark_failing, 1))
+        finally:
+            feature_mcp.SESSION_ID = None
+
+        feature_mcp.wait_for_writes()
+        events = load_events(Path(tmp))
+        results.append(check("records transitions in order", [(e["feature_id"], e["event"]) for e in events] == [
+            (1, "served"), (1, "passed"), (2, "served"), (2, "skipped"), (1, "failed"),
+        ]))
+        results.append(check("records the session id", {e["session_id"] for e in events} == {"s1"}))
+        results.append(check("failing re-blocks dependents", not failed["passes"]
+                             and json.loads(call(feature_mcp.feature_get_next))["name"] == "Login"))
+
+        report = build_report(Path(tmp))
+        results.append(check("regression rate", report["regressions"] == {"passed": 1, "regressed": 1, "rate": 1.0}))
+
+    # Derived metrics on a known timeline
+    def event(minute, feature_id, name, category="ui", session="a"):
+        return {
+            "feature_id": feature_id, "category": category, "event": name, "session_id": session,
+            "time": datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc) + timedelta(minutes=minute),
+        }
+
+    timeline = [
+        event(0, 1, "served"), event(10, 1, "passed"),
+        event(10, 2, "served"), event(40, 2, "passed"),
+        event(100, 3, "served", category="api", session="b"), event(130, 3, "passed", category="api", session="b"),
+    ]
+    results.append(check("throughput per agent hour", throughput(timeline) == {
+        "passed": 3, "sessions": 2, "agent_hours": 1.17, "features_per_hour": 2.57,
+    }))
+    results.append(check("median time to pass per category", time_to_pass_by_category(timeline) == {
+        "api": {"features": 1, "median_minutes": 30.0},
+        "ui": {"features": 2, "median_minutes": 20.0},
+    }))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_import():
+    """Test streaming, chunked and resumable feature imports."""
+    print("\nTesting feature import:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        _, session_maker = create_database(project_dir)
+
+        def names():
+            with session_maker() as session:
+                return [f.name for f in session.query(Feature).order_by(Feature.id)]
+
+        # JSON array elements larger than the read buffer still parse
+        big = [make_feature("Big", description="x" * 100_000), make_feature("Small")]
+        json_file = project_dir / "big.json"
+        json_file.write_text(json.dumps(big, indent=2))
+        results.append(check("streams JSON arrays", [r["name"] for r in iter_feature_records(json_file)] == ["Big", "Small"]))
+
+        csv_file = project_dir / "features.csv"
+        csv_file.write_text('category,name,description,steps,passes\nui,Nav,Top nav,Open app|See nav,true\nui,Footer,Footer links,"[""Scroll""]",0\n')
+        rows = list(iter_feature_records(csv_file))
+        results.append(check("CSV steps and passes", rows[0]["steps"] == ["Open app", "See nav"] and rows[0]["passes"] is True
+                             and rows[1]["steps"] == ["Scroll"] and rows[1]["passes"] is False))
+
+        # An import that fails part way keeps the committed chunks
+        source = project_dir / "feature_list.ndjson"
+        lines = [json.dumps(make_feature(f"F{i}")) for i in range(1, 7)]
+        source.write_text("\n".join(lines[:4] + ["{broken"] + lines[5:]) + "\n")
+        results.append(check("failed import reports error", import_features(source, session_maker, chunk_size=2) is None))
+        results.append(check("committed chunks are kept", names() == ["F1", "F2", "F3", "F4"]))
+
+        # Startup migration resumes the interrupted import instead of skipping it
+        source.write_text("\n".join(lines) + "\n")
+        results.append(check("resumes interrupted import", migrate_json_to_sqlite(project_dir, session_maker)))
+        results.append(check("all features imported once", names() == [f"F{i}" for i in range(1, 7)]))
+        results.append(check("source file backed up", not source.exists()))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Importing into a database with passing features appends after them
+        project_dir = Path(tmp)
+        _, session_maker = create_database(project_dir)
+        with session_maker() as session:
+            for i in (1, 2):
+                session.add(Feature(id=i, priority=i, category="ui", name=f"Done{i}", description="",
+                                    steps=[], passes=True, phase=1))
+            session.commit()
+
+        source = project_dir / "more.ndjson"
+        source.write_text("\n".join(json.dumps(make_feature(f"New{i}", id=i, priority=i)) for i in (1, 2, 3)) + "\n")
+        results.append(check("import into non-empty database", import_features(source, session_maker, chunk_size=2) == 3))
+        with session_maker() as session:
+            rows = [(f.id, f.priority, f.name, f.passes) for f in session.query(Feature).order_by(Feature.id)]
+        results.append(check("existing features are kept", rows[:2] == [(1, 1, "Done1", True), (2, 2, "Done2", True)]))
+        results.append(check("imported features get fresh ids and priorities",
+                             rows[2:] == [(3, 3, "New1", False), (4, 4, "New2", False), (5, 5, "New3", False)]))
+
+        # Restarting a changed file rewrites only this import's own rows
+        with session_maker() as session:
+            progress = session.get(ImportProgress, source.name)
+            progress.completed, progress.items_done = False, 2
+            session.commit()
+        source.write_text("\n".join(json.dumps(make_feature(f"Redo{i}", id=i)) for i in (1, 2)) + "\n")
+        import_features(source, session_maker)
+        with session_maker() as session:
+            names = [f.name for f in session.query(Feature).order_by(Feature.id)]
+        results.append(check("restart keeps the import's id range", names == ["Done1", "Done2", "Redo1", "Redo2", "New3"]))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_export():
+    """Test streaming feature exports: JSON layout, NDJSON, gzip and filters."""
+    print("\nTesting feature export:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        _, session_maker = create_database(project_dir)
+
+        results.append(check("empty export matches json.dump", export_to_json(project_dir, session_maker).read_text() == "[]"))
+
+        with session_maker() as session:
+            for i in range(1, 8):
+                session.add(Feature(
+                    priority=8 - i, category="ui", name=f"Feature \u00e9 {i}",
+                    description=f"Feature {i}", steps=[f"Step {i}", "Done"],
+                    passes=i % 2 == 0, phase=1 if i <= 5 else 2,
+                ))
+            session.commit()
+            expected = [
+                f.to_dict()
+                for f in session.query(Feature).order_by(Feature.priority.asc(), Feature.id.asc())
+            ]
+
+        # Pretty output keeps the old json.dump(indent=2) layout byte for byte,
+        # also when rows arrive in several batches
+        output = export_to_json(project_dir, session_maker, batch_size=3)
+        results.append(check("JSON export matches json.dump layout", output.read_text(encoding="utf-8") == json.dumps(expected, indent=2)))
+
+        output = export_to_json(project_dir, session_maker, format="ndjson", compress=True, batch_size=2)
+        with gzip.open(output, "rt", encoding="utf-8") as f:
+            exported = [json.loads(line) for line in f]
+        results.append(check("gzip NDJSON export", output.name == "feature_list_export.ndjson.gz" and exported == expected))
+
+        output = export_to_json(project_dir, session_maker, project_dir / "pending.json", phase=1, passes=False)
+        pending = [f["name"] for f in json.loads(output.read_text(encoding="utf-8"))]
+        results.append(check("phase and passes filters", pending == ["Feature \u00e9 5", "Feature \u00e9 3", "Feature \u00e9 1"]))
+
+        try:
+            export_to_json(project_dir, session_maker, format="xml")
+            format_error = False
+        except ValueError:
+            format_error = True
+        results.append(check("unknown format is an error", format_error))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_schema_migrations():
+    """Test the versioned schema migration runner."""
+    print("\nTesting schema migrations:\n")
+    results = []
+
+    results.append(check("SCHEMA_VERSION matches the last migration", SCHEMA_MIGRATIONS[-1][0] == SCHEMA_VERSION))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            create_database(project_dir)[0].dispose()
+        results.append(check("new database is stamped current", get_schema_version(project_dir) == SCHEMA_VERSION))
+        # The features server opens databases on its first tool call; stdout is its protocol stream
+        results.append(check("creating a database prints nothing to stdout", stdout.getvalue() == ""))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A database from before phases, dependencies and search existed
+        project_dir = Path(tmp)
+        conn = sqlite3.connect(project_dir / "features.db")
+        conn.execute(
+            "CREATE TABLE features (id INTEGER PRIMARY KEY, priority INTEGER NOT NULL, "
+            "category VARCHAR(100) NOT NULL, name VARCHAR(255) NOT NULL, "
+            "description TEXT NOT NULL, steps JSON NOT NULL, passes BOOLEAN)"
+        )
+        conn.execute("INSERT INTO features VALUES (1, 1, 'ui', 'Legacy', 'Old feature', '[]', 0)")
+        conn.commit()
+        conn.close()
+
+        engine, session_maker = create_database(project_dir)
+        engine.dispose()
+        results.append(check("legacy database migrated to current", get_schema_version(project_dir) == SCHEMA_VERSION))
+
+        conn = sqlite3.connect(project_dir / "features.db")
+        row = conn.execute(
+            "SELECT phase, blocked_by, last_verified_at, verification_count FROM features"
+        ).fetchone()
+        indexed = conn.execute("SELECT rowid FROM features_fts WHERE features_fts MATCH 'legacy'").fetchall()
+        conn.close()
+        results.append(check("existing rows get column defaults", row == (1, 0, None, 0)))
+        results.append(check("existing rows are search indexed", indexed == [(1,)]))
+
+        conn = sqlite3.connect(project_dir / "features.db")
+        columns = [col[1] for col in conn.execute("PRAGMA table_info(features)")]
+        conn.execute("UPDATE features SET name = 'Renamed' WHERE id = 1")
+        conn.commit()
+        reindexed = conn.execute("SELECT rowid FROM features_fts WHERE features_fts MATCH 'renamed'").fetchall()
+        conn.close()
+        results.append(check("heavy columns are moved to the end of rows", columns[-2:] == ["description", "steps"]))
+        results.append(check("search index triggers survive the rebuild", reindexed == [(1,)]))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_registry():
+    """Test the project registry and progress pushes from the server."""
+    print("\nTesting project registry:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generations_dir = Path(tmp)
+        original_generations_dir = registry.GENERATIONS_DIR
+        registry.GENERATIONS_DIR = generations_dir
+        try:
+            for name in ("alpha", "beta", "gamma"):
+                (generations_dir / name).mkdir()
+
+            # beta has features before the registry exists
+            setup_project(str(generations_dir / "beta"))
+            feature_mcp._store.create_features(1, [
+                {**make_feature(f"B{i}"), "blocked_by": 0} for i in range(4)
+            ])
+
+            projects = {p["name"]: p for p in registry.sync_registry()}
+            results.append(check("sync registers every project", sorted(projects) == ["alpha", "beta", "gamma"]))
+            results.append(check("sync scans unregistered projects", (projects["beta"]["passing"], projects["beta"]["total"]) == (0, 4)))
+
+            # Progress changes in the server are pushed to the registry
+            call(feature_mcp.feature_mark_passing, 1)
+            feature_mcp.wait_for_writes()  # Registry pushes are deferred
+            beta = next(p for p in registry.list_projects() if p["name"] == "beta")
+            results.append(check("server pushes progress", (beta["passing"], beta["total"]) == (1, 4)))
+
+            setup_project(str(generations_dir / "gamma"))
+            call(feature_mcp.feature_create_bulk, [make_feature("G1")])
+            call(feature_mcp.feature_mark_passing, 1)
+            feature_mcp.wait_for_writes()
+            registry.update_project(generations_dir / "gamma", session=True)
+
+            names = lambda order: [p["name"] for p in registry.list_projects(order)]
+            results.append(check("order by progress", names("progress") == ["gamma", "beta", "alpha"]))
+            results.append(check("order by status (unfinished first)", names("status") == ["alpha", "beta", "gamma"]))
+            results.append(check("order by last session", names("recent")[0] == "gamma"))
+
+            registry.update_project(Path(tmp).parent / "elsewhere", passing=1, total=1)
+            results.append(check("projects outside generations are ignored", len(registry.list_projects()) == 3))
+
+            feature_mcp.wait_for_writes()
+            feature_mcp._store.close()
+            feature_mcp._store = None
+            shutil.rmtree(generations_dir / "alpha")
+            results.append(check("sync forgets deleted projects", [p["name"] for p in registry.sync_registry()] == ["beta", "gamma"]))
+
+            # Failures stay off stdout (the features server's protocol stream)
+            broken_dir = Path(tmp) / "broken"
+            registry.get_registry_path(broken_dir).mkdir(parents=True)
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                registry.update_project(broken_dir / "delta", passing=1, generations_dir=broken_dir)
+            results.append(check("registry failure is not printed to stdout", stdout.getvalue() == ""))
+            try:
+                registry.update_project(broken_dir / "delta", passing=1, generations_dir=broken_dir, raise_errors=True)
+                raised = False
+            except sqlite3.Error:
+                raised = True
+            results.append(check("registry failure raised on request", raised))
+        finally:
+            registry.GENERATIONS_DIR = original_generations_dir
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_checkpoints():
+    """Test session checkpoints and rollback of features.db and git."""
+    print("\nTesting session checkpoints:\n")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+
+        def git(*args: str) -> str:
+            return subprocess.run(
+                ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                cwd=project_dir, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+
+        git("init", "-q")
+        (project_dir / "app.js").write_text("v1\n")
+        git("add", "app.js")
+        git("commit", "-q", "-m", "v1")
+
+        first = checkpoints.create_checkpoint(project_dir, "session-a", 1)
+        results.append(check("checkpoint before the database exists", first["database"] is None))
+
+        setup_project(tmp)
+        call(feature_mcp.feature_create_bulk, [make_feature(f"Feature {i}") for i in range(50)])
+        feature_mcp.wait_for_writes()
+        second = checkpoints.create_checkpoint(project_dir, "session-b", 1)
+        third = checkpoints.create_checkpoint(project_dir, "session-c", 1)
+        results.append(check("checkpoints are numbered in order", [second["session"], third["session"]] == [2, 3]))
+        results.append(check("unchanged database shares all chunks", second["database"] == third["database"]))
+        results.append(check("checkpoints record git HEAD", third["git_head"] == git("rev-parse", "HEAD")))
+
+        # A bad session: features marked passing and a broken commit
+        call(feature_mcp.feature_mark_passing, 1)
+        (project_dir / "app.js").write_text("broken\n")
+        git("commit", "-q", "-am", "broken")
+        feature_mcp.wait_for_writes()
+
+        # Untracked files and features.db do not count as uncommitted work; a
+        # rename counts by both of its paths
+        (project_dir / "notes.txt").write_text("untracked\n")
+        (project_dir / "features.db.md").write_text("notes\n")
+        git("add", "features.db.md")
+        git("commit", "-q", "-m", "notes")
+        results.append(check("untracked files are not uncommitted work", checkpoints._uncommitted_paths(project_dir) == []))
+        git("mv", "features.db.md", "notes.md")
+        results.append(check("renamed file is uncommitted work", checkpoints._uncommitted_paths(project_dir) == ["notes.md"]))
+        git("reset", "-q", "--hard")
+        (project_dir / "notes.txt").unlink()
+
+        (project_dir / "app.js").write_text("uncommitted\n")
+        try:
+            checkpoints.rollback(project_dir, 3)
+            refused = False
+        except ValueError:
+            refused = True
+        results.append(check("rollback refuses to discard uncommitted work", refused))
+
+        restored = checkpoints.rollback(project_dir, 3, force=True)
+        stats = json.loads(call(feature_mcp.feature_get_stats))
+        results.append(check("rollback restores features.db", (stats["passing"], stats["total"]) == (0, 50)))
+        results.append(check("rollback restores git HEAD", (project_dir / "app.js").read_text() == "v1\n"))
+        results.append(check("rollback reports the previous HEAD", restored["previous_head"] != restored["git_head"]))
+
+        try:
+            checkpoints.rollback(project_dir, 9)
+            missing_error = False
+        except ValueError:
+            missing_error = True
+        results.append(check("unknown checkpoint is an error", missing_error))
+
+        call(feature_mcp.feature_mark_passing, 2)
+        feature_mcp.wait_for_writes()
+        checkpoints.create_checkpoint(project_dir, "session-d", 1)
+        removed = checkpoints.prune_checkpoints(project_dir, keep=2)
+        kept = [c["session"] for c in checkpoints.list_checkpoints(project_dir)]
+        referenced = {d for c in checkpoints.list_checkpoints(project_dir) for d in c["database"]["chunks"]}
+        stored = {path.name for path in (project_dir / ".checkpoints" / "objects").glob("*/*")}
+        results.append(check("pruning keeps the newest checkpoints", (removed, kept) == (2, [3, 4])))
+        results.append(check("pruning deletes unreferenced chunks", stored == referenced))
+        results.append(check("checkpoints are ignored by git", ".checkpoints" not in git("status", "--porcelain")))
+
+        feature_mcp.wait_for_writes()
+        feature_mcp._store.close()
+        feature_mcp._store = None
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_prompt_cache():
+    """Test the prompt file cache and compiled template rendering."""
+    print("\nTesting prompt cache and templates:\n")
+    results = []
+
+    from prompts import CompiledTemplate, get_phase_initializer_prompt, read_cached
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "prompt.md"
+        results.append(check("missing file reads as None", read_cached(path) is None))
+
+        path.write_text("version one\n")
+        first = read_cached(path)
+        results.append(check("unchanged file is not re-read", first == "version one\n" and read_cached(path) is first))
+
+        # Same size, so only the new mtime tells the versions apart
+        path.write_text("version two\n")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        results.append(check("mtime change invalidates the cache", read_cached(path) == "version two\n"))
+
+        # The compiled render matches the chained str.replace it replaced
+        project_dir = Path(tmp)
+        (project_dir / "prompts").mkdir()
+        template = "# Phase {{PHASE_NUMBER}}\n\n{{PHASE_SPEC}}\n\nPhase {{PHASE_NUMBER}} only. {{PROJECT_NAME}}\n"
+        spec = "<feature>Export as {{FORMAT}}</feature>"
+        (project_dir / "prompts" / "phase_initializer_prompt.md").write_text(template)
+        (project_dir / "prompts" / "phase2_spec.txt").write_text(spec)
+        expected = template.replace("{{PHASE_NUMBER}}", "2").replace("{{PHASE_SPEC}}", spec)
+        results.append(check("phase prompt renders like str.replace", get_phase_initializer_prompt(project_dir, 2) == expected))
+
+    compiled = CompiledTemplate(template)
+    results.append(check("template lists its placeholders", compiled.placeholders == {"PHASE_NUMBER", "PHASE_SPEC", "PROJECT_NAME"}))
+    results.append(check(
+        "missing placeholder value is left as-is",
+        compiled.render(PHASE_NUMBER=3) == template.replace("{{PHASE_NUMBER}}", "3"),
+    ))
+    results.append(check(
+        "extra placeholder values are ignored",
+        compiled.render(PHASE_NUMBER=3, PHASE_SPEC="spec", OTHER="x")
+        == template.replace("{{PHASE_NUMBER}}", "3").replace("{{PHASE_SPEC}}", "spec"),
+    ))
+    results.append(check(
+        "template without placeholders renders unchanged",
+        CompiledTemplate("no markers {{lower}} {single}").render(PHASE_NUMBER=1) == "no markers {{lower}} {single}",
+    ))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def test_session_digest():
+    """Test the session state digest and its snapshot of the previous session."""
+    print("\nTesting session digest:\n")
+    results = []
+
+    from progress import SESSION_DIGEST_FILE, build_session_digest
+    from project_state import STATE_DIRNAME
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        snapshot = project_dir / STATE_DIRNAME / SESSION_DIGEST_FILE
+        setup_project(tmp)
+        call(feature_mcp.feature_create_bulk, [make_feature(f"Feature {i}") for i in range(1, 4)])
+        feature_mcp.wait_for_writes()
+
+        first = build_session_digest(project_dir, 1)
+        results.append(check("first session has no changes section", "0/3 features passing" in first and "Since the previous session" not in first))
+        results.append(check("snapshot saved in the state directory", json.loads(snapshot.read_text())["passing_ids"] == []))
+
+        call(feature_mcp.feature_mark_passing, 1)
+        call(feature_mcp.feature_mark_passing, 2)
+        feature_mcp.wait_for_writes()
+        second = build_session_digest(project_dir, 1)
+        results.append(check("newly passing features listed", "Newly passing: #1 Feature 1, #2 Feature 2" in second))
+
+        call(feature_mcp.feature_mark_failing, 1)
+        call(feature_mcp.feature_mark_passing, 3)
+        feature_mcp.wait_for_writes()
+        third = build_session_digest(project_dir, 1)
+        results.append(check(
+            "regressed features listed",
+            "Newly passing: #3 Feature 3" in third and "No longer passing: #1" in third,
+        ))
+        results.append(check("snapshot from another phase is ignored", "Since the previous session" not in build_session_digest(project_dir, 2)))
+
+        for description, content in (
+            ("corrupt snapshot", "{not json"),
+            ("non-object snapshot", "[1, 2]"),
+            ("malformed passing ids", json.dumps({"phase": 1, "passing_ids": 7})),
+            ("unhashable passing ids", json.dumps({"phase": 1, "passing_ids": [[1]]})),
+            ("malformed git head", json.dumps({"phase": 1, "passing_ids": [], "git_head": 7})),
+        ):
+            snapshot.write_text(content)
+            digest = build_session_digest(project_dir, 1)
+            results.append(check(f"{description} counts as a first session", "2/3 features passing" in digest and "Since the previous session" not in digest))
+
+        # A snapshot path that cannot be read (or written) does not fail the session
+        snapshot.unlink()
+        snapshot.mkdir()
+        digest = build_session_digest(project_dir, 1)
+        results.append(check("unreadable snapshot counts as a first session", "2/3 features passing" in digest and "Since the previous session" not in digest))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+# Modules the features server defers until the first tool call (database
+# layer, registry, spec parsing); none of them may be imported at startup
+SERVER_DEFERRED_MODULES = ("sqlalchemy", "api", "registry", "prompts", "sqlite3")
+
+# Optional startup import budget for the server's own imports, excluding the
+# MCP framework (mcp, pydantic) and the asyncio runtime it runs on. Wall-clock
+# timings depend on the machine, so the budget is only checked when set, e.g.
+# SERVER_IMPORT_BUDGET_MS=75 python test_features.py
+SERVER_IMPORT_BUDGET_MS = os.environ.get("SERVER_IMPORT_BUDGET_MS")
+SERVER_FRAMEWORK_PACKAGES = ("mcp", "pydantic", "asyncio", "concurrent")
+
+
+def test_server_import_time():
+    """Test that the features server defers heavy imports until first use."""
+    print("\nTesting features server startup imports:\n")
+    results = []
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mcp_server.feature_mcp"],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent,
+    )
+    results.append(check("server module imports cleanly", proc.returncode == 0))
+
+    # Lines look like "import time:  self_us | cumulative_us | <indent>module"
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(self_us), int(cumulative_us), depth, name.strip()))
+
+    loaded = {name.split(".")[0] for _, _, _, name in entries}
+    for module in SERVER_DEFERRED_MODULES:
+        results.append(check(f"{module} is not imported at startup", module not in loaded))
+
+    if SERVER_IMPORT_BUDGET_MS:
+        budget_ms = float(SERVER_IMPORT_BUDGET_MS)
+        # importtime lists children before their parent, one level deeper
+        own_us = 0
+        for i, (self_us, cumulative_us, depth, name) in enumerate(entries):
+            if name != "mcp_server.feature_mcp":
+                continue
+            own_us = self_us
+            for child_self, child_cumulative, child_depth, child_name in reversed(entries[:i]):
+                if child_depth <= depth:
+                    break
+                if child_depth == depth + 1 and child_name.split(".")[0] not in SERVER_FRAMEWORK_PACKAGES:
+                    own_us += child_cumulative
+        results.append(check(
+            f"server imports within budget ({own_us / 1000:.1f}ms <= {budget_ms:g}ms)",
+            own_us <= budget_ms * 1000,
+        ))
+
+    passed = sum(results)
+    return passed, len(results) - passed
+
+
+def main():
+    print("=" * 70)
+    print("  FEATURE MCP SERVER TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    dep_passed, dep_failed = test_dependencies()
+    passed += dep_passed
+    failed += dep_failed
+
+    batch_passed, batch_failed = test_next_batch()
+    passed += batch_passed
+    failed += batch_failed
+
+    search_passed, search_failed = test_search()
+    passed += search_passed
+    failed += search_failed
+
+    stats_passed, stats_failed = test_stats_breakdown()
+    passed += stats_passed
+    failed += stats_failed
+
+    parity_passed, parity_failed = test_backend_parity()
+    passed += parity_passed
+    failed += parity_failed
+
+    compact_passed, compact_failed = test_compact_output()
+    passed += compact_passed
+    failed += compact_failed
+
+    deferred_passed, deferred_failed = test_deferred_columns()
+    passed += deferred_passed
+    failed += deferred_failed
+
+    concurrent_passed, concurrent_failed = test_concurrent_tools()
+    passed += concurrent_passed
+    failed += concurrent_failed
+
+    verification_passed, verification_failed = test_verification()
+    passed += verification_passed
+    failed += verification_failed
+
+    initializer_passed, initializer_failed = test_initializer_checkpoints()
+    passed += initializer_passed
+    failed += initializer_failed
+
+    merge_passed, merge_failed = test_parallel_initializer_merge()
+    passed += merge_passed
+    failed += merge_failed
+
+    history_passed, history_failed = test_history()
+    passed += history_passed
+    failed += history_failed
+
+    import_passed, import_failed = test_import()
+    passed += import_passed
+    failed += import_failed
+
+    export_passed, export_failed = test_export()
+    passed += export_passed
+    failed += export_failed
+
+    schema_passed, schema_failed = test_schema_migrations()
+    passed += schema_passed
+    failed += schema_failed
+
+    registry_passed, registry_failed = test_registry()
+    passed += registry_passed
+    failed += registry_failed
+
+    checkpoint_passed, checkpoint_failed = test_checkpoints()
+    passed += checkpoint_passed
+    failed += checkpoint_failed
+
+    prompt_passed, prompt_failed = test_prompt_cache()
+    passed += prompt_passed
+    failed += prompt_failed
+
+    digest_passed, digest_failed = test_session_digest()
+    passed += digest_passed
+    failed += digest_failed
+
+    import_time_passed, import_time_failed = test_server_import_time()
+    passed += import_time_passed
+    failed += import_time_failed
+
+    # Summary
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,14 +8,41 @@ Run with: python test_security.py
 """
 
 import asyncio
+import json
+import os
 import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
 
 from security import (
     bash_security_hook,
+    get_blocked_commands_section,
+    extract_command_argvs,
     extract_commands,
     validate_chmod_command,
     validate_init_script,
 )
+from project_state import STATE_DIRNAME
+from security_audit import (
+    AuditLog,
+    flush_audit_logs,
+    get_audit_log_path,
+    load_blocked_stats,
+)
+import security_policy
+from security_policy import get_project_policy_path
+
+
+@contextmanager
+def policy_dir(tmp: str):
+    """Keep project policies in {tmp}/policies instead of the real policy directory."""
+    previous = security_policy.PROJECT_POLICY_DIR
+    security_policy.PROJECT_POLICY_DIR = Path(tmp) / "policies"
+    try:
+        yield
+    finally:
+        security_policy.PROJECT_POLICY_DIR = previous
 
 
 def test_hook(command: str, should_block: bool) -> bool:
@@ -151,6 +178,266 @@ def test_validate_init_script():
     return passed, failed
 
 
+def test_security_policy():
+    """Test per-project policy files, including hot reload."""
+    print("\nTesting security policy:\n")
+    passed = 0
+    failed = 0
+
+    with tempfile.TemporaryDirectory() as tmp, policy_dir(tmp):
+        project_dir = Path(tmp) / "my_app"
+        project_dir.mkdir()
+        policy_file = get_project_policy_path(project_dir)
+        policy_file.parent.mkdir()
+        policy_file.write_text(json.dumps({
+            "allow": [
+                "yarn",
+                "python -m pytest",
+                {"command": "uv", "subcommand": "run", "args": "^pytest( |$)"},
+            ],
+            "deny": [
+                {"command": "git", "subcommand": "push"},
+                {"command": "npm", "args": "--force"},
+            ],
+        }))
+
+        def check(command: str, should_block: bool) -> bool:
+            input_data = {"tool_name": "Bash", "tool_input": {"command": command}}
+            result = asyncio.run(bash_security_hook(input_data, project_dir=project_dir))
+            return (result.get("decision") == "block") == should_block
+
+        # Test cases: (command, should_block, description)
+        test_cases = [
+            ("yarn install", False, "allowed by plain rule"),
+            ("python -m pytest -q", False, "allowed by argv prefix"),
+            ("/usr/bin/python -m pytest", False, "prefix matches command path"),
+            ("python app.py", True, "prefix does not match"),
+            ("uv run pytest tests/", False, "allowed by args pattern"),
+            ("uv run python app.py", True, "args pattern does not match"),
+            ("git status", False, "default allowlist still applies"),
+            ("git push origin main", True, "denied subcommand"),
+            ("npm install --force", True, "denied by args pattern"),
+            ("npm install", False, "deny pattern does not match"),
+            ("pkill python", True, "extra validation still applies"),
+            ("echo {} > ../policies/my_app.json", True, "policy file is protected"),
+            ("echo {} > \"../policies/my_\"'app.json'", True, "quoted policy file name is protected"),
+            ("echo {}>../policies/my_app.json", True, "attached redirection target is protected"),
+            ("cp /tmp/policy.json ../policies/*.json", True, "glob matching the policy file is protected"),
+            ("cp /tmp/policy.json ../policies/$NAME", True, "variable write target in the policy dir is protected"),
+            ("rm -rf ../policies", True, "policy directory is protected"),
+            ("bash -c 'echo {} > ../policies/my_app.json'", True, "nested shell script is protected"),
+            ("cat " + str(policy_file), True, "absolute policy path is protected"),
+            ("node -e \"require('fs').writeFileSync('../policies/my_app.json', '{}')\"", True, "node script naming the policy is protected"),
+            ('git commit -m "Document my_app.json"', False, "mentioning the policy file is allowed"),
+            ("echo {} > prompts/security_policy.json", False, "files in the project are not policies"),
+            ("cp /tmp/app.js src/$NAME", False, "variable write target elsewhere is allowed"),
+            ("ls src/*.js", False, "unrelated glob is allowed"),
+        ]
+
+        for cmd, should_block, description in test_cases:
+            if check(cmd, should_block):
+                print(f"  PASS: {cmd!r} ({description})")
+                passed += 1
+            else:
+                print(f"  FAIL: {cmd!r} ({description})")
+                failed += 1
+
+        # Hot reload: editing the policy file takes effect on the next command
+        policy_file.write_text(json.dumps({"deny": ["yarn"]}))
+        for cmd, should_block, description in [
+            ("yarn install", True, "denied after reload"),
+            ("python -m pytest", True, "allow rule removed after reload"),
+        ]:
+            if check(cmd, should_block):
+                print(f"  PASS: {cmd!r} ({description})")
+                passed += 1
+            else:
+                print(f"  FAIL: {cmd!r} ({description})")
+                failed += 1
+
+    # A policy file inside the project is never loaded, however it got there
+    with tempfile.TemporaryDirectory() as tmp, policy_dir(tmp):
+        project_dir = Path(tmp) / "my_app"
+        (project_dir / "prompts").mkdir(parents=True)
+        (project_dir / "prompts" / "security_policy.json").write_text(json.dumps({"allow": ["wget"]}))
+        input_data = {"tool_name": "Bash", "tool_input": {"command": "wget https://example.com"}}
+        result = asyncio.run(bash_security_hook(input_data, project_dir=project_dir))
+        if result.get("decision") == "block":
+            print("  PASS: policy written inside the project is ignored")
+            passed += 1
+        else:
+            print("  FAIL: policy written inside the project is ignored")
+            failed += 1
+
+    default_path = get_project_policy_path(Path("generations") / "my_app")
+    expected_dir = os.environ.get("SECURITY_POLICY_DIR") or security_policy.SYSTEM_ROOT / "policies"
+    if default_path == Path(expected_dir) / "my_app.json":
+        print("  PASS: project policies live in the harness's policy directory")
+        passed += 1
+    else:
+        print(f"  FAIL: project policies live in the harness's policy directory, got {default_path}")
+        failed += 1
+
+    # argv extraction used for policy matching
+    argvs = extract_command_argvs("FOO=1 npm run build && git push -f | cat")
+    if argvs == [["npm", "run", "build"], ["git", "push", "-f"], ["cat"]]:
+        print("  PASS: argv extraction")
+        passed += 1
+    else:
+        print(f"  FAIL: argv extraction, got {argvs}")
+        failed += 1
+
+    return passed, failed
+
+
+def test_audit_log():
+    """Test that hook decisions are recorded and the log rotates."""
+    print("\nTesting security audit log:\n")
+    passed = 0
+    failed = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        for command in ("ls -la", "python app.py"):
+            input_data = {
+                "tool_name": "Bash",
+                "tool_input": {"command": command},
+                "session_id": "session-1",
+            }
+            asyncio.run(bash_security_hook(input_data, "tool-1", project_dir=project_dir))
+        flush_audit_logs()
+
+        log_file = get_audit_log_path(project_dir)
+        entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+        expected = [
+            ("allow", "allowlist", ["ls"]),
+            ("block", "allowlist", ["python"]),
+        ]
+        actual = [(e["decision"], e["rule"], e["commands"]) for e in entries]
+        if actual == expected and all(e["session_id"] == "session-1" for e in entries):
+            print("  PASS: decisions recorded")
+            passed += 1
+        else:
+            print(f"  FAIL: decisions recorded, got {actual}")
+            failed += 1
+
+        in_state_dir = (
+            log_file.parent == project_dir / STATE_DIRNAME
+            and (log_file.parent / ".gitignore").read_text() == "*\n"
+        )
+        if in_state_dir:
+            print("  PASS: log kept in the git-ignored state directory")
+            passed += 1
+        else:
+            print(f"  FAIL: log kept in the git-ignored state directory, got {log_file}")
+            failed += 1
+
+        log = AuditLog(project_dir / "rotating.jsonl", max_bytes=200, backup_count=2)
+        for i in range(20):
+            log.record({"i": i, "padding": "x" * 50})
+            log.flush()
+        log.close()
+        backups = sorted(p.name for p in project_dir.glob("rotating.jsonl.*.gz"))
+        if backups == ["rotating.jsonl.1.gz", "rotating.jsonl.2.gz"]:
+            print("  PASS: log rotated to compressed backups")
+            passed += 1
+        else:
+            print(f"  FAIL: log rotation, got {backups}")
+            failed += 1
+
+    return passed, failed
+
+
+def test_blocked_command_feedback():
+    """Test blocked command statistics, suggestions and the prompt section."""
+    print("\nTesting blocked command feedback:\n")
+    passed = 0
+    failed = 0
+
+    with tempfile.TemporaryDirectory() as tmp, policy_dir(tmp):
+        project_dir = Path(tmp) / "my_app"
+        project_dir.mkdir()
+        reasons = []
+        for command in ("sed -i s/a/b/ f.txt", "python app.py", "python3 -c 1", "python x.py"):
+            input_data = {"tool_name": "Bash", "tool_input": {"command": command}}
+            result = asyncio.run(bash_security_hook(input_data, project_dir=project_dir))
+            reasons.append(result.get("reason", ""))
+            flush_audit_logs()
+
+        checks = [
+            ("reason suggests alternative", "Edit tool" in reasons[0]),
+            ("repeat block is called out", "blocked 2 times" in reasons[3]),
+            ("stats counted per command", {
+                cmd: entry["count"] for cmd, entry in load_blocked_stats(project_dir).items()
+            } == {"sed": 1, "python": 2, "python3": 1}),
+        ]
+
+        checks.append((
+            "stats kept in the state directory",
+            (project_dir / STATE_DIRNAME / ".blocked_commands.json").is_file()
+            and not (project_dir / ".blocked_commands.json").exists(),
+        ))
+
+        section = get_blocked_commands_section(project_dir)
+        checks.append((
+            "prompt section lists most blocked first",
+            section.index("`python` (blocked 2x)") < section.index("`sed` (blocked 1x)"),
+        ))
+
+        # Commands the policy now allows drop out of the prompt section
+        policy_file = get_project_policy_path(project_dir)
+        policy_file.parent.mkdir()
+        policy_file.write_text(json.dumps({"allow": ["sed", "python -m pytest"]}))
+        section = get_blocked_commands_section(project_dir)
+        checks.append(("allowed command dropped", "`sed`" not in section))
+
+        # A narrower allowed form replaces the generic alternative
+        checks.append((
+            "prompt section names the allowed form",
+            "- `python` (blocked 2x): the security policy only allows `python -m pytest`\n" in section,
+        ))
+        input_data = {"tool_name": "Bash", "tool_input": {"command": "python app.py"}}
+        reason = asyncio.run(bash_security_hook(input_data, project_dir=project_dir))["reason"]
+        checks.append((
+            "block reason names the allowed form",
+            "`python -m pytest`" in reason and "Python is not available" not in reason,
+        ))
+        flush_audit_logs()
+        checks.append((
+            "stats written without leftover temp files",
+            not list((project_dir / STATE_DIRNAME).glob("*.tmp")),
+        ))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A corrupt or hand-edited stats file is ignored, then rewritten
+        project_dir = Path(tmp)
+        stats_file = project_dir / STATE_DIRNAME / ".blocked_commands.json"
+        stats_file.parent.mkdir()
+        stats_file.write_text("{not json")
+        checks.append(("corrupt stats file loads empty", load_blocked_stats(project_dir) == {}))
+        checks.append(("corrupt stats file gives no prompt section", get_blocked_commands_section(project_dir) == ""))
+
+        stats_file.write_text(json.dumps({"sed": "oops", "vim": {"count": 2}}))
+        checks.append(("malformed entries dropped", list(load_blocked_stats(project_dir)) == ["vim"]))
+        input_data = {"tool_name": "Bash", "tool_input": {"command": "vim notes.txt"}}
+        result = asyncio.run(bash_security_hook(input_data, project_dir=project_dir))
+        flush_audit_logs()
+        checks.append((
+            "blocking continues from a partial entry",
+            "blocked 3 times" in result["reason"] and load_blocked_stats(project_dir)["vim"]["count"] == 3,
+        ))
+
+        for description, ok in checks:
+            if ok:
+                print(f"  PASS: {description}")
+                passed += 1
+            else:
+                print(f"  FAIL: {description}")
+                failed += 1
+
+    return passed, failed
+
+
 def main():
     print("=" * 70)
     print("  SECURITY HOOK TESTS")
@@ -174,6 +461,21 @@ def main():
     passed += init_passed
     failed += init_failed
 
+    # Test security policy files
+    policy_passed, policy_failed = test_security_policy()
+    passed += policy_passed
+    failed += policy_failed
+
+    # Test security audit log
+    audit_passed, audit_failed = test_audit_log()
+    passed += audit_passed
+    failed += audit_failed
+
+    # Test blocked command feedback
+    feedback_passed, feedback_failed = test_blocked_command_feedback()
+    passed += feedback_passed
+    failed += feedback_failed
+
     # Commands that SHOULD be blocked
     print("\nCommands that should be BLOCKED:\n")
     dangerous = [